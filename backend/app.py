@@ -1,53 +1,144 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, send_file, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import (JWTManager, create_access_token, create_refresh_token, decode_token, get_jwt,
+                                get_jwt_identity, jwt_required)
 from datetime import datetime, timedelta, timezone
+import base64
+import functools
+import gzip
+import hashlib
+import importlib.util
+import itertools
+import json
 import os
+import shutil
+import threading
+import time
 from flask_cors import CORS
+from sqlalchemy.exc import IntegrityError
+from werkzeug.datastructures import MultiDict
 from dotenv import load_dotenv
+from auth_tokens import create_token_guard
+from cache import create_task_cache
+import compression
+import database
+from events import KEEPALIVE, TooManyStreams, create_event_broker, format_sse
+import fulltext
+import instrumentation
+from jobs import JobFailed, JobQueue
+import migrations
+from passwords import PasswordHasherBusy, create_password_hasher
+from ratelimit import client_ip, create_rate_limiter
+from serialization import (EXPORT_FORMATS, IMPORT_READ_SIZE, TASK_FIELDS, STREAM_CHUNK_SIZE, dumps, gzip_stream,
+                           json_response, read_task_rows, serialize_task, stream_task_csv, stream_task_list, stream_task_ndjson,
+                           task_columns, task_row_serializer)
 
-# Load environment variables
-load_dotenv()
+db = SQLAlchemy()
+jwt = JWTManager()
+api = Blueprint('api', __name__, cli_group=None)
 
-app = Flask(__name__)
+# Built from the app config by create_app
+task_cache = None
+password_hasher = None
+rate_limiter = None
+token_guard = None
+event_broker = None
 
 # Configuration
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///todoapp.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-string')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
-
-# Handle PostgreSQL URL format for Render
-if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgres://'):
-    app.config['SQLALCHEMY_DATABASE_URI'] = app.config['SQLALCHEMY_DATABASE_URI'].replace('postgres://', 'postgresql://', 1)
-
-# Add fallback for database connection issues
-try:
-    # Test database connection
-    if 'postgresql' in app.config['SQLALCHEMY_DATABASE_URI']:
-        print("Using PostgreSQL database")
-        # Test if psycopg2 is available
-        try:
-            import psycopg2
-            print("psycopg2 is available")
-        except ImportError as e:
-            print(f"psycopg2 not available: {e}")
-            print("Falling back to SQLite")
-            app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///todoapp.db'
-    else:
-        print("Using SQLite database")
-except Exception as e:
-    print(f"Database configuration warning: {e}")
-    # Fallback to SQLite if PostgreSQL fails
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///todoapp.db'
-
-# Initialize extensions
-db = SQLAlchemy(app)
-bcrypt = Bcrypt(app)
-jwt = JWTManager(app)
-CORS(app)
+def load_config(config, environ):
+    """Copy the settings from the environment into the app config."""
+    config['SECRET_KEY'] = environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
+    config['SQLALCHEMY_DATABASE_URI'] = environ.get('DATABASE_URL', 'sqlite:///todoapp.db')
+    config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    config['JWT_SECRET_KEY'] = environ.get('JWT_SECRET_KEY', 'jwt-secret-string')
+    # Short-lived access tokens renewed with a refresh token, checked against a revocation list, see auth_tokens.py
+    config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=int(environ.get('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=int(environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+    config['ACTIVE_USER_CACHE_SIZE'] = int(environ.get('ACTIVE_USER_CACHE_SIZE', 10000))
+    config['ACTIVE_USER_CACHE_TTL'] = float(environ.get('ACTIVE_USER_CACHE_TTL', 300))
+    # 'aggregate' computes /api/stats with one live query, 'counters' reads the maintained user_task_stats row
+    config['STATS_MODE'] = environ.get('STATS_MODE', 'aggregate')
+    # Response cache for task lists and stats: 'none', 'memory' (per process) or 'redis' (shared by workers)
+    config['CACHE_BACKEND'] = environ.get('CACHE_BACKEND', 'none')
+    config['CACHE_REDIS_URL'] = environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    config['CACHE_TTL'] = int(environ.get('CACHE_TTL', 60))
+    config['CACHE_MAX_ENTRIES'] = int(environ.get('CACHE_MAX_ENTRIES', 1024))
+    config['CACHE_MAX_ENTRY_BYTES'] = int(environ.get('CACHE_MAX_ENTRY_BYTES', 1024 * 1024))
+    # Rows inserted per transaction by POST /api/tasks/import
+    config['IMPORT_BATCH_SIZE'] = int(environ.get('IMPORT_BATCH_SIZE', 500))
+    # Background jobs run by worker.py, see jobs.py
+    config['JOB_WORKER_THREADS'] = int(environ.get('JOB_WORKER_THREADS', 2))
+    config['JOB_KIND_LIMITS'] = environ.get('JOB_KIND_LIMITS', '')
+    config['JOB_MAX_PENDING_PER_USER'] = int(environ.get('JOB_MAX_PENDING_PER_USER', 5))
+    config['JOB_MAX_ATTEMPTS'] = int(environ.get('JOB_MAX_ATTEMPTS', 3))
+    config['JOB_RETRY_DELAY'] = float(environ.get('JOB_RETRY_DELAY', 30))
+    config['JOB_LEASE_SECONDS'] = float(environ.get('JOB_LEASE_SECONDS', 300))
+    config['JOB_POLL_INTERVAL'] = float(environ.get('JOB_POLL_INTERVAL', 1))
+    config['JOB_RETENTION_HOURS'] = float(environ.get('JOB_RETENTION_HOURS', 24))
+    config['JOB_FILES_DIR'] = environ.get('JOB_FILES_DIR', 'job_files')
+    # Task events pushed to clients over Server-Sent Events, see events.py
+    config['EVENTS_BACKEND'] = environ.get('EVENTS_BACKEND', 'memory')
+    config['EVENTS_REDIS_URL'] = environ.get('EVENTS_REDIS_URL', config['CACHE_REDIS_URL'])
+    config['EVENTS_HEARTBEAT_SECONDS'] = float(environ.get('EVENTS_HEARTBEAT_SECONDS', 15))
+    config['EVENTS_MAX_STREAM_SECONDS'] = float(environ.get('EVENTS_MAX_STREAM_SECONDS', 300))
+    config['EVENTS_MAX_CONNECTIONS_PER_USER'] = int(environ.get('EVENTS_MAX_CONNECTIONS_PER_USER', 5))
+    config['EVENTS_QUEUE_SIZE'] = int(environ.get('EVENTS_QUEUE_SIZE', 100))
+    # Password hashing runs on a bounded process pool, see passwords.py
+    config['BCRYPT_LOG_ROUNDS'] = int(environ.get('BCRYPT_LOG_ROUNDS', 12))
+    config['PASSWORD_HASH_WORKERS'] = int(environ.get('PASSWORD_HASH_WORKERS', 2))
+    config['PASSWORD_HASH_MAX_PENDING'] = int(environ.get('PASSWORD_HASH_MAX_PENDING', 16))
+    config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 2))
+    # Token-bucket limits for login/register per client IP and email ('<count>/<period>', empty = off), see ratelimit.py.
+    # The login email limit only counts failed logins.
+    config['RATE_LIMIT_BACKEND'] = environ.get('RATE_LIMIT_BACKEND', 'memory')
+    config['RATE_LIMIT_REDIS_URL'] = environ.get('RATE_LIMIT_REDIS_URL', config['CACHE_REDIS_URL'])
+    config['RATE_LIMIT_LOGIN_IP'] = environ.get('RATE_LIMIT_LOGIN_IP', '60/minute')
+    config['RATE_LIMIT_LOGIN_EMAIL'] = environ.get('RATE_LIMIT_LOGIN_EMAIL', '10/minute')
+    config['RATE_LIMIT_REGISTER_IP'] = environ.get('RATE_LIMIT_REGISTER_IP', '20/hour')
+    config['RATE_LIMIT_REGISTER_EMAIL'] = environ.get('RATE_LIMIT_REGISTER_EMAIL', '5/hour')
+    # 'database' (the revoked_token table), 'redis', or 'memory' for a single process, see auth_tokens.py
+    config['TOKEN_REVOCATION_BACKEND'] = environ.get('TOKEN_REVOCATION_BACKEND', 'database')
+    config['TOKEN_REVOCATION_REDIS_URL'] = environ.get('TOKEN_REVOCATION_REDIS_URL', config['CACHE_REDIS_URL'])
+    config['TOKEN_REVOCATION_CACHE_TTL'] = float(environ.get('TOKEN_REVOCATION_CACHE_TTL', 5))
+    # Number of reverse proxies in front of the app whose X-Forwarded-For entries are trusted
+    config['TRUSTED_PROXIES'] = int(environ.get('TRUSTED_PROXIES', 0))
+    # Opt-in request instrumentation, see instrumentation.py
+    config['SQL_QUERY_COUNT_HEADER'] = environ.get('SQL_QUERY_COUNT_HEADER', 'false')
+    config['REQUEST_METRICS'] = environ.get('REQUEST_METRICS', 'false')
+    config['METRICS_TOKEN'] = environ.get('METRICS_TOKEN', '')
+    config['PROFILE_SLOW_REQUESTS_MS'] = float(environ.get('PROFILE_SLOW_REQUESTS_MS', 0))
+    config['PROFILE_SAMPLE_RATE'] = float(environ.get('PROFILE_SAMPLE_RATE', 0.05))
+    config['PROFILE_DIR'] = environ.get('PROFILE_DIR', 'profiles')
+    # Response compression, see compression.py
+    config['COMPRESSION_ENCODINGS'] = environ.get('COMPRESSION_ENCODINGS', 'br,gzip')
+    config['COMPRESSION_MIN_SIZE'] = int(environ.get('COMPRESSION_MIN_SIZE', 1024))
+    config['COMPRESSION_GZIP_LEVEL'] = int(environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    config['COMPRESSION_BROTLI_QUALITY'] = int(environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+    # GET /api/tasks?explain=1 returns the database's query plan instead of the tasks (slow-query triage)
+    config['TASK_QUERY_EXPLAIN'] = environ.get('TASK_QUERY_EXPLAIN', 'false').lower() in ('1', 'true', 'yes')
+    # Connection pool and SQLite PRAGMA settings, see database.py
+    database.load_config(config, environ)
+
+def resolve_database_uri(config):
+    """Normalize Render's postgres:// URLs and fall back to SQLite when the PostgreSQL driver is missing."""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if uri.startswith('postgres://'):
+        uri = uri.replace('postgres://', 'postgresql://', 1)
+    # Looked up without importing it; the engine imports the driver itself
+    if 'postgresql' in uri and importlib.util.find_spec('psycopg2') is None:
+        print("psycopg2 not available, falling back to SQLite")
+        uri = 'sqlite:///todoapp.db'
+    config['SQLALCHEMY_DATABASE_URI'] = uri
+
+# Task values
+TASK_STATUSES = ('Pending', 'In Progress', 'Completed')
+# Priorities sort by rank rather than by name; other strings rank 0, below Low
+PRIORITY_RANKS = {'Low': 1, 'Medium': 2, 'High': 3}
+
+def priority_rank_sql(column='priority'):
+    """SQL for a priority's rank; queries must use the same expression as the ix_task_user_priority_rank index."""
+    whens = ' '.join(f"WHEN '{name}' THEN {rank}" for name, rank in PRIORITY_RANKS.items())
+    return f'CASE {column} {whens} ELSE 0 END'
 
 # Database Models
 class User(db.Model):
@@ -57,6 +148,9 @@ class User(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     tasks = db.relationship('Task', backref='user', lazy=True, cascade='all, delete-orphan')
+    task_stats = db.relationship('UserTaskStats', uselist=False, lazy=True, cascade='all, delete-orphan')
+    tags = db.relationship('Tag', lazy=True, cascade='all, delete-orphan')
+    task_tombstones = db.relationship('TaskTombstone', lazy=True, cascade='all, delete-orphan')
 
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -67,12 +161,696 @@ class Task(db.Model):
     priority = db.Column(db.String(20), default='Medium')  # High, Medium, Low
     status = db.Column(db.String(20), default='Pending')  # Pending, In Progress, Completed
     category = db.Column(db.String(50), default='General')
-    tags = db.Column(db.String(200))  # Comma-separated tags
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    change_version = db.Column(db.Integer, nullable=False, default=0)  # User's change version at the last write
+    tag_links = db.relationship('TaskTag', lazy=True, order_by='TaskTag.position', cascade='all, delete-orphan')
+
+    # Keep in sync with migrations.migration_0002_task_indexes and migration_0009_task_sort_indexes
+    __table_args__ = (
+        db.Index('ix_task_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_task_user_status', 'user_id', 'status'),
+        db.Index('ix_task_user_category', 'user_id', 'category'),
+        db.Index('ix_task_user_priority', 'user_id', 'priority'),
+        db.Index('ix_task_user_due_open', 'user_id', 'due_date',
+                 sqlite_where=db.text("status != 'Completed'"),
+                 postgresql_where=db.text("status != 'Completed'")),
+        db.Index('ix_task_user_change', 'user_id', 'change_version'),
+        db.Index('ix_task_user_due', 'user_id', 'due_date', 'id'),
+        db.Index('ix_task_user_updated', 'user_id', 'updated_at', 'id'),
+        db.Index('ix_task_user_title', 'user_id', 'title', 'id'),
+        db.Index('ix_task_user_priority_rank', 'user_id', db.text(f'({priority_rank_sql()})'), 'id'),
+    )
+
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'name', name='uq_tag_user_name'),
+    )
+
+class TaskTag(db.Model):
+    """Association between a task and its tags; position preserves the order tags were given in."""
+    __tablename__ = 'task_tags'
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id', ondelete='CASCADE'), primary_key=True)
+    tag_id = db.Column(db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    tag = db.relationship('Tag', lazy='joined')
+
+    __table_args__ = (
+        db.Index('ix_task_tags_tag_task', 'tag_id', 'task_id'),
+    )
+
+class TaskTombstone(db.Model):
+    """Record of a deleted task so that incremental sync can report the deletion."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    change_version = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index('ix_task_tombstone_user_change', 'user_id', 'change_version'),
+    )
+
+class UserTaskStats(db.Model):
+    """Per-user task counters and change version, maintained in the same transaction as task writes."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_tasks = db.Column(db.Integer, nullable=False, default=0)
+    completed_tasks = db.Column(db.Integer, nullable=False, default=0)
+    pending_tasks = db.Column(db.Integer, nullable=False, default=0)
+    in_progress_tasks = db.Column(db.Integer, nullable=False, default=0)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class RevokedToken(db.Model):
+    """Revoked token ids and per-user revocation times, see auth_tokens.DatabaseRevocationStore."""
+    key = db.Column(db.String(100), primary_key=True)  # 'jti:<token id>' or 'user:<user id>'
+    value = db.Column(db.Float, nullable=False)
+    expires_at = db.Column(db.Float, nullable=False, index=True)  # Unix time after which the entry is dropped
+
+class Job(db.Model):
+    """A queued background job, see jobs.py. user_id has no foreign key so account deletion jobs outlive the user."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed, cancelled
+    payload = db.Column(db.Text)  # JSON
+    progress = db.Column(db.Text)  # JSON, written by the handler while running
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_at = db.Column(db.DateTime, nullable=False)  # not claimed before this time (retry backoff)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)  # last heartbeat of the worker running the job
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    # Keep in sync with migrations.migration_0008_jobs
+    __table_args__ = (
+        db.Index('ix_job_status_run_at', 'status', 'run_at'),
+        db.Index('ix_job_user_created', 'user_id', 'created_at'),
+    )
+
+job_queue = JobQueue(db, Job)
+
+# Task statistics
+STATUS_COUNTER_COLUMNS = {
+    'Completed': 'completed_tasks',
+    'Pending': 'pending_tasks',
+    'In Progress': 'in_progress_tasks',
+}
+
+def aggregate_task_counts(user_id, session=None):
+    """Count a user's tasks by status with a single conditional-aggregate query."""
+    session = session or db.session
+    row = session.query(
+        db.func.count(Task.id),
+        db.func.sum(db.case((Task.status == 'Completed', 1), else_=0)),
+        db.func.sum(db.case((Task.status == 'Pending', 1), else_=0)),
+        db.func.sum(db.case((Task.status == 'In Progress', 1), else_=0)),
+    ).filter(Task.user_id == user_id).one()
+    return {
+        'total_tasks': row[0] or 0,
+        'completed_tasks': row[1] or 0,
+        'pending_tasks': row[2] or 0,
+        'in_progress_tasks': row[3] or 0,
+    }
+
+def count_overdue_tasks(user_id, session=None):
+    """Count open tasks past their due date (served by the ix_task_user_due_open index)."""
+    session = session or db.session
+    return session.query(Task).filter(
+        Task.user_id == user_id,
+        Task.due_date < datetime.now(timezone.utc),
+        Task.status != 'Completed'
+    ).count()
+
+def get_task_stats_row(user_id, session=None):
+    """Return the user's UserTaskStats row, backfilling it from live data if missing."""
+    session = session or db.session
+    stats = session.get(UserTaskStats, user_id)
+    if stats is None:
+        stats = UserTaskStats(user_id=user_id, version=0, **aggregate_task_counts(user_id, session))
+        session.add(stats)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another request backfilled the row first
+            session.rollback()
+            stats = session.get(UserTaskStats, user_id)
+    return stats
+
+def get_task_counters(user_id, session=None):
+    """Return the maintained counters for a user."""
+    stats = get_task_stats_row(user_id, session)
+    return {column: getattr(stats, column) for column in
+            ('total_tasks', 'completed_tasks', 'pending_tasks', 'in_progress_tasks')}
+
+def get_task_version(user_id, session=None):
+    """Return the user's task change version, bumped by every task write."""
+    session = session or db.session
+    version = session.query(UserTaskStats.version).filter_by(user_id=user_id).scalar()
+    if version is None:
+        version = get_task_stats_row(user_id, session).version
+    return version
+
+def task_counter_deltas(old_status=None, new_status=None, total_delta=0, deltas=None):
+    """Accumulate the counter changes caused by one task write into `deltas`."""
+    deltas = {} if deltas is None else deltas
+    if total_delta:
+        deltas['total_tasks'] = deltas.get('total_tasks', 0) + total_delta
+    if old_status != new_status:
+        if old_status in STATUS_COUNTER_COLUMNS:
+            deltas[STATUS_COUNTER_COLUMNS[old_status]] = deltas.get(STATUS_COUNTER_COLUMNS[old_status], 0) - 1
+        if new_status in STATUS_COUNTER_COLUMNS:
+            deltas[STATUS_COUNTER_COLUMNS[new_status]] = deltas.get(STATUS_COUNTER_COLUMNS[new_status], 0) + 1
+    return deltas
+
+def apply_task_counter_deltas(user_id, deltas, session=None):
+    """Apply accumulated counter changes and bump the user's change version.
+
+    Runs as part of the caller's transaction and uses an atomic UPDATE so
+    concurrent writers do not lose increments. If the user has no counters row
+    yet it is created from live data, which already includes this write.
+    Returns the new change version; the UPDATE holds the row lock until
+    commit, so versions are assigned in commit order per user.
+    """
+    session = session or db.session
+    table = UserTaskStats.__table__
+    values = {column: table.c[column] + delta for column, delta in deltas.items() if delta}
+    values['version'] = table.c.version + 1
+    result = session.execute(table.update().where(table.c.user_id == user_id).values(values))
+    if not result.rowcount:
+        try:
+            with session.begin_nested():
+                session.add(UserTaskStats(user_id=user_id, version=1, **aggregate_task_counts(user_id, session)))
+        except IntegrityError:
+            # Created concurrently by another request; apply the change to that row
+            session.execute(table.update().where(table.c.user_id == user_id).values(values))
+    return session.execute(db.select(table.c.version).where(table.c.user_id == user_id)).scalar()
+
+def adjust_task_counters(user_id, old_status=None, new_status=None, total_delta=0, session=None):
+    """Apply a single task write to the user's counters, returning the new change version."""
+    return apply_task_counter_deltas(user_id, task_counter_deltas(old_status, new_status, total_delta), session)
+
+def task_stats_body(counts, overdue_tasks):
+    """Build the /api/stats payload from status counts and the live overdue count."""
+    total_tasks = counts['total_tasks']
+    completed_tasks = counts['completed_tasks']
+    return {
+        'total_tasks': total_tasks,
+        'completed_tasks': completed_tasks,
+        'pending_tasks': counts['pending_tasks'],
+        'in_progress_tasks': counts['in_progress_tasks'],
+        'overdue_tasks': overdue_tasks,
+        'completion_rate': round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2)
+    }
+
+def record_task_deletion(task, version, session=None):
+    """Leave a tombstone for a deleted task at the given change version."""
+    (session or db.session).add(TaskTombstone(user_id=task.user_id, task_id=task.id, change_version=version))
+
+# Task validation
+# Task fields stored as text; anything else would only fail once the row is saved
+TASK_TEXT_FIELDS = ('title', 'description', 'priority', 'status', 'category')
+# Fields limited to the values the list filters and the priority sort know
+TASK_FIELD_CHOICES = {'priority': tuple(PRIORITY_RANKS), 'status': TASK_STATUSES}
+
+def check_task_fields(data):
+    """Raise ValueError if a field given in request data has the wrong type or an unknown priority/status."""
+    for name in TASK_TEXT_FIELDS:
+        if data.get(name) is not None and not isinstance(data[name], str):
+            raise ValueError(f'{name} must be a string')
+    for name, allowed in TASK_FIELD_CHOICES.items():
+        if name in data and data[name] not in allowed:
+            raise ValueError(f"Invalid {name}: {data[name]} (expected {', '.join(allowed)})")
+
+def parse_due_date(value):
+    """Parse an ISO 8601 due date (a trailing 'Z' is accepted), raising ValueError if invalid."""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except Exception:
+        raise ValueError('Invalid due date format')
+
+def build_task(user_id, data, tags=None):
+    """Create a new (unsaved) Task from request data, raising ValueError if invalid."""
+    check_task_fields(data)
+    if not data.get('title'):
+        raise ValueError('Task title is required')
+    
+    # Parse due date if provided
+    due_date = None
+    if data.get('due_date'):
+        due_date = parse_due_date(data['due_date'])
+    
+    task = Task(
+        user_id=user_id,
+        title=data['title'],
+        description=data.get('description', ''),
+        due_date=due_date,
+        priority=data.get('priority', 'Medium'),
+        status=data.get('status', 'Pending'),
+        category=data.get('category', 'General')
+    )
+    if data.get('tags') and isinstance(data['tags'], list):
+        set_task_tags(task, data['tags'], tags)
+    return task
+
+def apply_task_updates(task, data, tags=None):
+    """Apply the fields present in request data to a task, raising ValueError if invalid.
+
+    The data is validated before anything is assigned, so a rejected update
+    leaves the task untouched.
+    """
+    check_task_fields(data)
+    if 'title' in data and not data['title']:
+        raise ValueError('Task title is required')
+    if 'due_date' in data:
+        due_date = parse_due_date(data['due_date']) if data['due_date'] else None
+    
+    if 'title' in data:
+        task.title = data['title']
+    if 'description' in data:
+        task.description = data['description']
+    if 'due_date' in data:
+        task.due_date = due_date
+    if 'priority' in data:
+        task.priority = data['priority']
+    if 'status' in data:
+        task.status = data['status']
+    if 'category' in data:
+        task.category = data['category']
+    if 'tags' in data:
+        if data['tags'] and isinstance(data['tags'], list):
+            set_task_tags(task, data['tags'], tags)
+        else:
+            task.tag_links = []
+    
+    task.updated_at = datetime.now(timezone.utc)
+
+# Conditional GET
+def make_etag(user_id, version, *parts):
+    """Build an ETag from the user's change version and anything else the body depends on."""
+    key = '|'.join(str(part) for part in (user_id, version) + parts)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def request_args_key():
+    """Stable representation of the query string, so each filter combination gets its own ETag."""
+    return '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+
+def not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+# Response cache
+def cached_response(etag, body):
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    response = Response(body, status=200, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
+def invalidate_task_cache(user_id):
+    """Drop a user's cached responses; call after the write has been committed."""
+    if task_cache is not None:
+        task_cache.invalidate_user(user_id)
+
+def publish_task_event(user_id, event_type, version, **data):
+    """Push an event to the user's open event streams; call after the write has been committed."""
+    if event_broker is not None:
+        event_broker.publish(user_id, {'type': event_type, 'version': version, **data})
+
+# Task list pagination and projection
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+# Sortable fields; `sort=field` is ascending and `sort=-field` descending
+TASK_SORT_FIELDS = ('created_at', 'updated_at', 'due_date', 'priority', 'title')
+DEFAULT_TASK_SORT = ('created_at', True)  # newest first
+DUE_FILTERS = ('overdue', 'today', 'this_week', 'none')
+
+def parse_sort(value):
+    """Parse the `sort` parameter into (field, descending), raising ValueError if invalid."""
+    descending = value.startswith('-')
+    field = value[1:] if descending else value
+    if field not in TASK_SORT_FIELDS:
+        raise ValueError(f"sort must be one of: {', '.join(TASK_SORT_FIELDS)} (prefix '-' for descending)")
+    return field, descending
+
+def format_sort(sort):
+    field, descending = sort
+    return f'-{field}' if descending else field
+
+def encode_cursor(value, task_id, sort=DEFAULT_TASK_SORT):
+    """Encode the (sort value, id) keyset position as an opaque cursor string.
+
+    Cursors in the default order keep the [created_at, id] form; others also
+    record the sort, so they cannot be replayed against a different order.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    position = [value, task_id] if sort == DEFAULT_TASK_SORT else [format_sort(sort), value, task_id]
+    raw = json.dumps(position).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor, sort=DEFAULT_TASK_SORT):
+    """Decode a cursor produced by encode_cursor for the same sort, raising ValueError if malformed."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if sort == DEFAULT_TASK_SORT:
+            value, task_id = position
+        else:
+            cursor_sort, value, task_id = position
+            if cursor_sort != format_sort(sort):
+                raise ValueError(cursor_sort)
+        field = sort[0]
+        if field == 'priority':
+            value = int(value)
+        elif field == 'title':
+            value = str(value)
+        elif value is not None or field != 'due_date':
+            value = datetime.fromisoformat(value)
+        return value, int(task_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def parse_fields(fields_param):
+    """Parse the comma-separated `fields` parameter, raising ValueError on unknown names."""
+    fields = [f.strip() for f in fields_param.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in TASK_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Invalid fields: {', '.join(unknown) or fields_param}")
+    return fields
+
+# Tags
+def parse_tag_names(values):
+    """Normalize a list of tag names: strip whitespace, drop blanks and duplicates, keep order."""
+    names = []
+    for value in values:
+        name = str(value).strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def find_tags(user_id, names, session=None):
+    """Return {name: Tag} for those of the named tags the user already has."""
+    session = session or db.session
+    return {tag.name: tag for tag in session.query(Tag).filter(Tag.user_id == user_id, Tag.name.in_(names))}
+
+def get_or_create_tags(user_id, names, session=None):
+    """Return {name: Tag} for the user's tags, creating any that do not exist yet."""
+    session = session or db.session
+    tags = find_tags(user_id, names, session)
+    for name in names:
+        if name in tags:
+            continue
+        try:
+            with session.begin_nested():
+                tag = Tag(user_id=user_id, name=name)
+                session.add(tag)
+            tags[name] = tag
+        except IntegrityError:
+            # Created concurrently by another request
+            tags[name] = session.query(Tag).filter_by(user_id=user_id, name=name).one()
+    return tags
+
+def set_task_tags(task, values, tags=None):
+    """Replace a task's tags with the given list of names.
+
+    `tags` may be a {name: Tag} mapping already resolved by find_tags or
+    get_or_create_tags; tags missing from it are created and added to it.
+    """
+    names = parse_tag_names(values)
+    if tags is None:
+        tags = {}
+    missing = [name for name in names if name not in tags]
+    if missing:
+        tags.update(get_or_create_tags(task.user_id, missing))
+    task.tag_links = [TaskTag(tag=tags[name], position=i) for i, name in enumerate(names)]
+
+def task_tag_names(task):
+    return [link.tag.name for link in task.tag_links]
+
+def load_task_tags(task_ids, session=None):
+    """Fetch tag names for many tasks in one query, returning {task_id: [names]}."""
+    tags_by_task = {}
+    if not task_ids:
+        return tags_by_task
+    rows = (session or db.session).query(TaskTag.task_id, Tag.name).join(Tag, Tag.id == TaskTag.tag_id).filter(
+        TaskTag.task_id.in_(task_ids)
+    ).order_by(TaskTag.task_id, TaskTag.position)
+    for task_id, name in rows:
+        tags_by_task.setdefault(task_id, []).append(name)
+    return tags_by_task
+
+def filter_by_tags(query, user_id, names, match='any'):
+    """Restrict a Task query to tasks carrying any (or all) of the named tags."""
+    matching = db.select(TaskTag.task_id).join(Tag, Tag.id == TaskTag.tag_id).where(
+        Tag.user_id == user_id, Tag.name.in_(names)
+    )
+    if match == 'all':
+        matching = matching.group_by(TaskTag.task_id).having(db.func.count(TaskTag.tag_id) == len(names))
+    return query.filter(Task.id.in_(matching))
+
+# Task list query
+def parse_list_filter(args, name, allowed=None):
+    """Parse a filter given as repeated and/or comma-separated values, raising ValueError on values not in `allowed`."""
+    values = parse_tag_names(value for param in args.getlist(name) for value in param.split(','))
+    unknown = [value for value in values if allowed is not None and value not in allowed]
+    if unknown:
+        raise ValueError(f"Invalid {name}: {', '.join(unknown)} (expected {', '.join(allowed)})")
+    return values
+
+def parse_task_list_args(args):
+    """Parse the GET /api/tasks query string (any MultiDict-like object), raising ValueError if invalid."""
+    tag_match = args.get('tag_match', 'any')
+    if tag_match not in ('any', 'all'):
+        raise ValueError("tag_match must be 'any' or 'all'")
+    
+    limit = args.get('limit')
+    cursor = args.get('cursor')
+    fields = args.get('fields')
+    sort = parse_sort(args['sort']) if args.get('sort') else None
+    paginate = limit is not None or cursor is not None
+    
+    if paginate:
+        try:
+            limit = int(limit) if limit is not None else DEFAULT_PAGE_LIMIT
+        except ValueError:
+            raise ValueError('limit must be an integer')
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_LIMIT}')
+    
+    due = args.get('due')
+    if due is not None and due not in DUE_FILTERS:
+        raise ValueError(f"due must be one of: {', '.join(DUE_FILTERS)}")
+    due_after = parse_due_date(args['due_after']) if args.get('due_after') else None
+    due_before = parse_due_date(args['due_before']) if args.get('due_before') else None
+    
+    return {
+        'status': parse_list_filter(args, 'status', TASK_STATUSES),
+        'category': parse_list_filter(args, 'category'),
+        'priority': parse_list_filter(args, 'priority', list(PRIORITY_RANKS)),
+        'due': due,
+        'due_after': due_after,
+        'due_before': due_before,
+        'search': args.get('search'),
+        'tag_names': parse_tag_names(name for value in args.getlist('tag') for name in value.split(',')),
+        'tag_match': tag_match,
+        'sort': sort,
+        'paginate': paginate,
+        'limit': limit,
+        'cursor': decode_cursor(cursor, sort or DEFAULT_TASK_SORT) if cursor else None,
+        'fields': parse_fields(fields) if fields else None,
+        'explain': args.get('explain', '').lower() in ('1', 'true', 'yes'),
+    }
+
+def task_sort_key(field):
+    """The SQL expression a sort field orders by (backed by an index leading with user_id)."""
+    if field == 'priority':
+        return db.literal_column(f"({priority_rank_sql('task.priority')})")
+    return getattr(Task, field)
+
+def due_date_window(due, now):
+    """[start, end) of the `due=today` and `due=this_week` filters (UTC days, weeks start on Monday)."""
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if due == 'today':
+        return start, start + timedelta(days=1)
+    start -= timedelta(days=start.weekday())
+    return start, start + timedelta(weeks=1)
+
+def due_window_key(user_id, params, session=None):
+    """The part of the current time a `due` filter's result depends on ('' without one), for ETags and cache keys.
+
+    today/this_week change with their window's start. The overdue set only
+    grows as tasks pass their due time, and every write bumps the change
+    version, so between writes the overdue count identifies it.
+    """
+    due = params['due']
+    if due == 'overdue':
+        return f'overdue={count_overdue_tasks(user_id, session)}'
+    if due in ('today', 'this_week'):
+        return due_date_window(due, datetime.now(timezone.utc))[0].isoformat()
+    return ''
+
+def filter_by_due_date(query, params):
+    """Apply the `due`, `due_after` and `due_before` filters as ranges on due_date."""
+    due = params['due']
+    if due == 'overdue':
+        # Same definition as the overdue count in /api/stats
+        query = query.filter(Task.due_date < datetime.now(timezone.utc), Task.status != 'Completed')
+    elif due == 'none':
+        query = query.filter(Task.due_date.is_(None))
+    elif due:
+        start, end = due_date_window(due, datetime.now(timezone.utc))
+        query = query.filter(Task.due_date >= start, Task.due_date < end)
+    if params['due_after']:
+        query = query.filter(Task.due_date >= params['due_after'])
+    if params['due_before']:
+        query = query.filter(Task.due_date < params['due_before'])
+    return query
+
+def keyset_clause(sort, cursor):
+    """Condition selecting the rows after `cursor` in the given order.
+
+    Rows are ordered by (sort key, id), both in the sort's direction, and
+    compared as a row value so the sort index can seek to the position.
+    Tasks without a due date sort last ascending and first descending.
+    """
+    field, descending = sort
+    key = task_sort_key(field)
+    value, task_id = cursor
+    if value is None:
+        # Only due_date is nullable; the cursor is inside the block of tasks without one
+        after = key.is_(None) & ((Task.id < task_id) if descending else (Task.id > task_id))
+        return (after | key.isnot(None)) if descending else after
+    if descending:
+        return db.tuple_(key, Task.id) < db.tuple_(value, task_id)
+    clause = db.tuple_(key, Task.id) > db.tuple_(value, task_id)
+    return (clause | key.is_(None)) if field == 'due_date' else clause
+
+def task_sort_order(sort):
+    """ORDER BY terms for a (field, descending) sort, with id as the tie-breaker."""
+    field, descending = sort
+    key = task_sort_key(field)
+    if descending:
+        key, task_id = key.desc(), Task.id.desc()
+    else:
+        key, task_id = key.asc(), Task.id.asc()
+    if field == 'due_date':
+        key = key.nulls_first() if descending else key.nulls_last()
+    return key, task_id
+
+def filter_task_query(query, user_id, params, engine):
+    """Apply the parsed list filters, search, cursor and ordering to a Task query or select()."""
+    for name in ('status', 'category', 'priority'):
+        values = params[name]
+        if values:
+            column = getattr(Task, name)
+            query = query.filter(column == values[0] if len(values) == 1 else column.in_(values))
+    query = filter_by_due_date(query, params)
+    if params['tag_names']:
+        query = filter_by_tags(query, user_id, params['tag_names'], params['tag_match'])
+    
+    relevance_order = None
+    if params['search']:
+        query, relevance_order = fulltext.apply_search(query, Task, params['search'], engine)
+    
+    sort = params['sort'] or DEFAULT_TASK_SORT
+    if params['cursor']:
+        query = query.filter(keyset_clause(sort, params['cursor']))
+    
+    # Rank search matches by relevance unless paginating (which needs the stable keyset order) or sorting explicitly
+    if relevance_order is not None and not params['paginate'] and params['sort'] is None:
+        return query.order_by(relevance_order, *task_sort_order(sort))
+    return query.order_by(*task_sort_order(sort))
+
+def task_list_cursor(row, params):
+    """Cursor for the page after `row`, a row loaded with the columns from task_columns."""
+    sort = params['sort'] or DEFAULT_TASK_SORT
+    field = sort[0]
+    value = getattr(row, field)
+    if field == 'priority':
+        value = PRIORITY_RANKS.get(value, 0)
+    return encode_cursor(value, row.id, sort)
+
+def project_task_rows(query, fields, sort=DEFAULT_TASK_SORT):
+    """Load only the columns behind `fields` (and the sort) as row tuples, returning (query, serialize, load_tags)."""
+    columns = task_columns(fields, sort[0])
+    query = query.with_entities(*[getattr(Task, name) for name in columns])
+    serialize = task_row_serializer(fields, columns)
+    id_index = columns.index('id')
+    load_tags = None
+    if 'tags' in fields:
+        load_tags = lambda rows: load_task_tags([row[id_index] for row in rows])
+    return query, serialize, load_tags
+
+def iter_row_chunks(query):
+    """Yield the query's rows in lists of STREAM_CHUNK_SIZE, fetched with a server-side cursor where supported."""
+    rows = iter(query.yield_per(STREAM_CHUNK_SIZE))
+    return iter(lambda: list(itertools.islice(rows, STREAM_CHUNK_SIZE)), [])
+
+def export_task_body(user_id, params, export_format):
+    """Stream a user's filtered tasks as 'csv' or 'ndjson' bytes, one chunk of rows at a time."""
+    fields = params['fields'] or list(TASK_FIELDS)
+    query = filter_task_query(Task.query.filter_by(user_id=user_id), user_id, params, db.engine)
+    query, serialize, load_tags = project_task_rows(query, fields)
+    
+    # Fetch the first chunk up front, so query errors surface before a response is started
+    chunks = iter_row_chunks(query)
+    chunks = itertools.chain([next(chunks, [])], chunks)
+    if export_format == 'csv':
+        return stream_task_csv(chunks, fields, serialize, load_tags)
+    return stream_task_ndjson(chunks, serialize, load_tags)
+
+# Rate limiting
+def rate_limited(route):
+    """Refuse requests over the route's IP/email limits with 429, before the view does any work."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if rate_limiter is not None:
+                data = request.get_json(silent=True) or {}
+                email = data.get('email') if isinstance(data, dict) else None
+                ip = client_ip(request.remote_addr, request.headers.get('X-Forwarded-For'),
+                               current_app.config['TRUSTED_PROXIES'])
+                retry_after = rate_limiter.hit(route, ip, email)
+                if retry_after:
+                    return (jsonify({'error': 'Too many requests, please retry later'}), 429,
+                            {'Retry-After': str(retry_after)})
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Token checks
+def user_is_active(user_id, session=None):
+    session = session or db.session
+    return session.query(User.id).filter_by(id=user_id).first() is not None
+
+@jwt.token_in_blocklist_loader
+def token_is_revoked(jwt_header, jwt_payload):
+    return token_guard.is_revoked(jwt_payload)
+
+@jwt.user_lookup_loader
+def load_token_user(jwt_header, jwt_payload):
+    # The user id, not the row: routes only need the id, and cached users cost no query
+    user_id = int(jwt_payload['sub'])
+    return user_id if token_guard.user_exists(user_id, user_is_active) else None
+
+def issue_tokens(user_id):
+    return {
+        'access_token': create_access_token(identity=str(user_id), additional_claims=token_guard.issued_at_claims()),
+        'refresh_token': create_refresh_token(identity=str(user_id), additional_claims=token_guard.issued_at_claims())
+    }
 
 # Authentication Routes
-@app.route('/api/auth/register', methods=['POST'])
+@api.route('/api/auth/register', methods=['POST'])
+@rate_limited('register')
 def register():
     try:
         data = request.get_json()
@@ -86,7 +864,7 @@ def register():
             return jsonify({'error': 'User with this email already exists'}), 400
         
         # Hash password
-        password_hash = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+        password_hash = password_hasher.hash(data['password'])
         
         # Create new user
         user = User(
@@ -98,12 +876,9 @@ def register():
         db.session.add(user)
         db.session.commit()
         
-        # Create access token
-        access_token = create_access_token(identity=str(user.id))
-        
         return jsonify({
             'message': 'User created successfully',
-            'access_token': access_token,
+            **issue_tokens(user.id),
             'user': {
                 'id': user.id,
                 'name': user.name,
@@ -111,10 +886,13 @@ def register():
             }
         }), 201
         
+    except PasswordHasherBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/auth/login', methods=['POST'])
+@api.route('/api/auth/login', methods=['POST'])
+@rate_limited('login')
 def login():
     try:
         data = request.get_json()
@@ -124,11 +902,18 @@ def login():
         
         user = User.query.filter_by(email=data['email']).first()
         
-        if user and bcrypt.check_password_hash(user.password_hash, data['password']):
-            access_token = create_access_token(identity=str(user.id))
+        if user and password_hasher.check(user.password_hash, data['password']):
+            # Upgrade hashes made with a different BCRYPT_LOG_ROUNDS while the password is at hand
+            if password_hasher.needs_rehash(user.password_hash):
+                try:
+                    user.password_hash = password_hasher.hash(data['password'])
+                    db.session.commit()
+                except PasswordHasherBusy:
+                    # Keep the old hash; it is upgraded on a later login
+                    pass
             return jsonify({
                 'message': 'Login successful',
-                'access_token': access_token,
+                **issue_tokens(user.id),
                 'user': {
                     'id': user.id,
                     'name': user.name,
@@ -136,118 +921,190 @@ def login():
                 }
             }), 200
         else:
+            if rate_limiter is not None:
+                rate_limiter.record_failure('login', email=data['email'])
             return jsonify({'error': 'Invalid email or password'}), 401
             
+    except PasswordHasherBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/auth/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    try:
+        # Rotate: the presented refresh token is revoked, so a leaked one is only usable once
+        token_guard.revoke_token(get_jwt())
+        return jsonify(issue_tokens(get_jwt_identity())), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/auth/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        
+        if data.get('all'):
+            # Log out everywhere: every token issued to the user so far stops working
+            token_guard.revoke_user(user_id)
+            return jsonify({'message': 'Logged out from all sessions'}), 200
+        
+        token_guard.revoke_token(get_jwt())
+        if data.get('refresh_token'):
+            try:
+                claims = decode_token(data['refresh_token'])
+            except Exception:
+                return jsonify({'error': 'Invalid refresh token'}), 400
+            if claims['sub'] != str(user_id):
+                return jsonify({'error': 'Invalid refresh token'}), 400
+            token_guard.revoke_token(claims)
+        
+        return jsonify({'message': 'Logged out'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Task Routes
-@app.route('/api/tasks', methods=['GET'])
+@api.route('/api/tasks', methods=['GET'])
 @jwt_required()
 def get_tasks():
     try:
         user_id = int(get_jwt_identity())
         
-        # Get query parameters for filtering
-        status = request.args.get('status')
-        category = request.args.get('category')
-        priority = request.args.get('priority')
-        search = request.args.get('search')
-        
-        # Build query
-        query = Task.query.filter_by(user_id=user_id)
-        
-        if status:
-            query = query.filter_by(status=status)
-        if category:
-            query = query.filter_by(category=category)
-        if priority:
-            query = query.filter_by(priority=priority)
-        if search:
-            query = query.filter(
-                (Task.title.contains(search)) | 
-                (Task.description.contains(search))
-            )
+        try:
+            params = parse_task_list_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        fields = params['fields'] or list(TASK_FIELDS)
+        sort = params['sort'] or DEFAULT_TASK_SORT
+        paginate, limit = params['paginate'], params['limit']
+        
+        if params['explain']:
+            # The database's plan for the list query instead of its rows, for slow-query triage
+            if not current_app.config['TASK_QUERY_EXPLAIN']:
+                return jsonify({'error': 'Query plans are disabled, set TASK_QUERY_EXPLAIN=true'}), 403
+            query = filter_task_query(Task.query.filter_by(user_id=user_id), user_id, params, db.engine)
+            query = project_task_rows(query, fields, sort)[0]
+            if paginate:
+                query = query.limit(limit + 1)
+            return json_response(database.explain_query(db.session.connection(), query.statement))
+        
+        # Results of `due` filters also change with the clock
+        args_key = request_args_key()
+        window_key = due_window_key(user_id, params)
+        
+        # Serve repeated queries from the cache without touching the database
+        cache_key = None
+        if task_cache is not None:
+            cache_key = task_cache.key(user_id, 'tasks', f'{args_key}|{window_key}')
+            cached = task_cache.get(cache_key)
+            if cached is not None:
+                return cached_response(*cached)
+        
+        # Answer revalidation requests from the change version and due window alone
+        etag = make_etag(user_id, get_task_version(user_id), 'tasks', args_key, window_key)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        
+        query = filter_task_query(Task.query.filter_by(user_id=user_id), user_id, params, db.engine)
+        
+        # Load plain row tuples with only the needed columns instead of Task objects
+        query, serialize, load_tags = project_task_rows(query, fields, sort)
         
-        tasks = query.order_by(Task.created_at.desc()).all()
-        
-        tasks_data = []
-        for task in tasks:
-            tasks_data.append({
-                'id': task.id,
-                'title': task.title,
-                'description': task.description,
-                'due_date': task.due_date.isoformat() if task.due_date else None,
-                'priority': task.priority,
-                'status': task.status,
-                'category': task.category,
-                'tags': task.tags.split(',') if task.tags else [],
-                'created_at': task.created_at.isoformat(),
-                'updated_at': task.updated_at.isoformat()
-            })
-        
-        return jsonify({'tasks': tasks_data}), 200
+        if not paginate:
+            # Stream the full list in chunks so large accounts are never held in memory at once
+            chunks = iter_row_chunks(query)
+            first_chunk = next(chunks, [])
+            body = stream_task_list(itertools.chain([first_chunk], chunks), serialize, load_tags)
+            if cache_key:
+                body = task_cache.capture(cache_key, etag, body)
+            response = Response(stream_with_context(body), status=200, mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            return response
+        
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        tags_by_task = load_tags(rows) if load_tags else {}
+        tasks_data = [serialize(row, tags_by_task) for row in rows]
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = task_list_cursor(rows[-1], params)
+        
+        response = json_response({'tasks': tasks_data, 'next_cursor': next_cursor})
+        response.set_etag(etag, weak=True)
+        if cache_key:
+            task_cache.set(cache_key, etag, response.get_data())
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/tasks', methods=['POST'])
+@api.route('/api/tasks/export', methods=['GET', 'POST'])
+@jwt_required()
+def export_tasks():
+    """Stream the user's tasks as a download (GET), or write the file on a worker (POST, answers 202)."""
+    try:
+        user_id = int(get_jwt_identity())
+        
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        try:
+            params = parse_task_list_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if params['paginate']:
+            return jsonify({'error': 'Exports are not paginated, remove limit and cursor'}), 400
+        
+        if request.method == 'POST':
+            # The client polls the job and downloads its result
+            payload = {'format': export_format, 'args': list(request.args.items(multi=True))}
+            return enqueue_job_response('export_tasks', user_id, payload)
+        
+        body = export_task_body(user_id, params, export_format)
+        content_type, extension = EXPORT_FORMATS[export_format]
+        headers = {'Content-Disposition': f'attachment; filename="tasks.{extension}"', 'Vary': 'Accept-Encoding'}
+        if request.accept_encodings['gzip']:
+            body = gzip_stream(body)
+            headers['Content-Encoding'] = 'gzip'
+        return Response(stream_with_context(body), status=200, content_type=content_type, headers=headers)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/tasks', methods=['POST'])
 @jwt_required()
 def create_task():
     try:
         user_id = int(get_jwt_identity())
         data = request.get_json()
         
-        if not data.get('title'):
-            return jsonify({'error': 'Task title is required'}), 400
-        
-        # Parse due date if provided
-        due_date = None
-        if data.get('due_date'):
-            try:
-                due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
-            except:
-                return jsonify({'error': 'Invalid due date format'}), 400
-        
-        # Parse tags
-        tags_str = None
-        if data.get('tags') and isinstance(data['tags'], list):
-            tags_str = ','.join(data['tags'])
-        
-        task = Task(
-            user_id=user_id,
-            title=data['title'],
-            description=data.get('description', ''),
-            due_date=due_date,
-            priority=data.get('priority', 'Medium'),
-            status=data.get('status', 'Pending'),
-            category=data.get('category', 'General'),
-            tags=tags_str
-        )
+        try:
+            task = build_task(user_id, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         db.session.add(task)
+        task.change_version = adjust_task_counters(user_id, new_status=task.status, total_delta=1)
         db.session.commit()
+        invalidate_task_cache(user_id)
+        task_data = serialize_task(task, task_tag_names(task))
+        publish_task_event(user_id, 'task.created', task.change_version, task=task_data)
         
-        return jsonify({
+        return json_response({
             'message': 'Task created successfully',
-            'task': {
-                'id': task.id,
-                'title': task.title,
-                'description': task.description,
-                'due_date': task.due_date.isoformat() if task.due_date else None,
-                'priority': task.priority,
-                'status': task.status,
-                'category': task.category,
-                'tags': task.tags.split(',') if task.tags else [],
-                'created_at': task.created_at.isoformat(),
-                'updated_at': task.updated_at.isoformat()
-            }
-        }), 201
+            'task': task_data
+        }, 201)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/tasks/<int:task_id>', methods=['PUT'])
+@api.route('/api/tasks/<int:task_id>', methods=['PUT'])
 @jwt_required()
 def update_task(task_id):
     try:
@@ -258,55 +1115,28 @@ def update_task(task_id):
             return jsonify({'error': 'Task not found'}), 404
         
         data = request.get_json()
+        old_status = task.status
         
-        # Update fields
-        if 'title' in data:
-            task.title = data['title']
-        if 'description' in data:
-            task.description = data['description']
-        if 'due_date' in data:
-            if data['due_date']:
-                try:
-                    task.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
-                except:
-                    return jsonify({'error': 'Invalid due date format'}), 400
-            else:
-                task.due_date = None
-        if 'priority' in data:
-            task.priority = data['priority']
-        if 'status' in data:
-            task.status = data['status']
-        if 'category' in data:
-            task.category = data['category']
-        if 'tags' in data:
-            if data['tags'] and isinstance(data['tags'], list):
-                task.tags = ','.join(data['tags'])
-            else:
-                task.tags = None
-        
-        task.updated_at = datetime.now(timezone.utc)
+        try:
+            apply_task_updates(task, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        task.change_version = adjust_task_counters(user_id, old_status=old_status, new_status=task.status)
         db.session.commit()
+        invalidate_task_cache(user_id)
+        task_data = serialize_task(task, task_tag_names(task))
+        publish_task_event(user_id, 'task.updated', task.change_version, task=task_data)
         
-        return jsonify({
+        return json_response({
             'message': 'Task updated successfully',
-            'task': {
-                'id': task.id,
-                'title': task.title,
-                'description': task.description,
-                'due_date': task.due_date.isoformat() if task.due_date else None,
-                'priority': task.priority,
-                'status': task.status,
-                'category': task.category,
-                'tags': task.tags.split(',') if task.tags else [],
-                'created_at': task.created_at.isoformat(),
-                'updated_at': task.updated_at.isoformat()
-            }
-        }), 200
+            'task': task_data
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+@api.route('/api/tasks/<int:task_id>', methods=['DELETE'])
 @jwt_required()
 def delete_task(task_id):
     try:
@@ -317,72 +1147,777 @@ def delete_task(task_id):
             return jsonify({'error': 'Task not found'}), 404
         
         db.session.delete(task)
+        version = adjust_task_counters(user_id, old_status=task.status, total_delta=-1)
+        record_task_deletion(task, version)
         db.session.commit()
+        invalidate_task_cache(user_id)
+        publish_task_event(user_id, 'task.deleted', version, id=task_id)
         
         return jsonify({'message': 'Task deleted successfully'}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# Statistics Route
-@app.route('/api/stats', methods=['GET'])
+MAX_BATCH_OPERATIONS = 1000
+
+@api.route('/api/tasks/batch', methods=['POST'])
 @jwt_required()
-def get_stats():
+def batch_tasks():
+    """Apply many create/update/delete operations in a single transaction.
+
+    Body: {"operations": [{"op": "create", "data": {...}},
+                          {"op": "update", "id": 1, "data": {...}},
+                          {"op": "delete", "id": 2}],
+           "atomic": false}
+    Invalid operations are reported per item and skipped; with "atomic": true
+    any invalid operation rolls back the whole batch.
+    """
     try:
         user_id = int(get_jwt_identity())
+        data = request.get_json()
         
-        total_tasks = Task.query.filter_by(user_id=user_id).count()
-        completed_tasks = Task.query.filter_by(user_id=user_id, status='Completed').count()
-        pending_tasks = Task.query.filter_by(user_id=user_id, status='Pending').count()
-        in_progress_tasks = Task.query.filter_by(user_id=user_id, status='In Progress').count()
+        operations = data.get('operations') if isinstance(data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'operations must be a non-empty list'}), 400
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return jsonify({'error': f'At most {MAX_BATCH_OPERATIONS} operations are allowed per batch'}), 400
+        atomic = bool(data.get('atomic', False))
         
-        # Overdue tasks
-        overdue_tasks = Task.query.filter(
-            Task.user_id == user_id,
-            Task.due_date < datetime.now(timezone.utc),
-            Task.status != 'Completed'
-        ).count()
+        # Load every task referenced by an update/delete with one query
+        target_ids = {
+            operation.get('id') for operation in operations
+            if isinstance(operation, dict) and operation.get('op') in ('update', 'delete')
+            and isinstance(operation.get('id'), int)
+        }
+        tasks_by_id = {}
+        if target_ids:
+            tasks_by_id = {task.id: task for task in Task.query.filter(Task.user_id == user_id, Task.id.in_(target_ids))}
+        
+        # Look up every tag named in the batch with one query. Missing tags are created by the first
+        # operation that succeeds with them, so skipped operations leave no unused tags behind
+        tag_names = parse_tag_names(
+            name for operation in operations
+            if isinstance(operation, dict) and isinstance(operation.get('data'), dict)
+            and isinstance(operation['data'].get('tags'), list)
+            for name in operation['data']['tags']
+        )
+        tags = find_tags(user_id, tag_names) if tag_names else {}
+        
+        results = []
+        created = []
+        changed = []
+        deleted = []
+        counter_deltas = {}
+        for index, operation in enumerate(operations):
+            op = operation.get('op') if isinstance(operation, dict) else None
+            try:
+                if not isinstance(operation, dict):
+                    raise ValueError('Operation must be an object')
+                payload = operation.get('data') or {}
+                if not isinstance(payload, dict):
+                    raise ValueError('data must be an object')
+                
+                if op == 'create':
+                    task = build_task(user_id, payload, tags)
+                    db.session.add(task)
+                    task_counter_deltas(new_status=task.status, total_delta=1, deltas=counter_deltas)
+                    created.append((index, task))
+                    changed.append(task)
+                    results.append({'index': index, 'op': op, 'status': 201})
+                elif op in ('update', 'delete'):
+                    task = tasks_by_id.get(operation.get('id'))
+                    if task is None:
+                        results.append({'index': index, 'op': op, 'status': 404, 'error': 'Task not found'})
+                        continue
+                    if op == 'update':
+                        old_status = task.status
+                        apply_task_updates(task, payload, tags)
+                        task_counter_deltas(old_status, task.status, deltas=counter_deltas)
+                        changed.append(task)
+                    else:
+                        # Links set by an earlier update in this batch are not saved yet; the delete would
+                        # leave them behind to be inserted without a task
+                        if 'tag_links' not in db.inspect(task).unloaded:
+                            for link in task.tag_links:
+                                if link in db.session.new:
+                                    db.session.expunge(link)
+                        db.session.delete(task)
+                        del tasks_by_id[task.id]
+                        deleted.append(task)
+                        task_counter_deltas(old_status=task.status, total_delta=-1, deltas=counter_deltas)
+                    results.append({'index': index, 'op': op, 'status': 200, 'id': task.id})
+                else:
+                    raise ValueError("op must be 'create', 'update' or 'delete'")
+            except ValueError as e:
+                results.append({'index': index, 'op': op, 'status': 400, 'error': str(e)})
+        
+        failed = sum(1 for result in results if result['status'] >= 400)
+        if atomic and failed:
+            db.session.rollback()
+            return jsonify({'error': 'Batch rejected; no operations were applied', 'results': results}), 400
+        
+        version = apply_task_counter_deltas(user_id, counter_deltas)
+        for task in changed:
+            task.change_version = version
+        for task in deleted:
+            record_task_deletion(task, version)
+        # Flush all inserts/updates/deletes together so created tasks get their ids
+        db.session.flush()
+        for index, task in created:
+            results[index]['id'] = task.id
+        db.session.commit()
+        invalidate_task_cache(user_id)
+        if changed or deleted:
+            # Clients fetch the changes with GET /api/tasks/changes rather than one event per task
+            publish_task_event(user_id, 'tasks.changed', version, since=encode_sync_token(version - 1))
         
         return jsonify({
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'pending_tasks': pending_tasks,
-            'in_progress_tasks': in_progress_tasks,
-            'overdue_tasks': overdue_tasks,
-            'completion_rate': round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2)
+            'message': 'Batch processed',
+            'succeeded': len(results) - failed,
+            'failed': failed,
+            'results': results
         }), 200
         
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Task import
+IMPORT_CONTENT_TYPES = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson', 'application/jsonl': 'ndjson'}
+MAX_IMPORT_BATCH_SIZE = 5000
+MAX_IMPORT_ERRORS = 1000
+
+def import_task_rows(user_id, rows, batch_size, on_batch=None):
+    """Create tasks from (line, data, error) rows, committing every `batch_size` rows.
+
+    Yields a progress event after each batch with that batch's row errors and
+    last line, and a final event with the totals. `on_batch(event)` is called
+    just before each commit, so changes it makes are committed with the batch.
+    An unreadable upload or a failed commit stops the import; batches
+    committed before it are kept.
+    """
+    imported = failed = batches = reported_errors = 0
+    status, message = 200, None
+    try:
+        for batch in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+            errors = [{'line': line, 'error': error} for line, data, error in batch if error is not None]
+            valid = [(line, data) for line, data, error in batch if error is None]
+            
+            # Look up every tag named in the batch with one query; rows that fail create none
+            tag_names = parse_tag_names(
+                name for _, data in valid if isinstance(data.get('tags'), list) for name in data['tags']
+            )
+            tags = find_tags(user_id, tag_names) if tag_names else {}
+            
+            tasks = []
+            counter_deltas = {}
+            for line, data in valid:
+                try:
+                    task = build_task(user_id, data, tags)
+                except ValueError as e:
+                    errors.append({'line': line, 'error': str(e)})
+                    continue
+                db.session.add(task)
+                task_counter_deltas(new_status=task.status, total_delta=1, deltas=counter_deltas)
+                tasks.append(task)
+            
+            if tasks:
+                version = apply_task_counter_deltas(user_id, counter_deltas)
+                for task in tasks:
+                    task.change_version = version
+            errors = sorted(errors, key=lambda error: error['line'])
+            event = {'batch': batches + 1, 'line': batch[-1][0], 'imported': imported + len(tasks),
+                     'failed': failed + len(errors), 'errors': errors[:max(0, MAX_IMPORT_ERRORS - reported_errors)]}
+            if on_batch:
+                on_batch(event)
+            db.session.commit()
+            if tasks:
+                invalidate_task_cache(user_id)
+                publish_task_event(user_id, 'tasks.changed', version, since=encode_sync_token(version - 1))
+            
+            batches, imported, failed = event['batch'], event['imported'], event['failed']
+            reported_errors += len(event['errors'])
+            yield event
+    except ValueError as e:
+        db.session.rollback()
+        status, message = 400, str(e)
+    except Exception as e:
+        db.session.rollback()
+        status, message = 500, f'Import stopped after {batches} batches: {e}'
+    
+    result = {'done': True, 'status': status, 'imported': imported, 'failed': failed, 'batches': batches}
+    if message:
+        result['error'] = message
+    yield result
+
+@api.route('/api/tasks/import', methods=['POST'])
+@jwt_required()
+def import_tasks():
+    """Create tasks from a CSV or NDJSON upload sent as the raw request body.
+
+    The format comes from ?format=csv|ndjson or the Content-Type, and a
+    gzip-compressed body is accepted with Content-Encoding: gzip. Rows are
+    validated like POST /api/tasks and inserted in transactions of
+    ?batch_size= rows (IMPORT_BATCH_SIZE by default). The response is a summary
+    with the first MAX_IMPORT_ERRORS row errors, or with
+    Accept: application/x-ndjson one progress event per batch as it commits.
+    With ?background=1 the upload is stored and imported by a worker instead.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        
+        import_format = request.args.get('format') or IMPORT_CONTENT_TYPES.get(request.mimetype)
+        if import_format not in ('csv', 'ndjson'):
+            return jsonify({'error': 'Send ?format=csv or ?format=ndjson, or a text/csv or application/x-ndjson body'}), 400
+        try:
+            batch_size = int(request.args.get('batch_size', current_app.config['IMPORT_BATCH_SIZE']))
+        except ValueError:
+            return jsonify({'error': 'batch_size must be an integer'}), 400
+        if batch_size < 1 or batch_size > MAX_IMPORT_BATCH_SIZE:
+            return jsonify({'error': f'batch_size must be between 1 and {MAX_IMPORT_BATCH_SIZE}'}), 400
+        
+        if request.args.get('background') in ('1', 'true'):
+            return enqueue_import_job(user_id, import_format, batch_size)
+        
+        # Read the body as it arrives instead of letting Flask buffer it
+        stream = request.stream
+        if request.content_encoding == 'gzip':
+            stream = gzip.GzipFile(fileobj=stream, mode='rb')
+        events = import_task_rows(user_id, read_task_rows(stream, import_format), batch_size)
+        
+        if request.accept_mimetypes.best == 'application/x-ndjson':
+            # Progress is only useful to clients that read the response while still uploading
+            body = (dumps(event) + b'\n' for event in events)
+            return Response(stream_with_context(body), status=200, mimetype='application/x-ndjson')
+        
+        errors = []
+        for event in events:
+            errors.extend(event.get('errors', ()))
+        status = event.pop('status')
+        del event['done']
+        event['errors'] = errors
+        event['message'] = 'Import finished' if status == 200 else 'Import stopped'
+        return jsonify(event), status
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+MAX_SYNC_CHANGES = 1000
+
+def encode_sync_token(version):
+    return base64.urlsafe_b64encode(json.dumps({'v': version}).encode('utf-8')).decode('ascii')
+
+def decode_sync_token(token):
+    """Decode a token produced by encode_sync_token, raising ValueError if malformed."""
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(token.encode('ascii')))['v'])
+    except Exception:
+        raise ValueError('Invalid sync token')
+
+@api.route('/api/tasks/changes', methods=['GET'])
+@jwt_required()
+def get_task_changes():
+    """Return tasks changed and deleted since a sync token.
+
+    Without `since`, or when more than MAX_SYNC_CHANGES tasks changed, the
+    response has `full_sync_required: true`: the client should reload
+    GET /api/tasks and continue syncing from the returned `next_since`.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        since = request.args.get('since')
+        
+        # Snapshot the current version first so changes committed meanwhile are picked up next time
+        current_version = get_task_version(user_id)
+        next_since = encode_sync_token(current_version)
+        
+        if not since:
+            return json_response({'full_sync_required': True, 'next_since': next_since})
+        try:
+            since_version = decode_sync_token(since)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        fields = list(TASK_FIELDS)
+        columns = task_columns(fields)
+        rows = Task.query.filter(
+            Task.user_id == user_id,
+            Task.change_version > since_version,
+            Task.change_version <= current_version
+        ).order_by(Task.change_version, Task.id).with_entities(
+            *[getattr(Task, name) for name in columns]
+        ).limit(MAX_SYNC_CHANGES + 1).all()
+        
+        if len(rows) > MAX_SYNC_CHANGES:
+            return json_response({'full_sync_required': True, 'next_since': next_since})
+        
+        serialize = task_row_serializer(fields, columns)
+        id_index = columns.index('id')
+        tags_by_task = load_task_tags([row[id_index] for row in rows])
+        
+        deleted = db.session.query(TaskTombstone.task_id).filter(
+            TaskTombstone.user_id == user_id,
+            TaskTombstone.change_version > since_version,
+            TaskTombstone.change_version <= current_version
+        ).order_by(TaskTombstone.change_version)
+        
+        return json_response({
+            'full_sync_required': False,
+            'changed': [serialize(row, tags_by_task) for row in rows],
+            'deleted': [task_id for (task_id,) in deleted],
+            'next_since': next_since
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Task events
+# Milliseconds an EventSource waits before reconnecting
+EVENT_RETRY_MS = 3000
+EVENT_STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def parse_last_event_id(value):
+    """The change version a reconnecting client last saw (its Last-Event-ID), or None."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('Last-Event-ID must be a change version')
+
+def open_task_event_stream(version, last_event_id):
+    """First chunk of an event stream: `ready` with the current version, plus `resync` if the client missed changes."""
+    chunk = format_sse('ready', {'version': version}, event_id=version, retry=EVENT_RETRY_MS)
+    if last_event_id is not None and last_event_id < version:
+        chunk += format_sse('resync', {'since': encode_sync_token(last_event_id)})
+    return chunk
+
+def render_task_events(subscription, last_version):
+    """Encode the events waiting on a subscription, returning (body, last version sent)."""
+    events, overflowed = subscription.take()
+    if overflowed:
+        # Events were dropped; the client catches up from the last version it was sent
+        return format_sse('resync', {'since': encode_sync_token(last_version)}), last_version
+    body = b''
+    for event in events:
+        body += format_sse(event['type'], event, event_id=event['version'])
+        last_version = max(last_version, event['version'])
+    return body, last_version
+
+def event_stream_open(claims, deadline):
+    """Whether a stream may stay open: before its deadline, with an unexpired and unrevoked token."""
+    return time.monotonic() < deadline and claims['exp'] > time.time() and not token_guard.is_revoked(claims)
+
+def stream_task_events(subscription, wake, claims, version, last_event_id, heartbeat, max_seconds):
+    deadline = time.monotonic() + max_seconds
+    yield open_task_event_stream(version, last_event_id)
+    while event_stream_open(claims, deadline):
+        if not wake.wait(min(heartbeat, max(0, deadline - time.monotonic()))):
+            yield KEEPALIVE
+            continue
+        wake.clear()
+        body, version = render_task_events(subscription, version)
+        if body:
+            yield body
+
+@api.route('/api/events', methods=['GET'])
+@jwt_required()
+def task_events():
+    """Stream the user's task events as Server-Sent Events until the token expires or the stream times out.
+
+    Events: `ready` on connect, then task.created / task.updated (with the
+    task), task.deleted (with its id), tasks.changed and stats.changed, each
+    carrying the change version as its id. `resync` means events were missed:
+    fetch GET /api/tasks/changes?since=<since>.
+    """
+    try:
+        if event_broker is None:
+            return jsonify({'error': 'Task events are disabled'}), 404
+        user_id = int(get_jwt_identity())
+        try:
+            last_event_id = parse_last_event_id(request.headers.get('Last-Event-ID'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        wake = threading.Event()
+        try:
+            subscription = event_broker.subscribe(user_id, wake.set)
+        except TooManyStreams as e:
+            return jsonify({'error': str(e)}), 429
+        try:
+            # Read the version after subscribing, so no write falls between the two
+            version = get_task_version(user_id)
+        except Exception:
+            event_broker.unsubscribe(subscription)
+            raise
+        
+        # No stream_with_context: the request's database session is released before the stream starts
+        body = stream_task_events(subscription, wake, get_jwt(), version, last_event_id,
+                                  current_app.config['EVENTS_HEARTBEAT_SECONDS'],
+                                  current_app.config['EVENTS_MAX_STREAM_SECONDS'])
+        response = Response(body, status=200, mimetype='text/event-stream', headers=EVENT_STREAM_HEADERS)
+        response.call_on_close(lambda: event_broker.unsubscribe(subscription))
+        return response
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Tag Routes
+@api.route('/api/tags', methods=['GET'])
+@jwt_required()
+def get_tags():
+    try:
+        user_id = int(get_jwt_identity())
+        
+        task_count = db.func.count(TaskTag.task_id)
+        rows = db.session.query(Tag.name, task_count).join(TaskTag, TaskTag.tag_id == Tag.id).filter(
+            Tag.user_id == user_id
+        ).group_by(Tag.id, Tag.name).order_by(task_count.desc(), Tag.name).all()
+        
+        return jsonify({'tags': [{'name': name, 'count': count} for name, count in rows]}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Statistics Route
+@api.route('/api/stats', methods=['GET'])
+@jwt_required()
+def get_stats():
+    try:
+        user_id = int(get_jwt_identity())
+        
+        mode = request.args.get('mode', current_app.config['STATS_MODE'])
+        if mode not in ('aggregate', 'counters'):
+            return jsonify({'error': "mode must be 'aggregate' or 'counters'"}), 400
+        
+        # Cached stats may report an overdue count up to CACHE_TTL seconds old
+        cache_key = None
+        if task_cache is not None:
+            cache_key = task_cache.key(user_id, 'stats', mode)
+            cached = task_cache.get(cache_key)
+            if cached is not None:
+                return cached_response(*cached)
+        
+        # Overdue depends on the current time, so it is always computed live (and is part of the ETag)
+        overdue_tasks = count_overdue_tasks(user_id)
+        
+        etag = make_etag(user_id, get_task_version(user_id), 'stats', overdue_tasks)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        
+        counts = get_task_counters(user_id) if mode == 'counters' else aggregate_task_counts(user_id)
+        
+        response = jsonify(task_stats_body(counts, overdue_tasks))
+        response.set_etag(etag, weak=True)
+        if cache_key:
+            task_cache.set(cache_key, etag, response.get_data())
+        return response, 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Background jobs
+ACCOUNT_DELETE_BATCH_SIZE = 1000
+
+def serialize_job(job):
+    def timestamp(value):
+        return value.isoformat() if value else None
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'progress': json.loads(job.progress) if job.progress else None,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'created_at': timestamp(job.created_at),
+        'started_at': timestamp(job.started_at),
+        'finished_at': timestamp(job.finished_at),
+        'retry_at': timestamp(job.run_at) if job.status == 'queued' and job.attempts else None
+    }
+
+def enqueue_job_response(kind, user_id, payload=None, prepare=None):
+    """Queue a job and answer 202 with its status URL, or 429 if the user already has too many pending.
+
+    `prepare(job)` runs after the job has an id and before it is committed, e.g. to store an upload.
+    """
+    if job_queue.pending_count(user_id) >= job_queue.max_pending_per_user:
+        return (jsonify({'error': 'Too many background jobs in progress, please retry later'}), 429,
+                {'Retry-After': '5'})
+    job = job_queue.enqueue(kind, user_id, payload)
+    if prepare:
+        prepare(job)
+    db.session.commit()
+    return jsonify({'message': 'Job queued', 'job': serialize_job(job)}), 202, {'Location': f'/api/jobs/{job.id}'}
+
+def enqueue_import_job(user_id, import_format, batch_size):
+    """Store the upload for a worker and queue its import."""
+    gzipped = request.content_encoding == 'gzip'
+    
+    def store_upload(job):
+        with open(job_queue.file_path(job.id, 'upload'), 'wb') as upload:
+            shutil.copyfileobj(request.stream, upload, IMPORT_READ_SIZE)
+    
+    payload = {'format': import_format, 'batch_size': batch_size, 'gzip': gzipped}
+    return enqueue_job_response('import_tasks', user_id, payload, prepare=store_upload)
+
+@job_queue.handler('export_tasks')
+def run_export_job(job, report_progress):
+    payload = json.loads(job.payload)
+    try:
+        params = parse_task_list_args(MultiDict(payload['args']))
+    except ValueError as e:
+        raise JobFailed(str(e))
+    
+    path = job_queue.file_path(job.id, 'result')
+    size = 0
+    with open(path + '.part', 'wb') as result:
+        for chunk in export_task_body(job.user_id, params, payload['format']):
+            result.write(chunk)
+            size += len(chunk)
+    os.replace(path + '.part', path)
+    return {'format': payload['format'], 'bytes': size, 'download_url': f'/api/jobs/{job.id}/result'}
+
+@job_queue.handler('import_tasks')
+def run_import_job(job, report_progress):
+    payload = json.loads(job.payload)
+    # A retry resumes after the last batch committed by the previous attempt
+    done = json.loads(job.progress) if job.progress else {'line': 0, 'imported': 0, 'failed': 0, 'errors': []}
+    progress = dict(done)
+    
+    def record_batch(event):
+        # Committed together with the batch, so a retry never imports the same rows twice
+        progress.update(
+            line=event['line'],
+            imported=done['imported'] + event['imported'],
+            failed=done['failed'] + event['failed'],
+            errors=(progress['errors'] + event['errors'])[:MAX_IMPORT_ERRORS]
+        )
+        job.progress = json.dumps(progress)
+    
+    path = job_queue.file_path(job.id, 'upload')
+    open_upload = gzip.open if payload['gzip'] else open
+    with open_upload(path, 'rb') as upload:
+        rows = (row for row in read_task_rows(upload, payload['format']) if row[0] > done['line'])
+        for event in import_task_rows(job.user_id, rows, payload['batch_size'], on_batch=record_batch):
+            pass
+    
+    if event['status'] == 400:
+        raise JobFailed(event['error'])
+    if event['status'] != 200:
+        raise RuntimeError(event['error'])
+    os.remove(path)
+    return progress
+
+@job_queue.handler('recompute_stats')
+def run_recompute_stats_job(job, report_progress):
+    user_id = job.user_id
+    get_task_stats_row(user_id)
+    # Bump the version first: the row lock makes concurrent task writes wait for the recount below
+    version = apply_task_counter_deltas(user_id, {})
+    counts = aggregate_task_counts(user_id)
+    table = UserTaskStats.__table__
+    db.session.execute(table.update().where(table.c.user_id == user_id).values(counts))
+    db.session.commit()
+    invalidate_task_cache(user_id)
+    publish_task_event(user_id, 'stats.changed', version)
+    return {**counts, 'version': version}
+
+@job_queue.handler('delete_account')
+def run_delete_account_job(job, report_progress):
+    user_id = job.user_id
+    deleted = 0
+    # Bulk deletes in batches instead of loading every task through the User.tasks cascade
+    while True:
+        task_ids = db.session.execute(
+            db.select(Task.id).filter_by(user_id=user_id).limit(ACCOUNT_DELETE_BATCH_SIZE)
+        ).scalars().all()
+        if not task_ids:
+            break
+        db.session.execute(TaskTag.__table__.delete().where(TaskTag.task_id.in_(task_ids)))
+        db.session.execute(Task.__table__.delete().where(Task.id.in_(task_ids)))
+        db.session.commit()
+        deleted += len(task_ids)
+        report_progress({'deleted_tasks': deleted})
+    
+    for model in (Tag, TaskTombstone, UserTaskStats):
+        db.session.execute(model.__table__.delete().where(model.user_id == user_id))
+    db.session.execute(User.__table__.delete().where(User.id == user_id))
+    db.session.commit()
+    invalidate_task_cache(user_id)
+    return {'deleted_tasks': deleted}
+
+@api.route('/api/jobs', methods=['GET'])
+@jwt_required()
+def list_jobs():
+    try:
+        user_id = int(get_jwt_identity())
+        jobs = Job.query.filter_by(user_id=user_id).order_by(Job.created_at.desc(), Job.id.desc()).limit(50).all()
+        return json_response({'jobs': [serialize_job(job) for job in jobs]})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    try:
+        user_id = int(get_jwt_identity())
+        job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return json_response({'job': serialize_job(job)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/jobs/<int:job_id>/result', methods=['GET'])
+@jwt_required()
+def download_job_result(job_id):
+    try:
+        user_id = int(get_jwt_identity())
+        job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        if job.kind != 'export_tasks' or job.status != 'succeeded':
+            return jsonify({'error': 'Job has no file to download'}), 409
+        
+        path = job_queue.file_path(job.id, 'result')
+        if not os.path.exists(path):
+            return jsonify({'error': 'Export file has expired'}), 410
+        content_type, extension = EXPORT_FORMATS[json.loads(job.payload)['format']]
+        # send_file adds the charset to text/* types itself
+        return send_file(os.path.abspath(path), mimetype=content_type.split(';')[0], as_attachment=True,
+                         download_name=f'tasks.{extension}')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_job(job_id):
+    try:
+        user_id = int(get_jwt_identity())
+        job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        if not job_queue.cancel(job):
+            return jsonify({'error': 'Job has already started'}), 409
+        db.session.refresh(job)
+        return json_response({'message': 'Job cancelled', 'job': serialize_job(job)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/stats/recompute', methods=['POST'])
+@jwt_required()
+def recompute_stats():
+    try:
+        return enqueue_job_response('recompute_stats', int(get_jwt_identity()))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/auth/account', methods=['DELETE'])
+@jwt_required()
+def delete_account():
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        if not data.get('password'):
+            return jsonify({'error': 'Password is required to delete the account'}), 400
+        
+        user = db.session.get(User, user_id)
+        if not user or not password_hasher.check(user.password_hash, data['password']):
+            return jsonify({'error': 'Invalid password'}), 401
+        
+        job = job_queue.enqueue('delete_account', user_id)
+        # Free the email and stop logins right away; the worker removes the data
+        user.email = f'deleted-{user.id}@deleted.invalid'
+        db.session.commit()
+        token_guard.revoke_user(user_id)
+        
+        return jsonify({'message': 'Account scheduled for deletion', 'job': serialize_job(job)}), 202
+        
+    except PasswordHasherBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Cache statistics route
+@api.route('/api/cache/stats', methods=['GET'])
+@instrumentation.metrics_token_required
+def cache_stats():
+    if task_cache is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **task_cache.stats()}), 200
+
 # Health check route
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'message': 'ToDo API is running'}), 200
 
-# Database initialization route (for manual table creation)
-@app.route('/api/init-db', methods=['POST'])
+# Database initialization route (for manual schema migration)
+@api.route('/api/init-db', methods=['POST'])
 def init_database():
     try:
-        with app.app_context():
-            db.create_all()
-            return jsonify({'message': 'Database tables created successfully'}), 200
+        applied = migrations.upgrade(db)
+        return jsonify({'message': 'Database schema is up to date', 'applied_migrations': applied}), 200
     except Exception as e:
-        return jsonify({'error': f'Failed to create database tables: {str(e)}'}), 500
+        return jsonify({'error': f'Failed to migrate database: {str(e)}'}), 500
 
-# Initialize database tables
-def create_tables():
-    with app.app_context():
-        try:
-            db.create_all()
-            print("Database tables created successfully")
-        except Exception as e:
-            print(f"Error creating database tables: {e}")
+@api.cli.command('db-upgrade')
+def db_upgrade_command():
+    """Apply pending schema migrations."""
+    applied = migrations.upgrade(db)
+    print(f"Applied migrations: {applied}" if applied else "Database schema is up to date")
+
+# Application factory
+def create_app(config=None):
+    """Build the Flask app from the environment (and .env), with `config` overriding it.
 
-# Create tables when the app starts
-create_tables()
+    Opens no database connection: the pool connects on the first query, and
+    the schema is created separately with `python migrations.py` (or
+    `flask --app app db-upgrade`) before the app is started.
+    """
+    global task_cache, password_hasher, rate_limiter, token_guard, event_broker
+    load_dotenv()
+    app = Flask(__name__)
+    load_config(app.config, os.environ)
+    app.config.update(config or {})
+    resolve_database_uri(app.config)
+    
+    # Initialize extensions
+    database.init_app(app)
+    db.init_app(app)
+    with app.app_context():
+        database.install_sqlite_pragmas(db.engine, app.config)
+        database.track_engine(db.engine)
+    jwt.init_app(app)
+    CORS(app)
+    compression.init_app(app)
+    task_cache = create_task_cache(app.config)
+    password_hasher = create_password_hasher(app.config)
+    rate_limiter = create_rate_limiter(app.config)
+    with app.app_context():
+        token_guard = create_token_guard(app.config, db.engine, RevokedToken.__table__)
+    event_broker = create_event_broker(app.config)
+    job_queue.init_app(app)
+    
+    # Request instrumentation (opt-in)
+    instrumentation.init_app(app)
+    instrumentation.register_collector(app, password_hasher.render_metrics)
+    if rate_limiter is not None:
+        instrumentation.register_collector(app, rate_limiter.render_metrics)
+    instrumentation.register_collector(app, token_guard.render_metrics)
+    if event_broker is not None:
+        instrumentation.register_collector(app, event_broker.render_metrics)
+    
+    app.register_blueprint(api)
+    return app
 
 if __name__ == '__main__':
+    app = create_app()
+    print(database.describe(app.config))
     # Get port from environment variable (for Render) or use 5001 for local development
     port = int(os.environ.get('PORT', 5001))
     app.run(debug=False, host='0.0.0.0', port=port)
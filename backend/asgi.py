@@ -0,0 +1,556 @@
+"""
+ASGI entry point for the ToDo API with async request handlers.
+
+    pip install -r requirements-asgi.txt
+    python migrations.py
+    uvicorn asgi:app --workers 4
+
+Auth, the task list and task create/update/delete, stats, the task event
+stream and health run as async handlers on an async engine (aiosqlite for SQLite, asyncpg for
+PostgreSQL) pointed at the same database as the Flask app. Models,
+validation, serialization and the counter / change-version bookkeeping are
+shared with app.py: sync ORM helpers run on the async connection through
+AsyncSession.run_sync. Every other route (batch, sync, tags, ...) is passed
+through to the Flask app, so both entry points expose the same API.
+
+Responses are not served from the response cache here, but writes still
+invalidate it so Flask workers sharing a Redis cache stay consistent.
+Task events go through the same broker as the Flask routes, so streams opened
+here also see writes handled by the mounted Flask app.
+"""
+import asyncio
+import contextlib
+import time
+
+from flask_jwt_extended import decode_token
+from jwt import ExpiredSignatureError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # optional dependency; Starlette's adapter is deprecated but equivalent
+    from starlette.middleware.wsgi import WSGIMiddleware
+
+import database
+from app import (DEFAULT_TASK_SORT, EVENT_STREAM_HEADERS, Task, User, adjust_task_counters, aggregate_task_counts,
+                 apply_task_updates, build_task, count_overdue_tasks, create_app, db, due_window_key, event_stream_open,
+                 filter_task_query, get_or_create_tags, get_task_counters, get_task_version, invalidate_task_cache,
+                 issue_tokens, load_task_tags, make_etag, open_task_event_stream, parse_last_event_id,
+                 parse_tag_names, parse_task_list_args, publish_task_event, record_task_deletion,
+                 render_task_events, task_list_cursor, task_stats_body, task_tag_names, user_is_active)
+from compression import CompressionMiddleware, CompressionSettings
+from events import KEEPALIVE, TooManyStreams
+from passwords import PasswordHasherBusy
+from ratelimit import client_ip
+from serialization import (STREAM_CHUNK_SIZE, TASK_FIELDS, dumps, serialize_task, task_columns,
+                           task_row_serializer)
+
+
+def async_database_url(url):
+    """Swap the sync driver in a SQLAlchemy URL for its async counterpart."""
+    backend = url.get_backend_name()
+    if backend == 'sqlite':
+        return url.set(drivername='sqlite+aiosqlite')
+    if backend == 'postgresql':
+        # asyncpg takes `ssl` where libpq takes `sslmode`
+        query = dict(url.query)
+        if 'sslmode' in query:
+            query['ssl'] = query.pop('sslmode')
+        return url.set(drivername='postgresql+asyncpg', query=query)
+    raise ValueError(f'No async driver configured for {backend}')
+
+
+flask_app = create_app()
+# Built by create_app
+from app import event_broker, password_hasher, rate_limiter, token_guard  # noqa: E402
+
+# The Flask engine has the resolved database URL; it is also used to detect the full-text backend on the
+# first search (no connection is made before then)
+with flask_app.app_context():
+    sync_engine = db.engine
+
+engine = create_async_engine(async_database_url(sync_engine.url), **database.engine_options(flask_app.config))
+database.install_sqlite_pragmas(engine.sync_engine, flask_app.config)
+database.track_engine(engine.sync_engine)
+# Objects stay usable after commit, since expired attributes cannot be lazy-loaded from async code
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+
+# Responses
+def json_body(obj, status=200, etag=None, headers=None):
+    if etag:
+        headers = {**(headers or {}), 'ETag': f'W/"{etag}"'}
+    return Response(dumps(obj), status_code=status, media_type='application/json', headers=headers)
+
+
+def error(message, status):
+    return json_body({'error': message}, status)
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix('W/').strip('"') for tag in header.split(',')]
+    return '*' in tags or etag in tags
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers={'ETag': f'W/"{etag}"'})
+
+
+def query_args_key(request):
+    """Same key as app.request_args_key, so ETags match between the two entry points."""
+    return '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.multi_items()))
+
+
+# Authentication
+def tokens_body(user_id):
+    with flask_app.app_context():
+        return issue_tokens(user_id)
+
+
+async def user_exists(user_id):
+    """token_guard.user_exists with the user row looked up on the async engine on a cache miss."""
+    if user_id in token_guard.users:
+        return True
+    async with Session() as session:
+        exists = await session.run_sync(lambda s: user_is_active(user_id, s))
+    if exists:
+        token_guard.users.add(user_id)
+    return exists
+
+
+def jwt_required(handler):
+    """Check the bearer token like flask_jwt_extended and pass the user id to the handler.
+
+    The decoded claims are kept in request.state.claims.
+    """
+    async def wrapper(request):
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return json_body({'msg': 'Missing Authorization Header'}, 401)
+        try:
+            with flask_app.app_context():
+                claims = decode_token(header[len('Bearer '):])
+        except ExpiredSignatureError:
+            return json_body({'msg': 'Token has expired'}, 401)
+        except Exception as e:
+            return json_body({'msg': str(e)}, 422)
+        if claims.get('type') != 'access':
+            return json_body({'msg': 'Only non-refresh tokens are allowed'}, 422)
+        if await run_in_threadpool(token_guard.is_revoked, claims):
+            return json_body({'msg': 'Token has been revoked'}, 401)
+        user_id = int(claims[flask_app.config['JWT_IDENTITY_CLAIM']])
+        if not await user_exists(user_id):
+            return json_body({'msg': f'Error loading the user {user_id}'}, 401)
+        request.state.claims = claims
+        return await handler(request, user_id)
+    return wrapper
+
+
+def rate_limit_exceeded(request, route, data):
+    """Same check as app.rate_limited: a 429 response if over the route's limits, else None."""
+    if rate_limiter is None:
+        return None
+    email = data.get('email') if isinstance(data, dict) else None
+    ip = client_ip(request.client.host if request.client else None, request.headers.get('X-Forwarded-For'),
+                   flask_app.config['TRUSTED_PROXIES'])
+    retry_after = rate_limiter.hit(route, ip, email)
+    if retry_after:
+        return json_body({'error': 'Too many requests, please retry later'}, 429,
+                         headers={'Retry-After': str(retry_after)})
+    return None
+
+
+def user_body(user):
+    return {'id': user.id, 'name': user.name, 'email': user.email}
+
+
+async def register(request):
+    try:
+        data = await request.json()
+
+        limited = rate_limit_exceeded(request, 'register', data)
+        if limited:
+            return limited
+
+        if not data.get('name') or not data.get('email') or not data.get('password'):
+            return error('Name, email, and password are required', 400)
+
+        async with Session() as session:
+            if (await session.execute(select(User.id).filter_by(email=data['email']))).first():
+                return error('User with this email already exists', 400)
+
+            # Waiting on the hashing pool blocks, so do it off the event loop
+            password_hash = await run_in_threadpool(password_hasher.hash, data['password'])
+            user = User(name=data['name'], email=data['email'], password_hash=password_hash)
+            session.add(user)
+            await session.commit()
+
+        return json_body({
+            'message': 'User created successfully',
+            **tokens_body(user.id),
+            'user': user_body(user)
+        }, 201)
+
+    except PasswordHasherBusy as e:
+        return json_body({'error': str(e)}, 503, headers={'Retry-After': str(e.retry_after)})
+    except Exception as e:
+        return error(str(e), 500)
+
+
+async def login(request):
+    try:
+        data = await request.json()
+
+        limited = rate_limit_exceeded(request, 'login', data)
+        if limited:
+            return limited
+
+        if not data.get('email') or not data.get('password'):
+            return error('Email and password are required', 400)
+
+        async with Session() as session:
+            user = (await session.execute(select(User).filter_by(email=data['email']))).scalars().first()
+
+            if user and await run_in_threadpool(password_hasher.check, user.password_hash, data['password']):
+                # Upgrade hashes made with a different BCRYPT_LOG_ROUNDS while the password is at hand
+                if password_hasher.needs_rehash(user.password_hash):
+                    try:
+                        user.password_hash = await run_in_threadpool(password_hasher.hash, data['password'])
+                        await session.commit()
+                    except PasswordHasherBusy:
+                        # Keep the old hash; it is upgraded on a later login
+                        pass
+                return json_body({
+                    'message': 'Login successful',
+                    **tokens_body(user.id),
+                    'user': user_body(user)
+                })
+        if rate_limiter is not None:
+            rate_limiter.record_failure('login', email=data['email'])
+        return error('Invalid email or password', 401)
+
+    except PasswordHasherBusy as e:
+        return json_body({'error': str(e)}, 503, headers={'Retry-After': str(e.retry_after)})
+    except Exception as e:
+        return error(str(e), 500)
+
+
+# Tasks
+async def stream_task_rows(session, statement, serialize, id_index, with_tags):
+    """Async counterpart of serialization.stream_task_list, reading the rows in chunks."""
+    try:
+        yield b'{"tasks":['
+        first = True
+        result = await session.stream(statement.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        async for rows in result.partitions():
+            tags_by_task = {}
+            if with_tags:
+                task_ids = [row[id_index] for row in rows]
+                tags_by_task = await session.run_sync(lambda s: load_task_tags(task_ids, s))
+            body = b','.join(dumps(serialize(row, tags_by_task)) for row in rows)
+            yield body if first else b',' + body
+            first = False
+        yield b']}'
+    finally:
+        await session.close()
+
+
+@jwt_required
+async def get_tasks(request, user_id):
+    session = Session()
+    try:
+        try:
+            params = parse_task_list_args(request.query_params)
+        except ValueError as e:
+            return error(str(e), 400)
+
+        fields = params['fields'] or list(TASK_FIELDS)
+        columns = task_columns(fields, (params['sort'] or DEFAULT_TASK_SORT)[0])
+        statement = select(*[getattr(Task, name) for name in columns]).where(Task.user_id == user_id)
+        statement = filter_task_query(statement, user_id, params, sync_engine)
+
+        if params['explain']:
+            if not flask_app.config['TASK_QUERY_EXPLAIN']:
+                return error('Query plans are disabled, set TASK_QUERY_EXPLAIN=true', 403)
+            if params['paginate']:
+                statement = statement.limit(params['limit'] + 1)
+            plan = await session.run_sync(lambda s: database.explain_query(s.connection(), statement))
+            return json_body(plan)
+
+        version = await session.run_sync(lambda s: get_task_version(user_id, s))
+        window_key = await session.run_sync(lambda s: due_window_key(user_id, params, s))
+        etag = make_etag(user_id, version, 'tasks', query_args_key(request), window_key)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        serialize = task_row_serializer(fields, columns)
+        id_index = columns.index('id')
+
+        if not params['paginate']:
+            body = stream_task_rows(session, statement, serialize, id_index, 'tags' in fields)
+            session = None  # closed by the stream
+            return StreamingResponse(body, media_type='application/json', headers={'ETag': f'W/"{etag}"'})
+
+        limit = params['limit']
+        rows = (await session.execute(statement.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        tags_by_task = {}
+        if 'tags' in fields:
+            task_ids = [row[id_index] for row in rows]
+            tags_by_task = await session.run_sync(lambda s: load_task_tags(task_ids, s))
+
+        next_cursor = None
+        if has_more:
+            next_cursor = task_list_cursor(rows[-1], params)
+
+        return json_body({'tasks': [serialize(row, tags_by_task) for row in rows], 'next_cursor': next_cursor},
+                         etag=etag)
+
+    except Exception as e:
+        return error(str(e), 500)
+    finally:
+        if session is not None:
+            await session.close()
+
+
+def task_written(user_id, event_type, version, **data):
+    """Invalidate the response cache and publish the task event once a write is committed."""
+    invalidate_task_cache(user_id)
+    publish_task_event(user_id, event_type, version, **data)
+
+
+def committed_task_data(session, task):
+    """(change version, serialized task) read back after the commit, as the Flask routes serialize their tasks.
+
+    The in-memory values are not the stored ones (tz-aware datetimes, which the
+    database keeps as naive UTC), so the task is reloaded rather than serialized as built.
+    """
+    session.expire(task)
+    return task.change_version, serialize_task(task, task_tag_names(task))
+
+
+def resolve_tags(session, user_id, data):
+    """Load or create the tags named in request data, so build_task/apply_task_updates need no lookups."""
+    names = parse_tag_names(data['tags']) if isinstance(data.get('tags'), list) else []
+    return get_or_create_tags(user_id, names, session) if names else None
+
+
+@jwt_required
+async def create_task(request, user_id):
+    try:
+        data = await request.json()
+
+        def create(session):
+            task = build_task(user_id, data, resolve_tags(session, user_id, data))
+            session.add(task)
+            task.change_version = adjust_task_counters(user_id, new_status=task.status, total_delta=1,
+                                                       session=session)
+            return task
+
+        async with Session() as session:
+            try:
+                task = await session.run_sync(create)
+            except ValueError as e:
+                return error(str(e), 400)
+            await session.commit()
+            version, task_data = await session.run_sync(committed_task_data, task)
+        await run_in_threadpool(task_written, user_id, 'task.created', version, task=task_data)
+
+        return json_body({'message': 'Task created successfully', 'task': task_data}, 201)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+
+@jwt_required
+async def update_task(request, user_id):
+    try:
+        task_id = request.path_params['task_id']
+        data = await request.json()
+
+        def update(session):
+            task = session.query(Task).filter_by(id=task_id, user_id=user_id).first()
+            if not task:
+                return None
+            old_status = task.status
+            apply_task_updates(task, data, resolve_tags(session, user_id, data))
+            task.change_version = adjust_task_counters(user_id, old_status=old_status, new_status=task.status,
+                                                       session=session)
+            return task
+
+        async with Session() as session:
+            try:
+                task = await session.run_sync(update)
+            except ValueError as e:
+                return error(str(e), 400)
+            if task is None:
+                return error('Task not found', 404)
+            await session.commit()
+            version, task_data = await session.run_sync(committed_task_data, task)
+        await run_in_threadpool(task_written, user_id, 'task.updated', version, task=task_data)
+
+        return json_body({'message': 'Task updated successfully', 'task': task_data})
+
+    except Exception as e:
+        return error(str(e), 500)
+
+
+@jwt_required
+async def delete_task(request, user_id):
+    try:
+        task_id = request.path_params['task_id']
+
+        def delete(session):
+            task = session.query(Task).filter_by(id=task_id, user_id=user_id).first()
+            if not task:
+                return None
+            session.delete(task)
+            version = adjust_task_counters(user_id, old_status=task.status, total_delta=-1, session=session)
+            record_task_deletion(task, version, session)
+            return version
+
+        async with Session() as session:
+            version = await session.run_sync(delete)
+            if version is None:
+                return error('Task not found', 404)
+            await session.commit()
+        await run_in_threadpool(task_written, user_id, 'task.deleted', version, id=task_id)
+
+        return json_body({'message': 'Task deleted successfully'})
+
+    except Exception as e:
+        return error(str(e), 500)
+
+
+# Statistics
+@jwt_required
+async def get_stats(request, user_id):
+    try:
+        mode = request.query_params.get('mode', flask_app.config['STATS_MODE'])
+        if mode not in ('aggregate', 'counters'):
+            return error("mode must be 'aggregate' or 'counters'", 400)
+
+        async with Session() as session:
+            overdue_tasks = await session.run_sync(lambda s: count_overdue_tasks(user_id, s))
+            version = await session.run_sync(lambda s: get_task_version(user_id, s))
+            etag = make_etag(user_id, version, 'stats', overdue_tasks)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            if mode == 'counters':
+                counts = await session.run_sync(lambda s: get_task_counters(user_id, s))
+            else:
+                counts = await session.run_sync(lambda s: aggregate_task_counts(user_id, s))
+
+        return json_body(task_stats_body(counts, overdue_tasks), etag=etag)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+
+# Task events
+class EventStreamResponse(StreamingResponse):
+    """Streams task events and releases the subscription however the connection ends."""
+
+    def __init__(self, body, subscription):
+        super().__init__(body, media_type='text/event-stream', headers=EVENT_STREAM_HEADERS)
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            event_broker.unsubscribe(self.subscription)
+            await self.body_iterator.aclose()
+
+
+async def stream_task_events(subscription, wake, claims, version, last_event_id):
+    """Async counterpart of app.stream_task_events."""
+    deadline = time.monotonic() + flask_app.config['EVENTS_MAX_STREAM_SECONDS']
+    yield open_task_event_stream(version, last_event_id)
+    while event_stream_open(claims, deadline):
+        timeout = min(flask_app.config['EVENTS_HEARTBEAT_SECONDS'], max(0, deadline - time.monotonic()))
+        try:
+            await asyncio.wait_for(wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            yield KEEPALIVE
+            continue
+        wake.clear()
+        body, version = render_task_events(subscription, version)
+        if body:
+            yield body
+
+
+@jwt_required
+async def task_events(request, user_id):
+    try:
+        if event_broker is None:
+            return error('Task events are disabled', 404)
+        try:
+            last_event_id = parse_last_event_id(request.headers.get('Last-Event-ID'))
+        except ValueError as e:
+            return error(str(e), 400)
+
+        # Publishers may run on other threads (Flask routes, the Redis listener)
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        try:
+            subscription = event_broker.subscribe(user_id, lambda: loop.call_soon_threadsafe(wake.set))
+        except TooManyStreams as e:
+            return error(str(e), 429)
+        try:
+            # Read the version after subscribing, so no write falls between the two
+            async with Session() as session:
+                version = await session.run_sync(lambda s: get_task_version(user_id, s))
+        except Exception:
+            event_broker.unsubscribe(subscription)
+            raise
+
+        body = stream_task_events(subscription, wake, request.state.claims, version, last_event_id)
+        return EventStreamResponse(body, subscription)
+
+    except Exception as e:
+        return error(str(e), 500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    print(database.describe(flask_app.config))
+    yield
+    await engine.dispose()
+
+
+async def health_check(request):
+    return json_body({'status': 'healthy', 'message': 'ToDo API is running'})
+
+
+app = Starlette(
+    routes=[
+        Route('/api/auth/register', register, methods=['POST']),
+        Route('/api/auth/login', login, methods=['POST']),
+        Route('/api/tasks', get_tasks, methods=['GET']),
+        Route('/api/tasks', create_task, methods=['POST']),
+        Route('/api/tasks/{task_id:int}', update_task, methods=['PUT']),
+        Route('/api/tasks/{task_id:int}', delete_task, methods=['DELETE']),
+        Route('/api/stats', get_stats, methods=['GET']),
+        Route('/api/events', task_events, methods=['GET']),
+        Route('/api/health', health_check, methods=['GET']),
+        # Everything else is served by the Flask app
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+                # Flask responses arrive already compressed and pass through unchanged
+                Middleware(CompressionMiddleware, settings=CompressionSettings.from_config(flask_app.config))],
+    lifespan=lifespan,
+)
@@ -0,0 +1,274 @@
+"""
+Token revocation and the per-request user check for JWT-protected routes.
+
+Access tokens are short-lived and paired with a long-lived refresh token
+(POST /api/auth/refresh), so a stolen or logged-out token stops working
+quickly without users having to log in again. Every authenticated request is
+checked against:
+
+    - the revocation list: revoked token ids (jti) and per-user "revoked
+      before" timestamps, which invalidate every token of a user issued before
+      that moment (logout everywhere, deleted accounts). Tokens carry their
+      issue time to the microsecond (the `iat_precise` claim), so a login
+      right after "logout everywhere" is not caught by it;
+    - the active-user cache: a small LRU of user ids recently seen to exist,
+      so the user row is only queried on a miss or after the TTL.
+
+With the database backend, keys found not revoked (a token's jti, a user's
+"revoked before") are remembered per process for TOKEN_REVOCATION_CACHE_TTL
+seconds. A token is looked up at most once per TTL in each worker, and SSE
+heartbeats are answered from the cache. A revocation applies at once in the
+worker that made it and within the TTL in the others.
+
+    JWT_ACCESS_TOKEN_MINUTES=15       access token lifetime
+    JWT_REFRESH_TOKEN_DAYS=30         refresh token lifetime
+    TOKEN_REVOCATION_BACKEND=database 'database', 'redis' or 'memory'
+    TOKEN_REVOCATION_CACHE_TTL=5      seconds a key found not revoked in the database is trusted
+                                      (0 = query every request; capped at the access token lifetime)
+    ACTIVE_USER_CACHE_SIZE=10000      user ids kept in the cache (0 = query every request)
+    ACTIVE_USER_CACHE_TTL=300         seconds before a cached user is checked again
+
+Backends:
+    DatabaseRevocationStore - the revoked_token table of the app database,
+                              shared by all workers; one primary key lookup
+                              per token and worker every TOKEN_REVOCATION_CACHE_TTL
+                              seconds (CachedRevocationStore), on a connection
+                              of the app's pool.
+    RedisRevocationStore    - any redis-py compatible client, shared by all
+                              workers; one MGET per request.
+    MemoryRevocationStore   - in-process. Each worker only sees its own
+                              revocations, so it is only for a single process
+                              (gunicorn.conf.py refuses it with several workers).
+
+Code that deletes a user should call TokenGuard.revoke_user so other workers
+stop accepting the user's tokens before their cached entry expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+
+class ActiveUserCache:
+    """Thread-safe LRU of user ids known to exist (or other keys), each trusted for `ttl` seconds."""
+
+    def __init__(self, max_entries=10000, ttl=300, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # user id -> expires_at
+        self._lock = threading.Lock()
+
+    def __contains__(self, user_id):
+        with self._lock:
+            expires_at = self._entries.get(user_id)
+            if expires_at is None or expires_at <= self.clock():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return False
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return True
+
+    def add(self, user_id):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[user_id] = self.clock() + self.ttl
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+class MemoryRevocationStore:
+    """In-process revocation entries that expire with the tokens they refer to."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._entries = {}  # key -> (value, expires_at)
+        self._next_purge = 0
+        self._lock = threading.Lock()
+
+    def set(self, key, value, ttl):
+        now = self.clock()
+        with self._lock:
+            self._entries[key] = (value, now + ttl)
+            # Entries are never evicted early (that would un-revoke a token), only once expired
+            if now >= self._next_purge:
+                self._entries = {k: entry for k, entry in self._entries.items() if entry[1] > now}
+                self._next_purge = now + 60
+
+    def get_many(self, keys):
+        now = self.clock()
+        with self._lock:
+            entries = [self._entries.get(key) for key in keys]
+        return [entry[0] if entry and entry[1] > now else None for entry in entries]
+
+
+class RedisRevocationStore:
+    """Revocation entries in Redis, expired by Redis itself."""
+
+    def __init__(self, client, prefix='todo:revoked:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis  # optional dependency, only needed for TOKEN_REVOCATION_BACKEND=redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def get_many(self, keys):
+        return self.client.mget([self.prefix + key for key in keys])
+
+
+class DatabaseRevocationStore:
+    """Revocation entries in a table of the app database (see RevokedToken in app.py)."""
+
+    def __init__(self, engine, table, clock=time.time):
+        self.engine = engine
+        self.table = table
+        self.clock = clock
+        self._next_purge = 0
+
+    def set(self, key, value, ttl):
+        try:
+            self._write(key, value, ttl)
+        except IntegrityError:
+            # Inserted by another worker between our update and insert: overwrite it
+            self._write(key, value, ttl)
+
+    def _write(self, key, value, ttl):
+        now = self.clock()
+        table = self.table
+        values = {'value': value, 'expires_at': now + ttl}
+        # Own connection and transaction, never the request's session
+        with self.engine.begin() as conn:
+            if not conn.execute(update(table).where(table.c.key == key).values(**values)).rowcount:
+                conn.execute(insert(table).values(key=key, **values))
+            if now >= self._next_purge:
+                conn.execute(delete(table).where(table.c.expires_at <= now))
+                self._next_purge = now + 60
+
+    def get_many(self, keys):
+        table = self.table
+        with self.engine.connect() as conn:
+            values = dict(conn.execute(
+                select(table.c.key, table.c.value).where(table.c.key.in_(keys), table.c.expires_at > self.clock())
+            ).all())
+        return [values.get(key) for key in keys]
+
+
+class CachedRevocationStore:
+    """Another store behind a per-process cache of the keys it did not have (not revoked)."""
+
+    def __init__(self, store, ttl=5, max_entries=10000):
+        self.store = store
+        self.absent = ActiveUserCache(max_entries=max_entries, ttl=ttl)
+
+    def set(self, key, value, ttl):
+        self.store.set(key, value, ttl)
+        self.absent.discard(key)
+
+    def get_many(self, keys):
+        missing = [key for key in keys if key not in self.absent]
+        values = dict(zip(missing, self.store.get_many(missing))) if missing else {}
+        for key, value in values.items():
+            if value is None:
+                self.absent.add(key)
+        return [values.get(key) for key in keys]
+
+
+class TokenGuard:
+    """Checks decoded JWT claims against the revocation list and the active-user cache."""
+
+    def __init__(self, store, users, max_token_lifetime, clock=time.time):
+        self.store = store
+        self.users = users
+        self.max_token_lifetime = max_token_lifetime  # seconds; how long a per-user revocation must be kept
+        self.clock = clock
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def issued_at_claims(self):
+        """Extra claims for a new token: its issue time to the microsecond (`iat` only has whole seconds)."""
+        return {'iat_precise': round(self.clock(), 6)}
+
+    def is_revoked(self, claims):
+        token_revoked, revoked_before = self.store.get_many([f"jti:{claims['jti']}", f"user:{claims['sub']}"])
+        revoked = token_revoked is not None or (
+            revoked_before is not None and self._issued_before(claims, float(revoked_before)))
+        if revoked:
+            with self._lock:
+                self.rejected += 1
+        return revoked
+
+    @staticmethod
+    def _issued_before(claims, revoked_before):
+        if 'iat_precise' in claims:
+            return claims['iat_precise'] < revoked_before
+        # Tokens issued without the claim: whole seconds, so the whole second of the revocation counts
+        return claims.get('iat', 0) <= int(revoked_before)
+
+    def revoke_token(self, claims):
+        """Revoke one token until it would have expired anyway."""
+        ttl = claims.get('exp', self.clock() + self.max_token_lifetime) - self.clock()
+        if ttl > 0:
+            self.store.set(f"jti:{claims['jti']}", 1, ttl + 1)
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to a user up to now."""
+        self.store.set(f'user:{user_id}', round(self.clock(), 6), self.max_token_lifetime + 1)
+        self.users.discard(user_id)
+
+    def user_exists(self, user_id, lookup):
+        """True if the user is cached as active, else ask `lookup(user_id)` and cache a positive answer."""
+        if user_id in self.users:
+            return True
+        if not lookup(user_id):
+            return False
+        self.users.add(user_id)
+        return True
+
+    def render_metrics(self):
+        """Prometheus exposition lines for instrumentation.register_collector."""
+        return [
+            '# HELP todo_active_user_cache_hits_total Authenticated requests whose user was found in the cache.',
+            '# TYPE todo_active_user_cache_hits_total counter',
+            f'todo_active_user_cache_hits_total {self.users.hits}',
+            '# HELP todo_active_user_cache_misses_total Authenticated requests that queried the user row.',
+            '# TYPE todo_active_user_cache_misses_total counter',
+            f'todo_active_user_cache_misses_total {self.users.misses}',
+            '# HELP todo_revoked_tokens_rejected_total Requests refused because their token was revoked.',
+            '# TYPE todo_revoked_tokens_rejected_total counter',
+            f'todo_revoked_tokens_rejected_total {self.rejected}',
+        ]
+
+
+def create_token_guard(config, engine=None, table=None):
+    """Build the TokenGuard described by the app config; the database backend stores in `table` on `engine`."""
+    backend = config.get('TOKEN_REVOCATION_BACKEND', 'database')
+    if backend == 'redis':
+        store = RedisRevocationStore.from_url(config['TOKEN_REVOCATION_REDIS_URL'])
+    elif backend == 'memory':
+        store = MemoryRevocationStore()
+    else:
+        store = DatabaseRevocationStore(engine, table)
+        # Trust "not revoked" no longer than an access token lives
+        cache_ttl = min(config.get('TOKEN_REVOCATION_CACHE_TTL', 5), config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+        if cache_ttl > 0:
+            store = CachedRevocationStore(store, ttl=cache_ttl)
+    users = ActiveUserCache(max_entries=config.get('ACTIVE_USER_CACHE_SIZE', 10000),
+                            ttl=config.get('ACTIVE_USER_CACHE_TTL', 300))
+    lifetime = max(config['JWT_ACCESS_TOKEN_EXPIRES'], config['JWT_REFRESH_TOKEN_EXPIRES'])
+    return TokenGuard(store, users, int(lifetime.total_seconds()))
@@ -0,0 +1,146 @@
+"""
+Benchmark: bytes on the wire and CPU cost of compressing task lists.
+
+Compresses the JSON of 1k and 10k-task lists (built by the same serializer
+as GET /api/tasks) with gzip and brotli at several levels, reporting the
+compressed size and the CPU time per response. Then fetches GET /api/tasks
+through the Flask test client with each Accept-Encoding, which includes the
+chunk-by-chunk compression of the streamed list.
+
+Usage:
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --sizes 1000 10000 50000 --repeat 10
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression import CompressionSettings, brotli
+from serialization import TASK_FIELDS, dumps, task_columns, task_row_serializer
+
+VARIANTS = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 6), ('br', 9)]
+
+WORDS = ('report', 'meeting', 'groceries', 'review', 'plan', 'call', 'budget', 'draft', 'invoice', 'dentist',
+         'release', 'garden', 'follow', 'up', 'with', 'the', 'team', 'about', 'quarterly', 'numbers', 'book',
+         'flights', 'renew', 'insurance', 'fix', 'bug', 'in', 'login', 'page', 'prepare', 'slides', 'for')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    return parser.parse_args()
+
+
+def cpu_time(fn, repeat):
+    """Best-of CPU time of fn(), and its result."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = fn()
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def make_task(rng, i):
+    """Task data with varied text, so the compression ratios are not flattered by identical rows."""
+    return {
+        'title': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).capitalize(),
+        'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 25))),
+        'priority': rng.choice(['High', 'Medium', 'Low']),
+        'status': rng.choice(['Pending', 'In Progress', 'Completed']),
+        'category': rng.choice(['General', 'Work', 'Home']),
+        'due_date': (datetime(2030, 1, 1) + timedelta(minutes=rng.randint(0, 500000))).isoformat(),
+        'tags': rng.sample(['work', 'urgent', 'home', 'errand', f'project-{i % 50}'], rng.randint(0, 3)),
+    }
+
+
+def payload(count):
+    rng = random.Random(count)
+    now = datetime.now(timezone.utc)
+    columns = task_columns(TASK_FIELDS)
+    serialize = task_row_serializer(TASK_FIELDS, columns)
+    rows, tags_by_task = [], {}
+    for i in range(count):
+        data = {**make_task(rng, i), 'id': i + 1, 'created_at': now - timedelta(seconds=rng.randint(0, 10 ** 7)),
+                'updated_at': now}
+        data['due_date'] = datetime.fromisoformat(data['due_date'])
+        tags_by_task[i + 1] = data.pop('tags')
+        rows.append(tuple(data[name] for name in columns))
+    return dumps({'tasks': [serialize(row, tags_by_task) for row in rows]})
+
+
+def bench_in_memory(sizes, repeat):
+    print(f"\nIn memory, best of {repeat} runs\n")
+    print(f"{'tasks':>7}  {'coding':<9} {'bytes':>11} {'ratio':>7} {'cpu ms':>8} {'MB/s':>7}")
+    for count in sizes:
+        data = payload(count)
+        print(f"{count:>7}  {'identity':<9} {len(data):>11,} {1:>7.1f} {'-':>8} {'-':>7}")
+        for encoding, level in VARIANTS:
+            if encoding == 'br' and brotli is None:
+                continue
+            settings = CompressionSettings(gzip_level=level, brotli_quality=level)
+            seconds, compressed = cpu_time(lambda: settings.compress(data, encoding), repeat)
+            print(f"{count:>7}  {f'{encoding}-{level}':<9} {len(compressed):>11,} {len(data) / len(compressed):>7.1f} "
+                  f"{seconds * 1000:>8.1f} {len(data) / seconds / 1e6 if seconds else 0:>7.0f}")
+
+
+def bench_endpoint(sizes, repeat):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_compression.db')}"
+    os.environ.setdefault('RATE_LIMIT_BACKEND', 'none')
+    from app import User, create_app, db
+    from flask_jwt_extended import create_access_token
+    import migrations
+
+    app = create_app()
+    print(f"\nGET /api/tasks (gzip level {app.config['COMPRESSION_GZIP_LEVEL']}, "
+          f"brotli quality {app.config['COMPRESSION_BROTLI_QUALITY']}), best of {repeat} runs\n")
+    print(f"{'tasks':>7}  {'coding':<9} {'bytes':>11} {'wall ms':>8} {'cpu ms':>8}")
+    client = app.test_client()
+    with app.app_context():
+        migrations.upgrade(db)
+    for count in sizes:
+        with app.app_context():
+            user = User(name='bench', email=f'bench{count}@bench.local', password_hash='x')
+            db.session.add(user)
+            db.session.commit()
+            token = create_access_token(identity=str(user.id))
+        headers = {'Authorization': f'Bearer {token}'}
+        rng = random.Random(count)
+        for start in range(0, count, 1000):
+            operations = [{'op': 'create', 'data': make_task(rng, i)} for i in range(start, min(start + 1000, count))]
+            client.post('/api/tasks/batch', json={'operations': operations}, headers=headers)
+
+        for encoding in ('identity', 'gzip', 'br'):
+            if encoding == 'br' and brotli is None:
+                continue
+
+            def fetch():
+                response = client.get('/api/tasks', headers={**headers, 'Accept-Encoding': encoding})
+                assert response.status_code == 200
+                return response.get_data()
+
+            wall = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fetch()
+                wall.append(time.perf_counter() - start)
+            seconds, body = cpu_time(fetch, repeat)
+            print(f"{count:>7}  {encoding:<9} {len(body):>11,} {min(wall) * 1000:>8.1f} {seconds * 1000:>8.1f}")
+
+
+def main():
+    args = parse_args()
+    bench_in_memory(args.sizes, args.repeat)
+    bench_endpoint(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
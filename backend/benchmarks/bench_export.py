@@ -0,0 +1,104 @@
+"""
+Benchmark: peak memory and time of exporting a large task list.
+
+Compares materializing every task (`.all()` into a list, then one JSON
+document, as GET /api/tasks did before streaming) with the streaming
+GET /api/tasks/export formats. Peak memory is the largest Python heap growth
+seen by tracemalloc while the response body is consumed and discarded.
+
+Usage:
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --tasks 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=100000)
+    return parser.parse_args()
+
+
+def seed(client, headers, count):
+    for start in range(0, count, 1000):
+        operations = [{'op': 'create', 'data': {'title': f'Task {i}', 'description': 'Exported task ' * 4,
+                                                'tags': ['work', 'urgent'] if i % 2 else []}}
+                      for i in range(start, min(start + 1000, count))]
+        response = client.post('/api/tasks/batch', json={'operations': operations}, headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def measure(fn):
+    """Run fn, returning (seconds, peak heap growth in bytes, result)."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_export.db')}"
+    os.environ.setdefault('RATE_LIMIT_BACKEND', 'none')
+    from app import Task, User, create_app, db, load_task_tags, serialize_task
+    from flask_jwt_extended import create_access_token
+    from serialization import dumps
+    import migrations
+
+    app = create_app()
+    with app.app_context():
+        migrations.upgrade(db)
+        user = User(name='bench', email='bench@bench.local', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        token = create_access_token(identity=str(user_id))
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    seed(client, headers, args.tasks)
+
+    def materialize():
+        with app.app_context():
+            tasks = Task.query.filter_by(user_id=user_id).order_by(Task.created_at.desc()).all()
+            tags_by_task = load_task_tags([task.id for task in tasks])
+            return len(dumps({'tasks': [serialize_task(task, tags_by_task.get(task.id, [])) for task in tasks]}))
+
+    def export(query_string, accept_encoding=None):
+        def run():
+            request_headers = dict(headers)
+            if accept_encoding:
+                request_headers['Accept-Encoding'] = accept_encoding
+            response = client.get(f'/api/tasks/export?{query_string}', headers=request_headers, buffered=False)
+            assert response.status_code == 200
+            size = sum(len(chunk) for chunk in response.response)
+            response.close()
+            return size
+        return run
+
+    variants = [
+        ('materialized list (.all())', materialize),
+        ('export ndjson', export('format=ndjson')),
+        ('export csv', export('format=csv')),
+        ('export ndjson, gzip', export('format=ndjson', 'gzip')),
+        ('export csv, gzip', export('format=csv', 'gzip')),
+    ]
+    print(f"\n{args.tasks} tasks\n")
+    print(f"{'variant':<30} {'seconds':>8} {'peak MiB':>9} {'body MiB':>9}")
+    for name, fn in variants:
+        elapsed, peak, size = measure(fn)
+        print(f"{name:<30} {elapsed:>8.2f} {peak / 2 ** 20:>9.1f} {size / 2 ** 20:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: the gunicorn.conf.py profiles under the same load.
+
+Seeds one database, then serves it with each profile in turn and drives the
+list/create/stats mix through the loadtest.py clients, so the only thing that
+changes between runs is the worker class and the worker/thread counts.
+
+Usage:
+    python benchmarks/bench_gunicorn_profiles.py
+    python benchmarks/bench_gunicorn_profiles.py --workers 4 --threads 16 --concurrency 64 --duration 60
+    python benchmarks/bench_gunicorn_profiles.py --profiles sync gthread
+
+The uvicorn profile needs requirements-asgi.txt.
+"""
+import argparse
+import os
+import tempfile
+
+import loadtest
+
+WORKLOAD = {'list': 60, 'create': 20, 'stats': 20}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=['sync', 'gthread', 'uvicorn'],
+                        choices=['sync', 'gthread', 'uvicorn'])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=200, help='tasks to seed per user')
+    parser.add_argument('--concurrency', type=int, default=32, help='client threads')
+    parser.add_argument('--duration', type=float, default=30, help='seconds per profile')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8, help='threads per gthread worker')
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--database-url', help='database to seed and serve (default: temporary SQLite file)')
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'profiles.db')}"
+    print(f"Seeding {args.users} users x {args.tasks} tasks...")
+    dialect = loadtest.seed_database(database_url, args.users, args.tasks, args.seed)
+
+    summaries = {}
+    for profile in args.profiles:
+        run_args = argparse.Namespace(**vars(args), server='gunicorn', profile=profile, workload=WORKLOAD)
+        process, base_url = loadtest.start_server(run_args, database_url)
+        try:
+            print(f"{profile}: {args.concurrency} clients for {args.duration:.0f}s")
+            recorder, elapsed = loadtest.run_workload(base_url, run_args, args.users)
+        finally:
+            process.terminate()
+            process.wait()
+        summaries[profile] = loadtest.summarize(recorder, elapsed)
+
+    print(f"\n{dialect}, {args.workers} workers ({args.threads} threads for gthread), "
+          f"{args.concurrency} clients, {args.duration:.0f}s per profile (ms)\n")
+    print(f"{'profile':<9} {'endpoint':<8} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for profile, summary in summaries.items():
+        for name in WORKLOAD:
+            stats = summary['endpoints'].get(name)
+            if stats:
+                print(f"{profile:<9} {name:<8} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+                      f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>7}")
+        print(f"{profile:<9} {'total':<8} {summary['total_rps']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
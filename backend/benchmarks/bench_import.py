@@ -0,0 +1,91 @@
+"""
+Benchmark: bulk task import throughput and memory.
+
+Compares creating tasks with one POST /api/tasks call each against
+POST /api/tasks/import with several batch sizes, through the Flask test
+client on a throwaway SQLite database. Peak memory is the largest Python heap
+growth seen by tracemalloc during a separate, untimed run of the import.
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --tasks 100000 --batch-sizes 100 500 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--single-requests', type=int, default=1000,
+                        help='tasks created one request at a time for the baseline')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 500, 2000])
+    return parser.parse_args()
+
+
+def task_data(i):
+    return {'title': f'Imported task {i}', 'description': 'Migrated from another tool',
+            'priority': ('High', 'Medium', 'Low')[i % 3], 'due_date': '2030-01-01T09:00:00',
+            'tags': ['migrated', f'project-{i % 20}']}
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_import.db')}"
+    os.environ.setdefault('RATE_LIMIT_BACKEND', 'none')
+    from app import User, create_app, db
+    from flask_jwt_extended import create_access_token
+    import migrations
+
+    app = create_app()
+    with app.app_context():
+        migrations.upgrade(db)
+        user = User(name='bench', email='bench@bench.local', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    results = []
+    start = time.perf_counter()
+    for i in range(args.single_requests):
+        response = client.post('/api/tasks', json=task_data(i), headers=headers)
+        assert response.status_code == 201
+    results.append(('one POST /api/tasks per task', args.single_requests, time.perf_counter() - start, None))
+
+    body = b''.join(json.dumps(task_data(i)).encode() + b'\n' for i in range(args.tasks))
+
+    def run_import(batch_size):
+        response = client.post(f'/api/tasks/import?format=ndjson&batch_size={batch_size}', data=body,
+                               headers=headers)
+        assert response.status_code == 200 and response.get_json()['imported'] == args.tasks, response.get_json()
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        run_import(batch_size)
+        elapsed = time.perf_counter() - start
+        # Memory in a second run, as tracemalloc slows the import down several times
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        run_import(batch_size)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+        results.append((f'import, batch_size={batch_size}', args.tasks, elapsed, peak))
+
+    print(f"\n{'variant':<32} {'tasks':>7} {'seconds':>8} {'tasks/s':>8} {'peak MiB':>9}")
+    for name, count, seconds, peak in results:
+        peak_text = f'{peak / 2 ** 20:>9.1f}' if peak is not None else f"{'-':>9}"
+        print(f"{name:<32} {count:>7} {seconds:>8.2f} {count / seconds:>8.0f} {peak_text}")
+    print(f"\nThe upload body itself is {len(body) / 2 ** 20:.1f} MiB and held by the test client, not the app.")
+
+
+if __name__ == '__main__':
+    main()
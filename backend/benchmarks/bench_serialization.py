@@ -0,0 +1,149 @@
+"""
+Micro-benchmark: per-task serialization cost for large task lists.
+
+Compares the original hand-written dict (ORM attribute access, isoformat and
+tag string splitting per row, encoded like jsonify) with the row-tuple
+serializer from serialization.py, encoded with the stdlib json module and with
+orjson when it is installed. Also times GET /api/tasks end to end.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --tasks 10000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialization
+from serialization import TASK_FIELDS, task_columns, task_row_serializer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    return parser.parse_args()
+
+
+def make_tasks(count):
+    now = datetime.now(timezone.utc)
+    tasks = []
+    for i in range(count):
+        tasks.append(SimpleNamespace(
+            id=i + 1,
+            title=f'Task number {i}',
+            description='Some description of the task that is moderately long',
+            due_date=now + timedelta(days=i % 30) if i % 3 else None,
+            priority=('High', 'Medium', 'Low')[i % 3],
+            status=('Pending', 'In Progress', 'Completed')[i % 3],
+            category='Work',
+            tags='work,urgent' if i % 2 else None,
+            created_at=now,
+            updated_at=now,
+        ))
+    return tasks
+
+
+def legacy(tasks):
+    tasks_data = []
+    for task in tasks:
+        tasks_data.append({
+            'id': task.id,
+            'title': task.title,
+            'description': task.description,
+            'due_date': task.due_date.isoformat() if task.due_date else None,
+            'priority': task.priority,
+            'status': task.status,
+            'category': task.category,
+            'tags': task.tags.split(',') if task.tags else [],
+            'created_at': task.created_at.isoformat(),
+            'updated_at': task.updated_at.isoformat()
+        })
+    # jsonify defaults: sorted keys, stdlib encoder
+    return json.dumps({'tasks': tasks_data}, sort_keys=True).encode('utf-8')
+
+
+def row_serializer(rows, tags_by_task):
+    columns = task_columns(TASK_FIELDS)
+    serialize = task_row_serializer(TASK_FIELDS, columns)
+    return serialization.dumps({'tasks': [serialize(row, tags_by_task) for row in rows]})
+
+
+def best_of(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def bench_in_memory(count, repeat):
+    tasks = make_tasks(count)
+    columns = task_columns(TASK_FIELDS)
+    rows = [tuple(getattr(task, name) for name in columns) for task in tasks]
+    tags_by_task = {task.id: task.tags.split(',') for task in tasks if task.tags}
+
+    results = [('legacy dict + jsonify-style json', best_of(lambda: legacy(tasks), repeat))]
+    orjson = serialization.orjson
+    serialization.orjson = None
+    results.append(('row serializer + json', best_of(lambda: row_serializer(rows, tags_by_task), repeat)))
+    serialization.orjson = orjson
+    if orjson is not None:
+        results.append(('row serializer + orjson', best_of(lambda: row_serializer(rows, tags_by_task), repeat)))
+    return results
+
+
+def bench_endpoint(count, repeat):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_serialization.db')}"
+    from app import create_app, db, User
+    from flask_jwt_extended import create_access_token
+    import migrations
+
+    app = create_app()
+    with app.app_context():
+        migrations.upgrade(db)
+        user = User(name='bench', email='bench@bench.local', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    for start in range(0, count, 1000):
+        operations = [{'op': 'create', 'data': {'title': f'Task {i}', 'tags': ['work', 'urgent'] if i % 2 else []}}
+                      for i in range(start, min(start + 1000, count))]
+        client.post('/api/tasks/batch', json={'operations': operations}, headers=headers)
+
+    def fetch():
+        response = client.get('/api/tasks', headers=headers)
+        assert response.status_code == 200
+        return response.get_data()
+
+    results = []
+    orjson = serialization.orjson
+    serialization.orjson = None
+    results.append(('GET /api/tasks (json)', best_of(fetch, repeat)))
+    serialization.orjson = orjson
+    if orjson is not None:
+        results.append(('GET /api/tasks (orjson)', best_of(fetch, repeat)))
+    return results
+
+
+def main():
+    args = parse_args()
+    results = bench_in_memory(args.tasks, args.repeat) + bench_endpoint(args.tasks, args.repeat)
+    print(f"\n{args.tasks} tasks, best of {args.repeat} runs\n")
+    print(f"{'variant':<36} {'total ms':>10} {'us/task':>10}")
+    for name, seconds in results:
+        print(f"{name:<36} {seconds * 1000:>10.1f} {seconds * 1e6 / args.tasks:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
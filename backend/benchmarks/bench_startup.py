@@ -0,0 +1,150 @@
+"""
+Benchmark: cold start of the API and the job worker.
+
+Every measurement runs in a fresh interpreter against an already migrated
+SQLite database, the way a new gunicorn or worker process boots in an
+existing deployment:
+
+    import        `import app`
+    create_app    building the Flask app and its services
+    first query   the first request that touches the database (a failed login)
+    worker boot   `python worker.py` until it reports that it has started
+
+and prints the modules that dominate `python -X importtime -c 'import app'`.
+With --ref the same measurements are taken on another git revision of the
+backend (e.g. one that still created tables at import) for comparison.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --ref HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Works on revisions with and without create_app
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app() if hasattr(app, 'create_app') else app.app
+created = time.perf_counter()
+response = application.test_client().post('/api/auth/login', json={'email': 'nobody@bench.local',
+                                                                   'password': 'x'})
+assert response.status_code == 401, response.status_code
+queried = time.perf_counter()
+print(json.dumps([imported - start, created - imported, queried - created]))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes per measurement')
+    parser.add_argument('--ref', help='git revision of the backend to compare against')
+    parser.add_argument('--top', type=int, default=10, help='modules shown from -X importtime')
+    return parser.parse_args()
+
+
+def checkout(ref):
+    """Extract backend/ at a git revision into a temporary directory and return its path."""
+    target = tempfile.mkdtemp()
+    archive = subprocess.run(['git', 'archive', ref, '.'], cwd=BACKEND_DIR, check=True, capture_output=True)
+    subprocess.run(['tar', '-x', '-C', target], input=archive.stdout, check=True)
+    return target
+
+
+def environment(database_url):
+    # Settings normally read from .env; the job files go with the throwaway database
+    return dict(os.environ, DATABASE_URL=database_url, RATE_LIMIT_BACKEND='none', PYTHONDONTWRITEBYTECODE='1',
+                JOB_FILES_DIR=os.path.join(tempfile.gettempdir(), 'bench_startup_jobs'))
+
+
+def migrate(backend_dir, env):
+    if os.path.exists(os.path.join(backend_dir, 'migrations.py')):
+        subprocess.run([sys.executable, 'migrations.py'], cwd=backend_dir, env=env, check=True,
+                       capture_output=True)
+    # Revisions that create the schema at import do the rest here
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=backend_dir, env=env, check=True, capture_output=True)
+
+
+def time_startup(backend_dir, env, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=backend_dir, env=env, check=True,
+                                capture_output=True, text=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return [statistics.median(column) for column in zip(*samples)]
+
+
+def time_worker(backend_dir, env, runs):
+    if not os.path.exists(os.path.join(backend_dir, 'worker.py')):
+        return None
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, 'worker.py'], cwd=backend_dir, env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            for line in process.stdout:
+                if 'worker started' in line:
+                    samples.append(time.perf_counter() - start)
+                    break
+        finally:
+            process.terminate()
+            process.wait()
+    return statistics.median(samples) if samples else None
+
+
+def slowest_imports(backend_dir, env, top):
+    """Top-level modules by cumulative import time, from -X importtime."""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=backend_dir, env=env,
+                            check=True, capture_output=True, text=True).stderr
+    children = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        # A module is printed after everything it imported
+        if depth == 0:
+            if name.strip() == 'app':
+                break
+            children = {}
+        elif depth == 1:
+            children[name.strip()] = int(cumulative) / 1e6
+    return sorted(children.items(), key=lambda item: -item[1])[:top]
+
+
+def measure(label, backend_dir, runs, top):
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_startup.db')}"
+    env = environment(database_url)
+    migrate(backend_dir, env)
+    imported, created, queried = time_startup(backend_dir, env, runs)
+    worker = time_worker(backend_dir, env, runs)
+    print(f'\n{label}, median of {runs} fresh processes (ms)\n')
+    print(f"{'import':>10} {'create_app':>11} {'first query':>12} {'total':>8} {'worker boot':>12}")
+    worker_ms = f'{worker * 1000:>12.0f}' if worker is not None else f"{'-':>12}"
+    print(f'{imported * 1000:>10.0f} {created * 1000:>11.0f} {queried * 1000:>12.0f} '
+          f'{(imported + created + queried) * 1000:>8.0f} {worker_ms}')
+    print('\nSlowest imports below app (cumulative ms, one run):')
+    for module, seconds in slowest_imports(backend_dir, env, top):
+        print(f'  {module:<32} {seconds * 1000:>7.1f}')
+
+
+def main():
+    args = parse_args()
+    measure('Working tree', BACKEND_DIR, args.runs, args.top)
+    if args.ref:
+        measure(args.ref, checkout(args.ref), args.runs, args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: task query latency vs. task count, with and without the indexes
+added in migration 0002.
+
+Seeds a throwaway SQLite database (or DATABASE_URL if given with --database-url)
+with USERS users and N tasks spread across them, then times the queries issued
+by GET /api/tasks and GET /api/stats for a single user.
+
+Usage:
+    python benchmarks/bench_task_indexes.py
+    python benchmarks/bench_task_indexes.py --sizes 1000 10000 100000 --users 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INDEX_NAMES = ['ix_task_user_created', 'ix_task_user_status', 'ix_task_user_category',
+               'ix_task_user_priority', 'ix_task_user_due_open']
+# Sort indexes from migration 0009, dropped too since they would serve some of these queries
+LATER_INDEX_NAMES = ['ix_task_user_due', 'ix_task_user_updated', 'ix_task_user_title', 'ix_task_user_priority_rank']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-url', default=None)
+    return parser.parse_args()
+
+
+def seed(db, User, Task, users, size):
+    db.session.execute(Task.__table__.delete())
+    db.session.execute(User.__table__.delete())
+    db.session.execute(User.__table__.insert(), [
+        {'id': i + 1, 'name': f'user{i}', 'email': f'user{i}@bench.local', 'password_hash': 'x'}
+        for i in range(users)
+    ])
+    now = datetime.now(timezone.utc)
+    rng = random.Random(42)
+    rows = []
+    for i in range(size):
+        created = now - timedelta(minutes=size - i)
+        rows.append({
+            'user_id': rng.randint(1, users),
+            'title': f'Task {i}',
+            'description': 'Benchmark task',
+            'due_date': now + timedelta(days=rng.randint(-30, 30)),
+            'priority': rng.choice(['High', 'Medium', 'Low']),
+            'status': rng.choice(['Pending', 'In Progress', 'Completed']),
+            'category': rng.choice(['General', 'Work', 'Home']),
+            'created_at': created,
+            'updated_at': created,
+        })
+        if len(rows) == 5000:
+            db.session.execute(Task.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Task.__table__.insert(), rows)
+    db.session.commit()
+
+
+def time_query(fn, repeat):
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def run_queries(db, Task, repeat):
+    user_id = 1
+    now = datetime.now(timezone.utc)
+    queries = {
+        'list (created_at desc)': lambda: Task.query.filter_by(user_id=user_id)
+            .order_by(Task.created_at.desc(), Task.id.desc()).all(),
+        'list page (limit 50)': lambda: Task.query.filter_by(user_id=user_id)
+            .order_by(Task.created_at.desc(), Task.id.desc()).limit(51).all(),
+        'filter status': lambda: Task.query.filter_by(user_id=user_id, status='Pending').all(),
+        'filter category': lambda: Task.query.filter_by(user_id=user_id, category='Work').all(),
+        'count total': lambda: Task.query.filter_by(user_id=user_id).count(),
+        'count overdue': lambda: Task.query.filter(
+            Task.user_id == user_id, Task.due_date < now, Task.status != 'Completed').count(),
+    }
+    return {name: time_query(fn, repeat) for name, fn in queries.items()}
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')
+        database_url = f'sqlite:///{path}'
+    os.environ['DATABASE_URL'] = database_url
+
+    from app import create_app, db, Task, User
+    import migrations
+
+    app = create_app()
+    results = []
+    with app.app_context():
+        migrations.upgrade(db)
+        for size in args.sizes:
+            seed(db, User, Task, args.users, size)
+            for name in INDEX_NAMES + LATER_INDEX_NAMES:
+                db.session.execute(db.text(f'DROP INDEX IF EXISTS {name}'))
+            db.session.commit()
+            db.session.execute(db.text('ANALYZE'))
+            before = run_queries(db, Task, args.repeat)
+
+            migrations.migration_0002_task_indexes(db)
+            db.session.execute(db.text('ANALYZE'))
+            db.session.commit()
+            after = run_queries(db, Task, args.repeat)
+            results.append((size, before, after))
+        dialect = db.engine.dialect.name
+
+    print(f"\nDatabase: {dialect}, users: {args.users}, median of {args.repeat} runs (ms)\n")
+    print(f"{'tasks':>8}  {'query':<24} {'no index':>10} {'indexed':>10} {'speedup':>8}")
+    for size, before, after in results:
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            print(f"{size:>8}  {name:<24} {before[name]:>10.2f} {after[name]:>10.2f} {speedup:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: GET /api/tasks sort orders and filters, with and without the
+indexes added in migration 0009.
+
+Seeds the same data as bench_task_indexes.py, then times the list query built
+by parse_task_list_args and filter_task_query for each set of parameters, and
+prints the plan SQLite (or PostgreSQL) picks with the indexes in place.
+
+Usage:
+    python benchmarks/bench_task_sorting.py
+    python benchmarks/bench_task_sorting.py --sizes 10000 100000 --users 50 --repeat 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_task_indexes import seed, time_query
+
+INDEX_NAMES = ['ix_task_user_due', 'ix_task_user_updated', 'ix_task_user_title', 'ix_task_user_priority_rank']
+
+QUERIES = {
+    'sort -priority': {'sort': '-priority', 'limit': '50'},
+    'sort due_date': {'sort': 'due_date', 'limit': '50'},
+    'sort due_date, page 11': {'sort': 'due_date', 'limit': '50', 'page': '11'},
+    'sort -updated_at': {'sort': '-updated_at', 'limit': '50'},
+    'sort title': {'sort': 'title', 'limit': '50'},
+    'due overdue': {'due': 'overdue', 'sort': 'due_date'},
+    'due this_week': {'due': 'this_week', 'sort': 'due_date', 'limit': '50'},
+    'status Pending,In Progress': {'status': 'Pending,In Progress', 'limit': '50'},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-url', default=None)
+    return parser.parse_args()
+
+
+def build_queries(app_module, user_id):
+    """{name: Query} built the way GET /api/tasks builds them."""
+    from werkzeug.datastructures import MultiDict
+    queries = {}
+    for name, args in QUERIES.items():
+        args = dict(args)
+        page = int(args.pop('page', 1))
+        params = app_module.parse_task_list_args(MultiDict(args))
+        if page > 1:
+            # Start from the cursor of the row before the page, as a client following next_cursor would
+            offset_params = app_module.parse_task_list_args(MultiDict({**args, 'limit': str(params['limit'] * (page - 1))}))
+            previous = project(app_module, user_id, offset_params).all()[-1]
+            params = app_module.parse_task_list_args(
+                MultiDict({**args, 'cursor': app_module.task_list_cursor(previous, params)}))
+        queries[name] = project(app_module, user_id, params)
+    return queries
+
+
+def project(app_module, user_id, params):
+    query = app_module.filter_task_query(app_module.Task.query.filter_by(user_id=user_id), user_id, params,
+                                         app_module.db.engine)
+    if params['paginate']:
+        query = query.limit(params['limit'] + 1)
+    fields = list(app_module.TASK_FIELDS)
+    return app_module.project_task_rows(query, fields, params['sort'] or app_module.DEFAULT_TASK_SORT)[0]
+
+
+def analyze(db):
+    """Refresh the planner statistics and reconnect, so the queries are planned as by a freshly started app."""
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+    db.session.remove()
+    db.engine.dispose()
+
+
+def run_queries(app_module, repeat):
+    queries = build_queries(app_module, user_id=1)
+    return {name: time_query(query.all, repeat) for name, query in queries.items()}
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(), 'bench_sorting.db')
+        database_url = f'sqlite:///{path}'
+    os.environ['DATABASE_URL'] = database_url
+
+    import app as app_module
+    import database
+    import migrations
+    db = app_module.db
+
+    app = app_module.create_app()
+    results = []
+    plans = {}
+    with app.app_context():
+        migrations.upgrade(db)
+        for size in args.sizes:
+            seed(db, app_module.User, app_module.Task, args.users, size)
+            for name in INDEX_NAMES:
+                db.session.execute(db.text(f'DROP INDEX IF EXISTS {name}'))
+            db.session.commit()
+            analyze(db)
+            before = run_queries(app_module, args.repeat)
+
+            migrations.migration_0009_task_sort_indexes(db)
+            analyze(db)
+            after = run_queries(app_module, args.repeat)
+            results.append((size, before, after))
+        for name, query in build_queries(app_module, user_id=1).items():
+            plans[name] = database.explain_query(db.session.connection(), query.statement)['plan']
+        dialect = db.engine.dialect.name
+
+    print(f"\nDatabase: {dialect}, users: {args.users}, median of {args.repeat} runs (ms)\n")
+    print(f"{'tasks':>8}  {'query':<28} {'no index':>10} {'indexed':>10} {'speedup':>8}")
+    for size, before, after in results:
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            print(f"{size:>8}  {name:<28} {before[name]:>10.2f} {after[name]:>10.2f} {speedup:>7.1f}x")
+
+    print(f"\nPlans with the indexes ({args.sizes[-1]} tasks)\n")
+    for name, plan in plans.items():
+        print(f"{name}:")
+        for line in plan:
+            print(f"    {line}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""
+Load-testing harness for the ToDo API.
+
+Seeds USERS users with TASKS tasks each, starts the API (Flask dev server or
+gunicorn, or the ASGI app under uvicorn) against that database, then drives a weighted mix of
+register/login/list/search/create/update/delete/stats requests from
+CONCURRENCY client threads for DURATION seconds. Reports p50/p95/p99 latency,
+requests per second, error counts and SQL queries per request for each
+endpoint, and can write the results as JSON to compare between versions.
+
+Usage:
+    python benchmarks/loadtest.py --users 20 --tasks 500 --concurrency 8 --duration 30
+    python benchmarks/loadtest.py --server gunicorn --workers 4 --output before.json
+    python benchmarks/loadtest.py --server gunicorn --profile sync   # gunicorn.conf.py profile
+    python benchmarks/loadtest.py --server uvicorn --workers 4 --concurrency 32   # asgi.py
+    python benchmarks/loadtest.py --output after.json --compare before.json
+    python benchmarks/loadtest.py --url http://localhost:5001 --skip-seed   # an already running server
+
+Use --database-url postgresql://... to run against PostgreSQL.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PASSWORD = 'LoadTest@123'
+
+# Relative weight of each operation in the request mix
+WORKLOAD = {
+    'list': 35,
+    'search': 15,
+    'stats': 15,
+    'create': 10,
+    'update': 10,
+    'delete': 5,
+    'login': 5,
+    'register': 5,
+}
+
+SEARCH_TERMS = ['report', 'meeting', 'groceries', 'review', 'plan', 'call']
+
+
+def parse_workload(value):
+    workload = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in WORKLOAD or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f'invalid workload entry: {item!r}')
+        workload[name] = int(weight)
+    return workload
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20, help='users to seed')
+    parser.add_argument('--tasks', type=int, default=500, help='tasks to seed per user')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run the workload')
+    parser.add_argument('--server', choices=['flask', 'gunicorn', 'uvicorn'], default='flask')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn/uvicorn workers')
+    parser.add_argument('--profile', choices=['sync', 'gthread', 'uvicorn'], default='gthread',
+                        help='gunicorn.conf.py profile for --server gunicorn')
+    parser.add_argument('--threads', type=int, default=8, help='threads per gthread worker')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--url', help='benchmark an already running server instead of starting one')
+    parser.add_argument('--database-url', help='database to seed and serve (default: temporary SQLite file)')
+    parser.add_argument('--skip-seed', action='store_true', help='reuse the users already in the database')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workload', type=parse_workload, default=WORKLOAD,
+                        help='request mix as name=weight pairs, e.g. list=60,stats=20,create=20')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='previous JSON results to compare against')
+    return parser.parse_args()
+
+
+# Seeding
+def seed_database(database_url, users, tasks_per_user, seed):
+    """Insert users and tasks directly through the models (much faster than the API)."""
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app, db, Task, User
+    import migrations
+
+    app = create_app()
+    from app import password_hasher  # bound by create_app
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    password_hash = password_hasher.hash(PASSWORD)
+    with app.app_context():
+        migrations.upgrade(db)
+        for u in range(users):
+            user = User(name=f'Load User {u}', email=f'load{u}@loadtest.local', password_hash=password_hash)
+            db.session.add(user)
+            db.session.flush()
+            rows = []
+            for i in range(tasks_per_user):
+                created = now - timedelta(minutes=tasks_per_user - i)
+                rows.append({
+                    'user_id': user.id,
+                    'title': f'{rng.choice(SEARCH_TERMS).title()} task {i}',
+                    'description': f'Seeded task {i} for {rng.choice(SEARCH_TERMS)}',
+                    'due_date': now + timedelta(days=rng.randint(-20, 20)),
+                    'priority': rng.choice(['High', 'Medium', 'Low']),
+                    'status': rng.choice(['Pending', 'In Progress', 'Completed']),
+                    'category': rng.choice(['General', 'Work', 'Home']),
+                    'created_at': created,
+                    'updated_at': created,
+                })
+            if rows:
+                db.session.execute(Task.__table__.insert(), rows)
+            db.session.commit()
+        dialect = db.engine.dialect.name
+    return dialect
+
+
+# Server management
+def start_server(args, database_url):
+    # All clients share one IP, so the login/register rate limits are turned off
+    env = dict(os.environ, DATABASE_URL=database_url, PORT=str(args.port), SQL_QUERY_COUNT_HEADER='1',
+               RATE_LIMIT_BACKEND='none')
+    if args.server == 'gunicorn':
+        # gunicorn.conf.py picks the worker class and the app for the profile
+        env.update(GUNICORN_PROFILE=args.profile, WEB_CONCURRENCY=str(args.workers),
+                   GUNICORN_THREADS=str(args.threads))
+        command = ['gunicorn', '-c', 'gunicorn.conf.py', '-b', f'127.0.0.1:{args.port}']
+    elif args.server == 'uvicorn':
+        command = [sys.executable, '-m', 'uvicorn', '--workers', str(args.workers), '--host', '127.0.0.1',
+                   '--port', str(args.port), '--log-level', 'warning', 'asgi:app']
+    else:
+        command = [sys.executable, 'app.py']
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{args.port}'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f'{base_url}/api/health', timeout=1).status_code == 200:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('Server did not become healthy within 30 seconds')
+
+
+# Workload
+class Recorder:
+    """Collects latency samples, errors and query counts per endpoint."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.queries = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, response):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if response is None or response.status_code >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            elif 'X-Query-Count' in response.headers:
+                self.queries.setdefault(name, []).append(int(response.headers['X-Query-Count']))
+
+
+class VirtualUser:
+    def __init__(self, base_url, email, recorder, rng):
+        self.base_url = base_url
+        self.email = email
+        self.recorder = recorder
+        self.rng = rng
+        self.session = requests.Session()
+        self.task_ids = []
+
+    def call(self, name, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, f'{self.base_url}{path}', timeout=60, **kwargs)
+        except requests.RequestException:
+            response = None
+        self.recorder.record(name, time.perf_counter() - start, response)
+        return response
+
+    def login(self):
+        response = self.call('login', 'POST', '/api/auth/login', json={'email': self.email, 'password': PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.session.headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+
+    def run(self, operation):
+        if operation == 'list':
+            response = self.call('list', 'GET', '/api/tasks', params={'limit': 50})
+            if response is not None and response.status_code == 200 and not self.task_ids:
+                self.task_ids = [task['id'] for task in response.json()['tasks']]
+        elif operation == 'search':
+            self.call('search', 'GET', '/api/tasks', params={'search': self.rng.choice(SEARCH_TERMS), 'limit': 50})
+        elif operation == 'stats':
+            self.call('stats', 'GET', '/api/stats')
+        elif operation == 'create':
+            response = self.call('create', 'POST', '/api/tasks', json={
+                'title': f'Load {self.rng.choice(SEARCH_TERMS)} {self.rng.random():.6f}',
+                'priority': self.rng.choice(['High', 'Medium', 'Low']),
+                'tags': ['load'],
+            })
+            if response is not None and response.status_code == 201:
+                self.task_ids.append(response.json()['task']['id'])
+        elif operation == 'update' and self.task_ids:
+            task_id = self.rng.choice(self.task_ids)
+            self.call('update', 'PUT', f'/api/tasks/{task_id}',
+                      json={'status': self.rng.choice(['Pending', 'In Progress', 'Completed'])})
+        elif operation == 'delete' and self.task_ids:
+            task_id = self.task_ids.pop(self.rng.randrange(len(self.task_ids)))
+            self.call('delete', 'DELETE', f'/api/tasks/{task_id}')
+        elif operation == 'login':
+            self.login()
+        elif operation == 'register':
+            email = f'new-{self.rng.getrandbits(64):x}@loadtest.local'
+            self.call('register', 'POST', '/api/auth/register',
+                      json={'name': 'New Load User', 'email': email, 'password': PASSWORD})
+
+
+def run_workload(base_url, args, user_count):
+    recorder = Recorder()
+    operations = list(args.workload)
+    weights = [args.workload[name] for name in operations]
+    deadline = time.time() + args.duration
+
+    def worker(index):
+        rng = random.Random(args.seed * 1000 + index)
+        user = VirtualUser(base_url, f'load{index % user_count}@loadtest.local', recorder, rng)
+        user.login()
+        while time.time() < deadline:
+            user.run(rng.choices(operations, weights)[0])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(worker, range(args.concurrency)))
+    return recorder, time.perf_counter() - start
+
+
+# Reporting
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    for name, samples in sorted(recorder.samples.items()):
+        samples = sorted(samples)
+        queries = recorder.queries.get(name, [])
+        endpoints[name] = {
+            'requests': len(samples),
+            'errors': recorder.errors.get(name, 0),
+            'rps': len(samples) / elapsed,
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p95_ms': percentile(samples, 0.95) * 1000,
+            'p99_ms': percentile(samples, 0.99) * 1000,
+            'avg_queries': sum(queries) / len(queries) if queries else None,
+        }
+    total = sum(endpoint['requests'] for endpoint in endpoints.values())
+    return {'total_requests': total, 'total_rps': total / elapsed, 'elapsed_s': elapsed, 'endpoints': endpoints}
+
+
+def print_report(summary, previous=None):
+    print(f"\n{'endpoint':<10} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+    for name, stats in summary['endpoints'].items():
+        queries = f"{stats['avg_queries']:.1f}" if stats['avg_queries'] is not None else '-'
+        line = (f"{name:<10} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+                f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {queries:>8}")
+        before = previous['summary']['endpoints'].get(name) if previous else None
+        if before and before['p95_ms']:
+            change = stats['p95_ms'] / before['p95_ms'] - 1
+            line += f"   p95 {change:+.0%}"
+        print(line)
+    print(f"\nTotal: {summary['total_requests']} requests in {summary['elapsed_s']:.1f}s "
+          f"({summary['total_rps']:.1f} req/s)")
+    if previous:
+        change = summary['total_rps'] / previous['summary']['total_rps'] - 1
+        print(f"Throughput vs. {previous.get('label', 'previous run')}: {change:+.1%}")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'loadtest.db')}"
+
+    dialect = None
+    if not args.skip_seed:
+        print(f"Seeding {args.users} users x {args.tasks} tasks...")
+        dialect = seed_database(database_url, args.users, args.tasks, args.seed)
+
+    process = None
+    base_url = args.url
+    if not base_url:
+        process, base_url = start_server(args, database_url)
+    try:
+        print(f"Running workload against {base_url}: {args.concurrency} clients for {args.duration:.0f}s")
+        recorder, elapsed = run_workload(base_url, args, max(args.users, 1))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    summary = summarize(recorder, elapsed)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(summary, previous)
+
+    if args.output:
+        result = {
+            'label': git_revision() or 'unknown',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'config': {
+                'users': args.users, 'tasks_per_user': args.tasks, 'concurrency': args.concurrency,
+                'duration_s': args.duration, 'server': 'external' if args.url else args.server,
+                'workers': args.workers, 'profile': args.profile if args.server == 'gunicorn' else None,
+                'database': dialect, 'workload': args.workload,
+            },
+            'summary': summary,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
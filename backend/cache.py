@@ -0,0 +1,202 @@
+"""
+Response cache for per-user task queries.
+
+Cached entries are keyed by user, a per-user generation number and the
+request's filter set. Task writes bump the user's generation, which makes all
+of that user's entries unreachable at once (they then age out of the LRU or
+expire by TTL) without touching other users.
+
+Backends:
+    MemoryBackend - in-process LRU with TTL and a bounded entry count. Each
+                    worker process has its own copy, so only use it with a
+                    single worker (or accept staleness up to the TTL).
+    RedisBackend  - any redis-py compatible client, shared by all workers. A
+                    fake client object can be passed in for tests.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBackend:
+    """Thread-safe in-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries=1024, default_ttl=60, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # Counters (generations) live outside the LRU so they are never evicted
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (value, self.clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, key, value):
+        """Set a counter only if it does not exist yet; return its value."""
+        with self._lock:
+            return self._counters.setdefault(key, value)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._counters.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Cache backend on top of a redis-py compatible client."""
+
+    def __init__(self, client, default_ttl=60):
+        self.client = client
+        self.default_ttl = default_ttl
+        self.evictions = None  # Evictions happen inside Redis and are not visible here
+
+    @classmethod
+    def from_url(cls, url, default_ttl=60):
+        import redis  # optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url), default_ttl)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=self.default_ttl if ttl is None else ttl)
+
+    def add(self, key, value):
+        self.client.set(key, value, nx=True)
+        return self.client.get(key)
+
+    def incr(self, key):
+        return self.client.incr(key)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class TaskCache:
+    """Caches serialized task responses per user, with hit/miss counters."""
+
+    def __init__(self, backend, max_entry_bytes=1024 * 1024, prefix='todo'):
+        self.backend = backend
+        self.max_entry_bytes = max_entry_bytes
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _generation(self, user_id):
+        key = f'{self.prefix}:u{user_id}:gen'
+        generation = self.backend.get(key)
+        if generation is None:
+            # Seed from the clock so a lost counter never reuses an old generation
+            generation = self.backend.add(key, time.time_ns() // 1000)
+        return int(generation)
+
+    def key(self, user_id, kind, variant):
+        """Build the cache key for one of a user's responses (e.g. kind='tasks', variant=query string)."""
+        return f'{self.prefix}:u{user_id}:g{self._generation(user_id)}:{kind}:{variant}'
+
+    def get(self, key):
+        """Return (etag, body) for a cached response, or None."""
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        etag, _, body = value.partition(b'\n')
+        return etag.decode('ascii'), body
+
+    def set(self, key, etag, body):
+        if len(body) > self.max_entry_bytes:
+            return False
+        self.backend.set(key, etag.encode('ascii') + b'\n' + body)
+        return True
+
+    def capture(self, key, etag, chunks):
+        """Pass a streamed body through, caching it once complete if it fits."""
+        parts = []
+        size = 0
+        for chunk in chunks:
+            if parts is not None:
+                size += len(chunk)
+                if size > self.max_entry_bytes:
+                    parts = None
+                else:
+                    parts.append(chunk)
+            yield chunk
+        if parts is not None:
+            self.set(key, etag, b''.join(parts))
+
+    def invalidate_user(self, user_id):
+        """Drop every cached response for a user by moving to a new generation."""
+        self._generation(user_id)
+        self.backend.incr(f'{self.prefix}:u{user_id}:gen')
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.backend.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+def create_task_cache(config):
+    """Build the TaskCache described by the app config, or None if caching is disabled."""
+    backend_name = config.get('CACHE_BACKEND', 'none')
+    ttl = config.get('CACHE_TTL', 60)
+    if backend_name == 'memory':
+        backend = MemoryBackend(max_entries=config.get('CACHE_MAX_ENTRIES', 1024), default_ttl=ttl)
+    elif backend_name == 'redis':
+        backend = RedisBackend.from_url(config['CACHE_REDIS_URL'], default_ttl=ttl)
+    else:
+        return None
+    return TaskCache(backend, max_entry_bytes=config.get('CACHE_MAX_ENTRY_BYTES', 1024 * 1024))
@@ -0,0 +1,236 @@
+"""
+Negotiated response compression and cache headers.
+
+    COMPRESSION_ENCODINGS=br,gzip    codings offered, in order of preference (empty = compression off);
+                                     br needs the optional `brotli` package and is skipped without it
+    COMPRESSION_MIN_SIZE=1024        buffered bodies smaller than this (bytes) are sent uncompressed
+    COMPRESSION_GZIP_LEVEL=6         1 (fastest) to 9 (smallest)
+    COMPRESSION_BROTLI_QUALITY=4     0 (fastest) to 11 (smallest)
+
+JSON, NDJSON, CSV and plain-text responses are compressed after the view has
+built them, with the best coding the client accepts. Streamed bodies (the
+full task list) are compressed chunk by chunk whatever their size, since it
+is not known up front. Responses that already carry a Content-Encoding (gzip
+exports) and event streams are left alone. ETags are weak (`W/"..."`),
+because the same ETag covers every coding of a body.
+
+Responses get a Cache-Control header unless the view set one:
+`private, no-cache` when they have an ETag, so a browser may keep them but
+must revalidate, and `no-store` otherwise (tokens, errors, writes).
+`Vary: Authorization` is added for authenticated requests and
+`Vary: Accept-Encoding` for compressible content.
+
+init_app installs this on a Flask app; CompressionMiddleware does the same
+for the routes of asgi.py.
+"""
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain')
+
+
+class CompressionSettings:
+    """Which codings to offer and how hard to compress."""
+
+    def __init__(self, encodings=('br', 'gzip'), min_size=1024, gzip_level=6, brotli_quality=4):
+        self.encodings = tuple(e for e in encodings if e == 'gzip' or (e == 'br' and brotli is not None))
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @classmethod
+    def from_config(cls, config):
+        encodings = [e.strip() for e in config.get('COMPRESSION_ENCODINGS', 'br,gzip').split(',') if e.strip()]
+        unknown = [e for e in encodings if e not in ('br', 'gzip')]
+        if unknown:
+            raise ValueError(f"Unsupported COMPRESSION_ENCODINGS: {', '.join(unknown)}")
+        return cls(encodings, int(config.get('COMPRESSION_MIN_SIZE', 1024)),
+                   int(config.get('COMPRESSION_GZIP_LEVEL', 6)), int(config.get('COMPRESSION_BROTLI_QUALITY', 4)))
+
+    def negotiate(self, accept_encoding):
+        """Pick the coding to use for an Accept-Encoding header, or None to send the body as is."""
+        accepted = {}
+        for item in (accept_encoding or '').split(','):
+            coding, _, params = item.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    continue
+            if coding:
+                accepted[coding.strip().lower()] = quality
+        best, best_quality = None, 0.0
+        for coding in self.encodings:
+            quality = accepted.get(coding, accepted.get('*', 0.0))
+            # Ties go to the server's order of preference
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    def compressor(self, encoding):
+        """(process, finish) functions of an incremental compressor for the coding."""
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return compressor.process, compressor.finish
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress, compressor.flush
+
+    def compress(self, data, encoding):
+        process, finish = self.compressor(encoding)
+        return process(data) + finish()
+
+    def compress_stream(self, chunks, encoding):
+        process, finish = self.compressor(encoding)
+        for chunk in chunks:
+            data = process(chunk)
+            if data:
+                yield data
+        yield finish()
+
+
+def is_compressible(content_type):
+    return (content_type or '').split(';')[0].strip().lower() in COMPRESSIBLE_MIMETYPES
+
+
+def cache_control(has_etag):
+    return 'private, no-cache' if has_etag else 'no-store'
+
+
+def weak_etag(etag):
+    return etag if etag.startswith('W/') else f'W/{etag}'
+
+
+def header_value(headers, name):
+    """First value of a header in an ASGI header list (lower-case byte names), or ''."""
+    return next((value.decode('latin-1') for key, value in headers if key == name), '')
+
+
+def init_app(app):
+    """Compress responses and add cache headers on a Flask app, as configured in app.config."""
+    settings = CompressionSettings.from_config(app.config)
+
+    @app.after_request
+    def compress_response(response):
+        if 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = cache_control('ETag' in response.headers)
+        if 'Authorization' in request.headers:
+            response.vary.add('Authorization')
+        if not is_compressible(response.content_type):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if ('Content-Encoding' in response.headers or response.direct_passthrough
+                or response.status_code < 200 or response.status_code in (204, 206, 304)):
+            return response
+        encoding = settings.negotiate(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+        if response.is_streamed:
+            response.response = settings.compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < settings.min_size:
+                return response
+            response.set_data(settings.compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        if 'ETag' in response.headers:
+            response.headers['ETag'] = weak_etag(response.headers['ETag'])
+        return response
+
+    return settings
+
+
+class CompressionMiddleware:
+    """ASGI middleware applying the same compression and cache headers as init_app."""
+
+    def __init__(self, app, settings):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        request_headers = dict(scope['headers'])
+        encoding = self.settings.negotiate(request_headers.get(b'accept-encoding', b'').decode('latin-1'))
+        authenticated = b'authorization' in request_headers
+        pending = None  # response start held back until the body is known to be large enough
+        buffered = []
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal pending, compressor
+            if message['type'] == 'http.response.start':
+                headers = self._cache_headers(message['headers'], authenticated)
+                if not self._can_compress(message['status'], headers, encoding):
+                    return await send({**message, 'headers': headers})
+                pending = {**message, 'headers': headers}
+                return
+            if message['type'] != 'http.response.body':
+                return await send(message)
+            if pending is None:
+                if compressor is not None:
+                    message = self._next_chunk(compressor, message)
+                return await send(message)
+
+            # Buffer chunks (WSGI bodies arrive in several) until the threshold is reached or the body ends
+            buffered.append(message.get('body', b''))
+            more_body = message.get('more_body', False)
+            body = b''.join(buffered)
+            if more_body and len(body) < self.settings.min_size:
+                return
+            start, pending = pending, None
+            if len(body) < self.settings.min_size:
+                await send(start)
+                return await send({**message, 'body': body})
+            headers = [(name, weak_etag(value.decode('latin-1')).encode('latin-1') if name == b'etag' else value)
+                       for name, value in start['headers'] if name != b'content-length']
+            headers.append((b'content-encoding', encoding.encode('latin-1')))
+            if more_body:
+                compressor = self.settings.compressor(encoding)
+                message = self._next_chunk(compressor, {**message, 'body': body})
+            else:
+                body = self.settings.compress(body, encoding)
+                headers.append((b'content-length', str(len(body)).encode('latin-1')))
+                message = {**message, 'body': body}
+            await send({**start, 'headers': headers})
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _cache_headers(raw_headers, authenticated):
+        headers = [(name.lower(), value) for name, value in raw_headers]
+        names = {name for name, _ in headers}
+        if b'cache-control' not in names:
+            headers.append((b'cache-control', cache_control(b'etag' in names).encode('latin-1')))
+        vary = [value.decode('latin-1') for name, value in headers if name == b'vary']
+        if authenticated:
+            vary.append('Authorization')
+        if is_compressible(header_value(headers, b'content-type')):
+            vary.append('Accept-Encoding')
+        if vary:
+            values = dict.fromkeys(v.strip() for value in vary for v in value.split(','))
+            headers = [(name, value) for name, value in headers if name != b'vary']
+            headers.append((b'vary', ', '.join(values).encode('latin-1')))
+        return headers
+
+    def _can_compress(self, status, headers, encoding):
+        return (encoding is not None and 200 <= status and status not in (204, 206, 304)
+                and is_compressible(header_value(headers, b'content-type'))
+                and not header_value(headers, b'content-encoding'))
+
+    @staticmethod
+    def _next_chunk(compressor, message):
+        process, finish = compressor
+        data = process(message.get('body', b''))
+        if not message.get('more_body', False):
+            data += finish()
+        return {**message, 'body': data}
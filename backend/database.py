@@ -0,0 +1,169 @@
+"""
+Engine and connection tuning.
+
+PostgreSQL (and file-backed SQLite) connections are pooled per worker process:
+
+    DB_POOL_SIZE=5          connections kept open
+    DB_MAX_OVERFLOW=10      extra connections allowed under bursts
+    DB_POOL_TIMEOUT=30      seconds to wait for a free connection
+    DB_POOL_RECYCLE=1800    seconds before a connection is replaced (-1 = never)
+    DB_POOL_PRE_PING=true   test connections on checkout (survives server restarts)
+
+SQLite connections get these PRAGMAs on connect:
+
+    SQLITE_JOURNAL_MODE=WAL       readers no longer block on the writer
+    SQLITE_SYNCHRONOUS=NORMAL     safe with WAL, far fewer fsyncs than FULL
+    SQLITE_BUSY_TIMEOUT_MS=5000   wait for the write lock instead of failing
+    SQLITE_MMAP_SIZE=268435456    bytes of the file to memory-map (0 = off)
+    SQLITE_CACHE_SIZE=-20000      page cache; negative values are KiB
+
+Engines are registered with track_engine so that a forked worker (gunicorn
+with preload_app, see gunicorn.conf.py) can drop the pooled connections it
+inherited from the master with dispose_inherited_pools.
+
+explain_query returns the plan the database picks for a query, for the
+`explain` mode of GET /api/tasks (TASK_QUERY_EXPLAIN=true).
+"""
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'SQLITE_JOURNAL_MODE'),
+    ('synchronous', 'SQLITE_SYNCHRONOUS'),
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE'),
+    ('cache_size', 'SQLITE_CACHE_SIZE'),
+)
+
+_engines = weakref.WeakSet()
+
+
+def load_config(config, environ):
+    """Copy the engine settings from the environment into the app config."""
+    config['DB_POOL_SIZE'] = int(environ.get('DB_POOL_SIZE', 5))
+    config['DB_MAX_OVERFLOW'] = int(environ.get('DB_MAX_OVERFLOW', 10))
+    config['DB_POOL_TIMEOUT'] = int(environ.get('DB_POOL_TIMEOUT', 30))
+    config['DB_POOL_RECYCLE'] = int(environ.get('DB_POOL_RECYCLE', 1800))
+    config['DB_POOL_PRE_PING'] = environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    config['SQLITE_JOURNAL_MODE'] = environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    config['SQLITE_SYNCHRONOUS'] = environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    config['SQLITE_BUSY_TIMEOUT_MS'] = int(environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    config['SQLITE_MMAP_SIZE'] = int(environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    config['SQLITE_CACHE_SIZE'] = int(environ.get('SQLITE_CACHE_SIZE', -20000))
+
+
+def is_memory_sqlite(uri):
+    url = make_url(uri)
+    return (url.get_backend_name() == 'sqlite'
+            and (url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'))
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database URI."""
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    # In-memory SQLite uses a single shared connection (StaticPool), which takes no sizing options
+    if not is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        options.update({
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+        })
+    return options
+
+
+def sqlite_pragmas(config):
+    return [(pragma, config[key]) for pragma, key in SQLITE_PRAGMAS]
+
+
+def init_app(app):
+    """Set the pool options. Must run before db.init_app(app) creates the engine."""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
+
+
+def describe(config):
+    """The effective database settings, for printing by the entry points (not at import)."""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = ', '.join(f'{k}={v}' for k, v in sorted(config['SQLALCHEMY_ENGINE_OPTIONS'].items()))
+    lines = [f"Database: {url.render_as_string(hide_password=True)}", f"Database engine options: {options}"]
+    if url.get_backend_name() == 'sqlite':
+        lines.append(f"SQLite PRAGMAs: {', '.join(f'{p}={v}' for p, v in sqlite_pragmas(config))}")
+    return '\n'.join(lines)
+
+
+def install_sqlite_pragmas(engine, config):
+    """Run the configured PRAGMAs on each new connection of a SQLite engine.
+
+    For an AsyncEngine pass `engine.sync_engine`; the aiosqlite connection
+    adapter exposes the same cursor interface.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas:
+            cursor.execute(f'PRAGMA {pragma}={value}')
+        cursor.close()
+
+
+def track_engine(engine):
+    """Remember an engine (for an AsyncEngine pass `engine.sync_engine`) for dispose_inherited_pools."""
+    _engines.add(engine)
+
+
+def dispose_inherited_pools():
+    """Start every tracked engine's pool afresh in a forked process.
+
+    The connections are not closed, since they still belong to the parent;
+    the child opens its own on first use.
+    """
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+def _json_value(value):
+    return value if value is None or isinstance(value, (bool, int, float, str)) else str(value)
+
+
+def explain_query(connection, statement):
+    """Return {'dialect', 'sql', 'params', 'plan'} for a select() without running it.
+
+    The statement goes through the normal execution path and a cursor event
+    prefixes the final SQL with EXPLAIN QUERY PLAN (SQLite) or EXPLAIN
+    (PostgreSQL), so the plan is for exactly the SQL and bound parameters
+    the query would run with.
+    """
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.dialect.name == 'sqlite' else 'EXPLAIN '
+    executed = {}
+
+    def add_prefix(conn, cursor, sql, parameters, context, executemany):
+        executed.update(sql=sql, parameters=parameters)
+        return prefix + sql, parameters
+
+    event.listen(connection, 'before_cursor_execute', add_prefix, retval=True)
+    try:
+        rows = [tuple(row) for row in connection.execute(statement)]
+    finally:
+        event.remove(connection, 'before_cursor_execute', add_prefix)
+    parameters = executed['parameters']
+    if isinstance(parameters, dict):
+        parameters = {name: _json_value(value) for name, value in parameters.items()}
+    else:
+        parameters = [_json_value(value) for value in parameters]
+    return {
+        'dialect': connection.dialect.name,
+        'sql': executed['sql'],
+        'params': parameters,
+        # The detail column of SQLite's plan rows, the text lines of PostgreSQL's
+        'plan': [row[-1] for row in rows],
+    }
@@ -0,0 +1,8 @@
+#!/bin/sh
+# Migrate the schema, then run the container's command (gunicorn by default).
+# Set RUN_MIGRATIONS=false when a separate release job runs `python migrations.py`.
+set -e
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    python migrations.py
+fi
+exec "$@"
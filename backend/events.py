@@ -0,0 +1,218 @@
+"""
+Server-sent task events.
+
+Task writes publish a small event for the user once they are committed
+(task.created, task.updated, task.deleted, tasks.changed for bulk writes and
+stats.changed for a recount), and GET /api/events streams them to each of the
+user's open connections as Server-Sent Events, so clients apply deltas
+instead of reloading everything.
+Every event carries the user's change version (also sent as the SSE id); a
+client that reconnects, or falls too far behind, gets a `resync` event and
+catches up through GET /api/tasks/changes.
+
+    EVENTS_BACKEND=memory              'memory', 'redis' or 'none' (endpoint disabled)
+    EVENTS_HEARTBEAT_SECONDS=15        idle time before a keep-alive comment is sent
+    EVENTS_MAX_STREAM_SECONDS=300      streams are closed after this long and the client reconnects
+    EVENTS_MAX_CONNECTIONS_PER_USER=5  open streams per user and process before answering 429
+    EVENTS_QUEUE_SIZE=100              undelivered events kept per stream before it is told to resync
+
+Backends:
+    EventBroker      - in-process fan-out. Only streams served by the process
+                       that made the write see its events, so use it with a
+                       single worker process.
+    RedisEventBroker - publishes through Redis pub/sub, so events from every
+                       web and job worker reach streams on all processes.
+                       Each process listens on one channel from a background
+                       thread, started with its first stream.
+
+Subscriptions are woken through a callable, so the same broker serves
+threaded Flask streams (threading.Event.set) and asyncio streams
+(loop.call_soon_threadsafe) in asgi.py.
+"""
+import json
+import threading
+import time
+import traceback
+from collections import deque
+
+KEEPALIVE = b': keep-alive\n\n'
+
+
+class TooManyStreams(Exception):
+    """Raised by subscribe when a user already has the maximum number of open streams."""
+
+
+def format_sse(event_type, data, event_id=None, retry=None):
+    """Encode one Server-Sent Event."""
+    lines = []
+    if retry is not None:
+        lines.append(f'retry: {int(retry)}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class Subscription:
+    """Events waiting to be sent on one stream."""
+
+    def __init__(self, user_id, max_events, wake):
+        self.user_id = user_id
+        self.max_events = max_events
+        self.wake = wake
+        self.overflowed = False
+        self._events = deque()
+        self._lock = threading.Lock()
+
+    def put(self, event):
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                # The client is too slow: drop what it has not read and tell it to resync instead
+                self._events.clear()
+                self.overflowed = True
+            else:
+                self._events.append(event)
+        self.wake()
+
+    def mark_lost(self):
+        """Flag that events may have been missed (e.g. the pub/sub connection dropped)."""
+        with self._lock:
+            self._events.clear()
+            self.overflowed = True
+        self.wake()
+
+    def take(self):
+        """Return (events, overflowed) and reset both."""
+        with self._lock:
+            events, overflowed = list(self._events), self.overflowed
+            self._events.clear()
+            self.overflowed = False
+        return events, overflowed
+
+
+class EventBroker:
+    """Fans events out to the streams open in this process."""
+
+    def __init__(self, max_events=100, max_per_user=5):
+        self.max_events = max_events
+        self.max_per_user = max_per_user
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+        self._subscribers = {}  # user id -> set of Subscription
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, wake):
+        """Open a subscription for a user's events; `wake()` is called whenever it has something to send."""
+        with self._lock:
+            subscribers = self._subscribers.setdefault(user_id, set())
+            if self.max_per_user and len(subscribers) >= self.max_per_user:
+                raise TooManyStreams(f'At most {self.max_per_user} event streams are allowed per user')
+            subscription = Subscription(user_id, self.max_events, wake)
+            subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event):
+        """Send an event to the user's streams; call after the write has been committed."""
+        self.published += 1
+        self.deliver(user_id, event)
+
+    def deliver(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            if subscription.overflowed:
+                continue
+            subscription.put(event)
+            if subscription.overflowed:
+                self.overflows += 1
+            else:
+                self.delivered += 1
+
+    def connections(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def render_metrics(self):
+        """Prometheus exposition lines for instrumentation.register_collector."""
+        return [
+            '# HELP todo_event_streams Event streams open in this process.',
+            '# TYPE todo_event_streams gauge',
+            f'todo_event_streams {self.connections()}',
+            '# HELP todo_events_published_total Task events published by this process.',
+            '# TYPE todo_events_published_total counter',
+            f'todo_events_published_total {self.published}',
+            '# HELP todo_events_delivered_total Task events queued for a stream in this process.',
+            '# TYPE todo_events_delivered_total counter',
+            f'todo_events_delivered_total {self.delivered}',
+            '# HELP todo_event_stream_overflows_total Streams told to resync because they fell behind.',
+            '# TYPE todo_event_stream_overflows_total counter',
+            f'todo_event_stream_overflows_total {self.overflows}',
+        ]
+
+
+class RedisEventBroker(EventBroker):
+    """EventBroker whose events travel through a Redis pub/sub channel shared by all processes."""
+
+    def __init__(self, client, channel='todo:events', reconnect_delay=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._listener = None
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis  # optional dependency, only needed for EVENTS_BACKEND=redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def subscribe(self, user_id, wake):
+        subscription = super().subscribe(user_id, wake)
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+        return subscription
+
+    def publish(self, user_id, event):
+        self.published += 1
+        self.client.publish(self.channel, json.dumps({'user_id': user_id, 'event': event}, default=str))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        data = json.loads(message['data'])
+                        self.deliver(data['user_id'], data['event'])
+            except Exception:
+                traceback.print_exc()
+            # Events published while disconnected are lost, so every open stream has to resync
+            with self._lock:
+                subscribers = [s for subscribers in self._subscribers.values() for s in subscribers]
+            for subscription in subscribers:
+                subscription.mark_lost()
+            time.sleep(self.reconnect_delay)
+
+
+def create_event_broker(config):
+    """Build the EventBroker described by the app config, or None if events are disabled."""
+    backend = config.get('EVENTS_BACKEND', 'memory')
+    kwargs = {'max_events': config.get('EVENTS_QUEUE_SIZE', 100),
+              'max_per_user': config.get('EVENTS_MAX_CONNECTIONS_PER_USER', 5)}
+    if backend == 'memory':
+        return EventBroker(**kwargs)
+    if backend == 'redis':
+        return RedisEventBroker.from_url(config['EVENTS_REDIS_URL'], **kwargs)
+    return None
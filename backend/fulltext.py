@@ -0,0 +1,119 @@
+"""
+Full-text search for task titles and descriptions.
+
+SQLite uses an external-content FTS5 table (`task_fts`) kept in sync with the
+`task` table by triggers; PostgreSQL uses a GIN index over a tsvector
+expression. Both are created by migration 0004. Search input is split into
+terms which are ANDed together and prefix-matched, so "proj rep" finds
+"Project report". Databases without either engine fall back to LIKE.
+"""
+import re
+
+from sqlalchemy import column, func, literal_column, table, text
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+task_fts = table('task_fts', column('rowid'), column('rank'))
+
+# Cache of engine URL -> backend name ('sqlite', 'postgresql' or None)
+_backends = {}
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, content='task', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+
+POSTGRESQL_DOCUMENT = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+
+def search_terms(search):
+    """Split raw search input into lower-cased word terms."""
+    return TERM_RE.findall(search.lower())
+
+
+def sqlite_fts_available(conn):
+    try:
+        conn.execute(text("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)"))
+        conn.execute(text("DROP TABLE temp.fts5_probe"))
+        return True
+    except Exception:
+        return False
+
+
+def create_search_index(engine):
+    """Create the full-text index for the engine's dialect (idempotent)."""
+    if engine.dialect.name == 'sqlite':
+        with engine.begin() as conn:
+            if not sqlite_fts_available(conn):
+                return False
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'task_fts'")).scalar()
+            for statement in SQLITE_DDL:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+    elif engine.dialect.name == 'postgresql':
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_fts ON task USING GIN ({POSTGRESQL_DOCUMENT})"
+            ))
+    else:
+        return False
+    _backends.pop(str(engine.url), None)
+    return True
+
+
+def search_backend(engine):
+    """Return the full-text backend available on this engine, or None."""
+    key = str(engine.url)
+    if key not in _backends:
+        backend = None
+        if engine.dialect.name == 'sqlite':
+            with engine.connect() as conn:
+                if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'task_fts'")).scalar():
+                    backend = 'sqlite'
+        elif engine.dialect.name == 'postgresql':
+            backend = 'postgresql'
+        _backends[key] = backend
+    return _backends[key]
+
+
+def apply_search(query, Task, search, engine):
+    """Restrict a Task query to tasks matching `search`.
+
+    Returns (query, relevance_order) where relevance_order is an ORDER BY
+    expression ranking the best matches first, or None for the LIKE fallback.
+    """
+    terms = search_terms(search)
+    backend = search_backend(engine) if terms else None
+
+    if backend == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        query = query.join(task_fts, task_fts.c.rowid == Task.id).filter(
+            literal_column('task_fts').op('MATCH')(match)
+        )
+        return query, task_fts.c.rank
+
+    if backend == 'postgresql':
+        document = func.to_tsvector(
+            literal_column("'simple'"),
+            func.coalesce(Task.title, '') + ' ' + func.coalesce(Task.description, '')
+        )
+        tsquery = func.to_tsquery(literal_column("'simple'"), ' & '.join(f'{term}:*' for term in terms))
+        query = query.filter(document.op('@@')(tsquery))
+        return query, func.ts_rank(document, tsquery).desc()
+
+    query = query.filter(
+        (Task.title.contains(search)) |
+        (Task.description.contains(search))
+    )
+    return query, None
@@ -0,0 +1,121 @@
+"""
+Gunicorn settings for the API:
+
+    gunicorn -c gunicorn.conf.py
+
+The profile picks the worker class and the app; worker and thread counts
+default from the CPU count and can be overridden from the environment (or .env):
+
+    GUNICORN_PROFILE=gthread           'sync', 'gthread' or 'uvicorn' (asgi.py, needs requirements-asgi.txt)
+    WEB_CONCURRENCY=                   worker processes (default: 2 x CPUs + 1 for sync, CPUs + 1 otherwise)
+    GUNICORN_THREADS=8                 request threads per gthread worker
+    GUNICORN_PRELOAD=true              import the app once in the master and fork the workers from it
+    GUNICORN_KEEPALIVE=5               seconds an idle client connection is kept open; raise it above the
+                                       load balancer's idle timeout (ignored by sync workers)
+    GUNICORN_TIMEOUT=30                seconds a worker may stay silent before it is restarted
+    GUNICORN_MAX_REQUESTS=1000         requests after which a worker is replaced (0 = never)
+    GUNICORN_MAX_REQUESTS_JITTER=100   random extra requests per worker, so they are not all replaced at once
+    PORT=5001
+
+Profiles:
+    sync    - one request per process. Every open /api/events stream takes a
+              whole worker and is cut off by the timeout, so only use it with
+              EVENTS_BACKEND=none.
+    gthread - a thread pool per process; streams and slow clients only hold a thread.
+              Each open stream holds its thread for up to EVENTS_MAX_STREAM_SECONDS
+              (300s), so N open dashboards take N of the workers x threads pool.
+    uvicorn - the async handlers of asgi.py on uvicorn workers.
+
+The default in-memory event broker only reaches streams served by the
+process that made the write, so with more than one worker it is replaced by
+EVENTS_BACKEND=none (GET /api/events answers 404 and clients fall back to
+refetching). Set EVENTS_BACKEND=redis to keep live updates across workers.
+TOKEN_REVOCATION_BACKEND=memory is refused with more than one worker, since a
+logout would only be seen by one of them; keep the default 'database' or use 'redis'.
+CACHE_BACKEND=memory is refused too: a write only invalidates the cache of the
+worker that handled it, so the others would serve stale lists, stats and
+ETags until CACHE_TTL; use 'redis' or 'none'.
+
+With preload_app each worker starts as a fork of the master, so it skips the
+imports and a replaced worker is ready at once. Nothing opens a database
+connection while the app is built (see create_app), and post_fork resets
+every engine's pool anyway, so that no worker can reuse a connection it
+inherited. The password hash pool and Redis clients already reconnect per process.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILES = {
+    'sync': {'worker_class': 'sync', 'app': 'app:create_app()'},
+    'gthread': {'worker_class': 'gthread', 'app': 'app:create_app()'},
+    'uvicorn': {'worker_class': 'uvicorn.workers.UvicornWorker', 'app': 'asgi:app'},
+}
+
+profile = os.environ.get('GUNICORN_PROFILE', 'gthread')
+if profile not in PROFILES:
+    raise ValueError(f"Unknown GUNICORN_PROFILE {profile!r}, expected one of {', '.join(PROFILES)}")
+cpus = multiprocessing.cpu_count()
+
+# Used unless an app is given on the command line
+wsgi_app = PROFILES[profile]['app']
+worker_class = PROFILES[profile]['worker_class']
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 * cpus + 1 if profile == 'sync' else cpus + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8)) if profile == 'gthread' else 1
+bind = [f"0.0.0.0:{os.environ.get('PORT', 5001)}"]
+
+# Must be decided before the app is loaded, which reads it from the environment
+if workers > 1 and os.environ.get('EVENTS_BACKEND', 'memory') == 'memory':
+    os.environ['EVENTS_BACKEND'] = 'none'
+if workers > 1 and os.environ.get('TOKEN_REVOCATION_BACKEND') == 'memory':
+    raise ValueError(f"TOKEN_REVOCATION_BACKEND=memory only works in one process, not {workers} workers; "
+                     "use 'database' or 'redis'")
+if workers > 1 and os.environ.get('CACHE_BACKEND') == 'memory':
+    raise ValueError(f"CACHE_BACKEND=memory would serve stale responses from {workers} separate caches; "
+                     "use 'redis' or 'none'")
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = timeout
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+# Heartbeat files on tmpfs; a disk-backed /tmp (as in many containers) can stall workers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def when_ready(server):
+    pool = int(os.environ.get('DB_POOL_SIZE', 5)) + int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    if profile == 'uvicorn':
+        pool *= 2  # asgi.py has an async engine next to the Flask one
+    server.log.info(f"Profile {profile}: {workers} {worker_class} workers x {threads} threads, "
+                    f"preload_app={preload_app}, up to {workers * pool} database connections")
+    events = os.environ.get('EVENTS_BACKEND', 'memory')
+    if events == 'none':
+        server.log.info("Task events are off (EVENTS_BACKEND=redis enables them across workers)")
+    elif profile == 'gthread':
+        server.log.info(f"Task events ({events}): each open /api/events stream holds one of the "
+                        f"{workers * threads} request threads")
+    for line in describe_database().splitlines():
+        server.log.info(line)
+
+
+def describe_database():
+    """database.describe for the settings the app will load, without building it in the master."""
+    import database
+    from app import load_config, resolve_database_uri
+    config = {}
+    load_config(config, os.environ)
+    resolve_database_uri(config)
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options(config)
+    return database.describe(config)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        import database
+        database.dispose_inherited_pools()
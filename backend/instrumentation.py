@@ -0,0 +1,217 @@
+"""
+Opt-in per-request instrumentation.
+
+    SQL_QUERY_COUNT_HEADER=true    X-Query-Count header with the request's SQL statement count
+    REQUEST_METRICS=true           Server-Timing header (total, db) and a Prometheus /metrics endpoint
+    PROFILE_SLOW_REQUESTS_MS=500   profile a sample of requests with cProfile and dump the stats of
+    PROFILE_SAMPLE_RATE=0.05       those slower than the threshold to PROFILE_DIR as .prof files
+    PROFILE_DIR=profiles
+    METRICS_TOKEN=                 bearer token required by /metrics and /api/cache/stats; while it is
+                                   empty both answer 403, as they expose route names and traffic
+
+SQL statements are counted and timed with SQLAlchemy engine events. Metrics
+are kept per process, so with several gunicorn workers each worker reports its
+own series.
+"""
+import cProfile
+import functools
+import hmac
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Histogram buckets for request duration, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _flag(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+class Histogram:
+    """Labelled Prometheus histogram. Not locked; callers serialize access."""
+
+    def __init__(self, name, help_text, label_names, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, label_values, value):
+        series = self._series.setdefault(label_values, [0] * (len(self.buckets) + 1) + [0.0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, series in sorted(self._series.items()):
+            labels = ','.join(f'{name}="{value}"' for name, value in zip(self.label_names, label_values))
+            prefix = f'{labels},' if labels else ''
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[len(self.buckets)]}')
+            lines.append(f'{self.name}_sum{{{labels}}} {series[-1]:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {series[len(self.buckets)]}')
+        return lines
+
+
+class RequestMetrics:
+    """Per-route request counters and duration histograms in Prometheus text format."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self._lock = threading.Lock()
+        self._requests = {}   # (route, method, status) -> count
+        self._durations = Histogram('todo_http_request_duration_seconds',
+                                    'Request wall time, by route and method.', ('route', 'method'), buckets)
+        self._queries = {}    # route -> total SQL statements
+        self._sql_time = {}   # route -> total SQL seconds
+        self.collectors = []  # callables returning extra exposition lines
+
+    def observe(self, route, method, status, duration, query_count, sql_time):
+        with self._lock:
+            key = (route, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._durations.observe((route, method), duration)
+            self._queries[route] = self._queries.get(route, 0) + query_count
+            self._sql_time[route] = self._sql_time.get(route, 0.0) + sql_time
+
+    def render(self):
+        lines = [
+            '# HELP todo_http_requests_total Requests handled, by route, method and status.',
+            '# TYPE todo_http_requests_total counter',
+        ]
+        with self._lock:
+            for (route, method, status), count in sorted(self._requests.items()):
+                lines.append(f'todo_http_requests_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+
+            lines += self._durations.render()
+
+            lines += [
+                '# HELP todo_db_queries_total SQL statements executed, by route.',
+                '# TYPE todo_db_queries_total counter',
+            ]
+            for route, count in sorted(self._queries.items()):
+                lines.append(f'todo_db_queries_total{{route="{route}"}} {count}')
+
+            lines += [
+                '# HELP todo_db_query_seconds_total Time spent executing SQL, by route.',
+                '# TYPE todo_db_query_seconds_total counter',
+            ]
+            for route, seconds in sorted(self._sql_time.items()):
+                lines.append(f'todo_db_query_seconds_total{{route="{route}"}} {seconds:.6f}')
+        for collector in self.collectors:
+            lines += collector()
+        return '\n'.join(lines) + '\n'
+
+
+def register_collector(app, collector):
+    """Add a callable returning Prometheus exposition lines to /metrics (ignored when metrics are off)."""
+    metrics = app.extensions.get('request_metrics')
+    if metrics is not None:
+        metrics.collectors.append(collector)
+
+
+def metrics_token_required(view):
+    """Only serve a monitoring endpoint to requests bearing METRICS_TOKEN (Authorization: Bearer <token>)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get('METRICS_TOKEN')
+        if not token:
+            return jsonify({'error': 'Monitoring endpoints are disabled, set METRICS_TOKEN'}), 403
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+            return jsonify({'error': 'Invalid metrics token'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _profile_filename(method, route):
+    slug = ''.join(c if c.isalnum() else '_' for c in route.strip('/')) or 'root'
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{method}-{slug}.prof"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and conn.info.get('query_start'):
+        g.query_count = g.get('query_count', 0) + 1
+        g.sql_time = g.get('sql_time', 0.0) + time.perf_counter() - conn.info['query_start'].pop()
+
+
+def init_app(app):
+    """Install the instrumentation enabled in app.config (no-op when nothing is enabled)."""
+    count_header = _flag(app.config.get('SQL_QUERY_COUNT_HEADER'))
+    metrics_enabled = _flag(app.config.get('REQUEST_METRICS'))
+    slow_ms = float(app.config.get('PROFILE_SLOW_REQUESTS_MS') or 0)
+    sample_rate = float(app.config.get('PROFILE_SAMPLE_RATE', 0.05))
+    profile_dir = app.config.get('PROFILE_DIR', 'profiles')
+
+    if not (count_header or metrics_enabled or slow_ms):
+        return None
+
+    metrics = RequestMetrics() if metrics_enabled else None
+    app.extensions['request_metrics'] = metrics
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        if slow_ms and random.random() < sample_rate:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def add_timing_headers(response):
+        # Streamed bodies run their queries after this point; they are still counted in /metrics
+        g.response_status = response.status_code
+        query_count = g.get('query_count', 0)
+        if count_header:
+            response.headers['X-Query-Count'] = str(query_count)
+        if metrics is not None and 'request_start' in g:
+            total_ms = (time.perf_counter() - g.request_start) * 1000
+            db_ms = g.get('sql_time', 0.0) * 1000
+            response.headers['Server-Timing'] = (
+                f'db;desc="{query_count} queries";dur={db_ms:.2f}, total;dur={total_ms:.2f}'
+            )
+        return response
+
+    @app.teardown_request
+    def record_request(exc):
+        if 'request_start' not in g:
+            return
+        duration = time.perf_counter() - g.request_start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            if duration * 1000 >= slow_ms:
+                os.makedirs(profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(profile_dir, _profile_filename(request.method, route)))
+
+        if metrics is not None:
+            status = g.get('response_status', 500 if exc else 200)
+            metrics.observe(route, request.method, status, duration, g.get('query_count', 0), g.get('sql_time', 0.0))
+
+    if metrics is not None:
+        @app.route('/metrics', methods=['GET'])
+        @metrics_token_required
+        def prometheus_metrics():
+            return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    return metrics
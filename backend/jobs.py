@@ -0,0 +1,283 @@
+"""
+Database-backed background jobs.
+
+Work too long for a request (background exports and imports, stats
+recomputation, account deletion) is queued as a row in the `job` table and run
+by worker.py in a separate process. The queue needs nothing but the database,
+so it works the same on SQLite and PostgreSQL: a worker claims the oldest due
+job with a conditional UPDATE (after SELECT ... FOR UPDATE SKIP LOCKED on
+PostgreSQL), so each attempt runs on exactly one worker.
+
+    JOB_WORKER_THREADS=2          jobs run at once by each worker process
+    JOB_KIND_LIMITS=              jobs of a kind running at once across all workers, e.g. 'import_tasks=1'
+    JOB_MAX_PENDING_PER_USER=5    queued or running jobs per user before enqueueing answers 429
+    JOB_MAX_ATTEMPTS=3            attempts before a job is marked failed (handlers may lower it)
+    JOB_RETRY_DELAY=30            seconds before the first retry, doubled for every further attempt
+    JOB_LEASE_SECONDS=300         a running job whose worker stopped heartbeating this long ago is retried
+    JOB_POLL_INTERVAL=1           seconds between queue polls while idle
+    JOB_RETENTION_HOURS=24        finished jobs and their files are deleted after this long
+    JOB_FILES_DIR=job_files       uploads and results of import/export jobs, shared with the workers
+
+Handlers are registered with JobQueue.handler and called as
+handler(job, report_progress) inside an app context; their return value is
+stored as the job's result. Raising retries the job with exponential backoff
+until it runs out of attempts; raising JobFailed fails it straight away.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, update
+
+PENDING_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class JobFailed(Exception):
+    """Raised by a handler for errors that retrying cannot fix, such as an unreadable upload."""
+
+
+def parse_kind_limits(value):
+    """Parse 'kind=N,kind=N' into {kind: N}."""
+    limits = {}
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        kind, _, limit = item.partition('=')
+        try:
+            limits[kind.strip()] = int(limit)
+        except ValueError:
+            raise ValueError(f"Invalid job limit {item!r}, expected e.g. 'import_tasks=1'")
+    return limits
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """Enqueues, claims and finishes jobs stored with a SQLAlchemy model."""
+
+    def __init__(self, db, model, config=None):
+        self.db = db
+        self.Job = model
+        self.handlers = {}  # kind -> (function, max attempts or None)
+        self.configure(config or {})
+
+    def init_app(self, app):
+        self.configure(app.config)
+
+    def configure(self, config):
+        self.max_attempts = config.get('JOB_MAX_ATTEMPTS', 3)
+        self.retry_delay = config.get('JOB_RETRY_DELAY', 30)
+        self.lease_seconds = config.get('JOB_LEASE_SECONDS', 300)
+        self.max_pending_per_user = config.get('JOB_MAX_PENDING_PER_USER', 5)
+        self.kind_limits = parse_kind_limits(config.get('JOB_KIND_LIMITS'))
+        self.files_dir = config.get('JOB_FILES_DIR', 'job_files')
+
+    def handler(self, kind, max_attempts=None):
+        """Register a function as the handler for jobs of `kind`."""
+        def decorator(fn):
+            self.handlers[kind] = (fn, max_attempts)
+            return fn
+        return decorator
+
+    def file_path(self, job_id, suffix):
+        """Path of a file belonging to a job (upload or result), creating the directory if needed."""
+        os.makedirs(self.files_dir, exist_ok=True)
+        return os.path.join(self.files_dir, f'job-{job_id}.{suffix}')
+
+    # Request side
+    def pending_count(self, user_id):
+        Job = self.Job
+        return self.db.session.query(func.count(Job.id)).filter(
+            Job.user_id == user_id, Job.status.in_(PENDING_STATUSES)
+        ).scalar()
+
+    def enqueue(self, kind, user_id=None, payload=None):
+        """Add a job to the caller's transaction (flushed, so its id is known) and return it."""
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind {kind!r}')
+        max_attempts = self.handlers[kind][1] or self.max_attempts
+        job = self.Job(kind=kind, user_id=user_id, status='queued', payload=json.dumps(payload or {}),
+                       attempts=0, max_attempts=max_attempts, run_at=utcnow())
+        self.db.session.add(job)
+        self.db.session.flush()
+        return job
+
+    def cancel(self, job):
+        """Cancel a job that has not started yet; returns False if it already has."""
+        Job = self.Job
+        cancelled = self.db.session.execute(update(Job).where(Job.id == job.id, Job.status == 'queued').values(
+            status='cancelled', finished_at=utcnow())).rowcount
+        self.db.session.commit()
+        return bool(cancelled)
+
+    # Worker side
+    def claim(self, worker_id):
+        """Mark the oldest due job as running on this worker and return it, or None."""
+        Job = self.Job
+        session = self.db.session
+        kinds = set(self.handlers)
+        if self.kind_limits:
+            running = dict(session.execute(
+                select(Job.kind, func.count(Job.id)).where(Job.status == 'running').group_by(Job.kind)
+            ).all())
+            kinds = {kind for kind in kinds if running.get(kind, 0) < self.kind_limits.get(kind, float('inf'))}
+        if not kinds:
+            session.rollback()
+            return None
+
+        now = utcnow()
+        # SKIP LOCKED keeps PostgreSQL workers off each other's candidates; SQLite ignores it and relies on
+        # the status check in the UPDATE below, which only one worker can win
+        job_id = session.execute(
+            select(Job.id).where(Job.status == 'queued', Job.run_at <= now, Job.kind.in_(kinds))
+            .order_by(Job.run_at, Job.id).limit(1).with_for_update(skip_locked=True)
+        ).scalar()
+        if job_id is None:
+            session.rollback()
+            return None
+        claimed = session.execute(update(Job).where(Job.id == job_id, Job.status == 'queued').values(
+            status='running', locked_by=worker_id, locked_at=now, started_at=now, attempts=Job.attempts + 1
+        )).rowcount
+        session.commit()
+        return session.get(Job, job_id) if claimed else None
+
+    def run(self, job):
+        """Run a claimed job's handler and record the outcome."""
+        fn = self.handlers[job.kind][0]
+        session = self.db.session
+
+        def report_progress(progress):
+            job.progress = json.dumps(progress)
+            session.commit()
+
+        try:
+            result = fn(job, report_progress)
+        except Exception as e:
+            session.rollback()
+            job = session.get(self.Job, job.id)
+            job.error = str(e) if isinstance(e, JobFailed) else f'{type(e).__name__}: {e}'
+            if job.attempts < job.max_attempts and not isinstance(e, JobFailed):
+                job.status = 'queued'
+                job.run_at = utcnow() + timedelta(seconds=self.retry_delay * 2 ** (job.attempts - 1))
+            else:
+                job.status = 'failed'
+                job.finished_at = utcnow()
+            job.locked_by = None
+            session.commit()
+            if not isinstance(e, JobFailed):
+                traceback.print_exc()
+            return False
+        job.status = 'succeeded'
+        job.result = json.dumps(result if result is not None else {})
+        job.error = None
+        job.locked_by = None
+        job.finished_at = utcnow()
+        session.commit()
+        return True
+
+    def heartbeat(self, worker_id):
+        """Extend the lease of every job running on this worker."""
+        Job = self.Job
+        self.db.session.execute(update(Job).where(Job.locked_by == worker_id, Job.status == 'running')
+                                .values(locked_at=utcnow()))
+        self.db.session.commit()
+
+    def requeue_expired(self):
+        """Put running jobs whose worker stopped heartbeating back in the queue (or fail them)."""
+        Job = self.Job
+        session = self.db.session
+        expired = utcnow() - timedelta(seconds=self.lease_seconds)
+        stale = Job.status == 'running', Job.locked_at < expired
+        retried = session.execute(update(Job).where(*stale, Job.attempts < Job.max_attempts).values(
+            status='queued', locked_by=None, run_at=utcnow(), error='Worker lost')).rowcount
+        failed = session.execute(update(Job).where(*stale).values(
+            status='failed', locked_by=None, finished_at=utcnow(), error='Worker lost')).rowcount
+        session.commit()
+        return retried + failed
+
+    def purge_finished(self, retention_hours):
+        """Delete jobs finished more than `retention_hours` ago, with their files."""
+        Job = self.Job
+        session = self.db.session
+        cutoff = utcnow() - timedelta(hours=retention_hours)
+        job_ids = session.execute(select(Job.id).where(Job.status.in_(FINISHED_STATUSES),
+                                                       Job.finished_at < cutoff)).scalars().all()
+        for job_id in job_ids:
+            for suffix in ('upload', 'result'):
+                path = os.path.join(self.files_dir, f'job-{job_id}.{suffix}')
+                if os.path.exists(path):
+                    os.remove(path)
+        if job_ids:
+            session.execute(Job.__table__.delete().where(Job.id.in_(job_ids)))
+        session.commit()
+        return len(job_ids)
+
+
+class Worker:
+    """Runs queued jobs on a pool of threads, each polling the queue."""
+
+    def __init__(self, app, queue, threads=2, poll_interval=1.0, retention_hours=24):
+        self.app = app
+        self.queue = queue
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.retention_hours = retention_hours
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+
+    def _run_jobs(self):
+        with self.app.app_context():
+            while not self.stopping.is_set():
+                try:
+                    job = self.queue.claim(self.worker_id)
+                except Exception:
+                    # e.g. SQLite busy; try again on the next poll
+                    self.queue.db.session.rollback()
+                    traceback.print_exc()
+                    job = None
+                if job is None:
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                print(f'[{self.worker_id}] running job {job.id} ({job.kind}, attempt {job.attempts})', flush=True)
+                self.queue.run(job)
+
+    def _maintain(self):
+        """Heartbeat this worker's jobs and recover or purge other jobs, a few times per lease."""
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        with self.app.app_context():
+            while not self.stopping.wait(interval):
+                try:
+                    self.queue.heartbeat(self.worker_id)
+                    self.queue.requeue_expired()
+                    self.queue.purge_finished(self.retention_hours)
+                except Exception:
+                    self.queue.db.session.rollback()
+                    traceback.print_exc()
+
+    def start(self):
+        """Start the job and maintenance threads in the background."""
+        threads = [threading.Thread(target=self._run_jobs, daemon=True) for _ in range(self.threads)]
+        threads.append(threading.Thread(target=self._maintain, daemon=True))
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def run_forever(self):
+        """Run until stop() is called (e.g. from a signal handler); running jobs are finished first."""
+        threads = self.start()
+        print(f'[{self.worker_id}] worker started with {self.threads} threads '
+              f"for {', '.join(sorted(self.queue.handlers))}", flush=True)
+        while not self.stopping.is_set():
+            time.sleep(0.5)
+        for thread in threads:
+            thread.join()
+
+    def stop(self, *args):
+        self.stopping.set()
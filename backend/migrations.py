@@ -0,0 +1,214 @@
+"""
+Versioned schema migrations for the ToDo API.
+
+Each migration is an idempotent step identified by an increasing version
+number. Applied versions are recorded in the `schema_version` table so that
+existing SQLite and PostgreSQL databases only run the steps they are missing.
+
+The app does not touch the schema when it starts, so run this before starting
+it on a new or upgraded database (as a deploy/release step):
+    python migrations.py
+or:
+    flask --app app db-upgrade
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, text
+
+import fulltext
+from sqlalchemy.exc import IntegrityError
+
+
+def _is_postgresql(engine):
+    return engine.dialect.name == 'postgresql'
+
+
+def _create_index(engine, name, table_and_columns, where=None):
+    """Create an index if it does not exist.
+
+    On PostgreSQL the index is built CONCURRENTLY (outside a transaction) so
+    writes to the table are not blocked while it builds.
+    """
+    concurrently = 'CONCURRENTLY ' if _is_postgresql(engine) else ''
+    sql = f'CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table_and_columns}'
+    if where:
+        sql += f' WHERE {where}'
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text(sql))
+
+
+# Migrations
+def migration_0001_initial_schema(db):
+    """Create the base tables (no-op on databases created by db.create_all())."""
+    db.create_all()
+
+
+def migration_0002_task_indexes(db):
+    """Composite indexes backing the per-user task list, filters and stats."""
+    engine = db.engine
+    _create_index(engine, 'ix_task_user_created', 'task (user_id, created_at, id)')
+    _create_index(engine, 'ix_task_user_status', 'task (user_id, status)')
+    _create_index(engine, 'ix_task_user_category', 'task (user_id, category)')
+    _create_index(engine, 'ix_task_user_priority', 'task (user_id, priority)')
+    _create_index(engine, 'ix_task_user_due_open', 'task (user_id, due_date)', where="status != 'Completed'")
+
+
+def migration_0003_user_task_stats(db):
+    """Per-user task counters table (rows are backfilled lazily on first read)."""
+    table = db.metadata.tables['user_task_stats']
+    table.create(bind=db.engine, checkfirst=True)
+
+
+def migration_0004_task_search_index(db):
+    """Full-text index on task title/description (FTS5 on SQLite, GIN on PostgreSQL)."""
+    fulltext.create_search_index(db.engine)
+
+
+def migration_0005_normalized_tags(db):
+    """Move comma-separated task.tags values into the tag / task_tags tables.
+
+    The legacy column is left in place (and no longer written) so the step can
+    be re-run safely; tasks that already have tag links are skipped.
+    """
+    engine = db.engine
+    for name in ('tag', 'task_tags'):
+        db.metadata.tables[name].create(bind=engine, checkfirst=True)
+
+    if 'tags' not in {c['name'] for c in inspect(engine).get_columns('task')}:
+        return
+
+    batch_size = 1000
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, user_id, tags FROM task "
+                "WHERE id > :last_id AND tags IS NOT NULL AND tags != '' "
+                "AND id NOT IN (SELECT task_id FROM task_tags) "
+                "ORDER BY id LIMIT :limit"
+            ), {'last_id': last_id, 'limit': batch_size}).fetchall()
+            if not rows:
+                break
+            for task_id, user_id, tags in rows:
+                names = []
+                for value in tags.split(','):
+                    value = value.strip()
+                    if value and value not in names:
+                        names.append(value)
+                for position, name in enumerate(names):
+                    tag_id = conn.execute(text(
+                        "SELECT id FROM tag WHERE user_id = :user_id AND name = :name"
+                    ), {'user_id': user_id, 'name': name}).scalar()
+                    if tag_id is None:
+                        conn.execute(text(
+                            "INSERT INTO tag (user_id, name) VALUES (:user_id, :name)"
+                        ), {'user_id': user_id, 'name': name})
+                        tag_id = conn.execute(text(
+                            "SELECT id FROM tag WHERE user_id = :user_id AND name = :name"
+                        ), {'user_id': user_id, 'name': name}).scalar()
+                    conn.execute(text(
+                        "INSERT INTO task_tags (task_id, tag_id, position) VALUES (:task_id, :tag_id, :position)"
+                    ), {'task_id': task_id, 'tag_id': tag_id, 'position': position})
+            last_id = rows[-1][0]
+
+
+def migration_0006_user_task_version(db):
+    """Per-user change version used for ETags on task lists and stats."""
+    engine = db.engine
+    if 'version' in {c['name'] for c in inspect(engine).get_columns('user_task_stats')}:
+        return
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE user_task_stats ADD COLUMN version INTEGER NOT NULL DEFAULT 0'))
+
+
+def migration_0007_task_change_tracking(db):
+    """Per-task change version and deletion tombstones for incremental sync."""
+    engine = db.engine
+    if 'change_version' not in {c['name'] for c in inspect(engine).get_columns('task')}:
+        with engine.begin() as conn:
+            conn.execute(text('ALTER TABLE task ADD COLUMN change_version INTEGER NOT NULL DEFAULT 0'))
+    _create_index(engine, 'ix_task_user_change', 'task (user_id, change_version)')
+    db.metadata.tables['task_tombstone'].create(bind=engine, checkfirst=True)
+
+
+def migration_0008_jobs(db):
+    """Background job queue table (see jobs.py)."""
+    db.metadata.tables['job'].create(bind=db.engine, checkfirst=True)
+
+
+def migration_0009_task_sort_indexes(db):
+    """Indexes behind the GET /api/tasks sort orders: (user_id, sort key, id) for each sortable field."""
+    engine = db.engine
+    _create_index(engine, 'ix_task_user_due', 'task (user_id, due_date, id)')
+    _create_index(engine, 'ix_task_user_updated', 'task (user_id, updated_at, id)')
+    _create_index(engine, 'ix_task_user_title', 'task (user_id, title, id)')
+    # Same expression as app.priority_rank_sql(), which the priority sort orders by
+    _create_index(engine, 'ix_task_user_priority_rank',
+                  "task (user_id, (CASE priority WHEN 'Low' THEN 1 WHEN 'Medium' THEN 2 WHEN 'High' THEN 3 ELSE 0 END), id)")
+
+
+def migration_0010_revoked_tokens(db):
+    """Token revocation table for TOKEN_REVOCATION_BACKEND=database (see auth_tokens.py)."""
+    db.metadata.tables['revoked_token'].create(bind=db.engine, checkfirst=True)
+
+
+MIGRATIONS = [
+    (1, 'initial schema', migration_0001_initial_schema),
+    (2, 'task indexes', migration_0002_task_indexes),
+    (3, 'user task stats', migration_0003_user_task_stats),
+    (4, 'task search index', migration_0004_task_search_index),
+    (5, 'normalized tags', migration_0005_normalized_tags),
+    (6, 'user task version', migration_0006_user_task_version),
+    (7, 'task change tracking', migration_0007_task_change_tracking),
+    (8, 'jobs', migration_0008_jobs),
+    (9, 'task sort indexes', migration_0009_task_sort_indexes),
+    (10, 'revoked tokens', migration_0010_revoked_tokens),
+]
+
+
+def current_version(engine):
+    """Return the highest applied migration version (0 for a fresh database)."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_version ('
+            'version INTEGER PRIMARY KEY, '
+            'description VARCHAR(200), '
+            'applied_at TIMESTAMP)'
+        ))
+        return conn.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+
+
+def upgrade(db):
+    """Apply all pending migrations and return the list of versions applied."""
+    engine = db.engine
+    version = current_version(engine)
+    applied = []
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        migrate(db)
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text('INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)'),
+                    {'v': number, 'd': description, 't': datetime.now(timezone.utc)}
+                )
+        except IntegrityError:
+            # Another worker recorded this version concurrently; every step is idempotent
+            pass
+        applied.append(number)
+    return applied
+
+
+if __name__ == '__main__':
+    import database
+    from app import create_app, db
+
+    app = create_app()
+    print(database.describe(app.config))
+    with app.app_context():
+        applied = upgrade(db)
+        if applied:
+            print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+        else:
+            print("Database schema is up to date")
@@ -0,0 +1,143 @@
+"""
+Password hashing off the request threads.
+
+bcrypt is deliberately slow (~250 ms per hash at cost 12) and holds the CPU
+for the whole time, so a login storm can occupy every request worker. The
+PasswordHasher runs hashes and checks on a small process pool instead:
+
+    BCRYPT_LOG_ROUNDS=12              bcrypt cost factor for new hashes
+    PASSWORD_HASH_WORKERS=2           pool processes per app process (0 = hash inline)
+    PASSWORD_HASH_MAX_PENDING=16      hashes queued or running before new ones are refused
+    PASSWORD_HASH_QUEUE_TIMEOUT=2     seconds to wait for a free slot before refusing
+
+When the queue is full, PasswordHasherBusy is raised and the routes answer 503
+with Retry-After instead of piling up more CPU work. Hashes whose cost differs
+from BCRYPT_LOG_ROUNDS are upgraded on the next successful login.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from flask_bcrypt import Bcrypt
+
+from instrumentation import Histogram
+
+# Hash latency buckets, in seconds
+HASH_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Not bound to an app: pool processes only need the hashing functions
+_bcrypt = Bcrypt()
+
+
+def _exit_with_parent(parent_pid):
+    """Pool initializer: stop the worker if the app process dies without shutting the pool down."""
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(0)
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _hash_password(password, rounds):
+    return _bcrypt.generate_password_hash(password, rounds).decode('utf-8')
+
+
+def _check_password(password_hash, password):
+    return _bcrypt.check_password_hash(password_hash, password)
+
+
+def hash_cost(password_hash):
+    """Return the bcrypt cost factor encoded in a hash ($2b$<cost>$...), or None."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashes are already queued."""
+
+    def __init__(self, retry_after=1):
+        super().__init__('Server is busy, please retry shortly')
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Bounded bcrypt hashing on a process pool, with queue and latency metrics."""
+
+    def __init__(self, log_rounds=12, workers=2, max_pending=16, queue_timeout=2.0):
+        self.log_rounds = log_rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._pending = 0
+        self._rejected = 0
+        self._latency = Histogram('todo_password_hash_seconds',
+                                  'Time to hash or check a password, including queueing.',
+                                  ('operation',), HASH_BUCKETS)
+
+    def _get_pool(self):
+        # Created on first use in each process, so gunicorn workers never share a pool forked from the master.
+        # Spawned (not forked) so pool processes do not inherit the server's sockets and exit with it.
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_exit_with_parent, initargs=(os.getpid(),))
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, operation, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusy()
+        start = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+        try:
+            if self.workers:
+                return self._get_pool().submit(fn, *args).result()
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._latency.observe((operation,), time.perf_counter() - start)
+            self._slots.release()
+
+    def hash(self, password):
+        """Hash a password at the configured cost, returning the hash as a string."""
+        return self._run('hash', _hash_password, password, self.log_rounds)
+
+    def check(self, password_hash, password):
+        return self._run('check', _check_password, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return hash_cost(password_hash) != self.log_rounds
+
+    def render_metrics(self):
+        """Prometheus exposition lines for instrumentation.register_collector."""
+        with self._lock:
+            return [
+                '# HELP todo_password_hash_queue_depth Password hashes queued or running.',
+                '# TYPE todo_password_hash_queue_depth gauge',
+                f'todo_password_hash_queue_depth {self._pending}',
+                '# HELP todo_password_hash_rejected_total Password hashes refused because the queue was full.',
+                '# TYPE todo_password_hash_rejected_total counter',
+                f'todo_password_hash_rejected_total {self._rejected}',
+            ] + self._latency.render()
+
+
+def create_password_hasher(config):
+    """Build the PasswordHasher described by the app config."""
+    return PasswordHasher(
+        log_rounds=config.get('BCRYPT_LOG_ROUNDS', 12),
+        workers=config.get('PASSWORD_HASH_WORKERS', 2),
+        max_pending=config.get('PASSWORD_HASH_MAX_PENDING', 16),
+        queue_timeout=config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 2.0),
+    )
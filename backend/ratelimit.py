@@ -0,0 +1,197 @@
+"""
+Token-bucket rate limiting for the authentication routes.
+
+Every login/register request takes a token from a bucket per client IP, and
+registrations also from a bucket per email address. The login email bucket
+is only charged for failed logins, so a legitimate client logging in often is
+not locked out while password guessing against one account is. Buckets refill
+continuously at the configured rate and hold at most one period's worth of
+tokens. When a bucket is empty the request is refused with 429 and
+Retry-After before any password hashing is done, so a burst of bad logins
+cannot occupy the workers. Every bucket of a request is checked before any is
+charged, so a request refused by one (say the email's) costs nothing from the
+others (the IP's).
+
+Limits are written as "<count>/<second|minute|hour|day>" and set per route
+and key (RATE_LIMIT_LOGIN_IP, RATE_LIMIT_LOGIN_EMAIL, ...). An empty value
+disables that bucket.
+
+Backends:
+    MemoryBucketStore - in-process buckets. Each worker process counts
+                        separately, so the effective limit is multiplied by
+                        the number of workers.
+    RedisBucketStore  - any redis-py compatible client, shared by all
+                        workers; each check is a single atomic script call.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_limit(value):
+    """Parse "<count>/<period>" into (tokens per second, burst), or None if empty."""
+    if not value:
+        return None
+    try:
+        count, period = value.replace(' ', '').split('/')
+        count = int(count)
+        seconds = PERIODS[period.rstrip('s')]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit {value!r}, expected e.g. '10/minute'")
+    if count <= 0:
+        return None
+    return count / seconds, count
+
+
+def client_ip(remote_addr, forwarded_for, trusted_proxies=0):
+    """Return the client address, taking it from X-Forwarded-For behind `trusted_proxies` proxies."""
+    if trusted_proxies and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return remote_addr or 'unknown'
+
+
+class MemoryBucketStore:
+    """Thread-safe in-process token buckets, bounded to the most recently used keys."""
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        """Take `cost` tokens (0 to only check), returning 0 if allowed or the seconds until a token is available."""
+        now = self.clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            retry_after = 0
+            if tokens >= 1:
+                tokens -= cost
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+
+class RedisBucketStore:
+    """Token buckets in Redis, updated atomically by a Lua script."""
+
+    SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - cost
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+    def __init__(self, client, prefix='todo:ratelimit:', clock=time.time):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis  # optional dependency, only needed for RATE_LIMIT_BACKEND=redis
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def take(self, key, rate, burst, cost=1):
+        result = self.client.eval(self.SCRIPT, 1, self.prefix + key, rate, burst, self.clock(), cost)
+        return float(result.decode() if isinstance(result, bytes) else result)
+
+
+class RateLimiter:
+    """Applies per-route IP and email limits on top of a bucket store."""
+
+    def __init__(self, store, limits, failure_only=(('login', 'email'),)):
+        self.store = store
+        self.limits = limits                    # route -> {'ip': (rate, burst) or None, 'email': ...}
+        self.failure_only = set(failure_only)   # (route, key kind) buckets charged by record_failure only
+        self.rejected = {}                      # (route, key kind) -> count
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _identities(ip, email):
+        return {'ip': ip, 'email': email.strip().lower() if isinstance(email, str) and email.strip() else None}
+
+    def hit(self, route, ip, email=None):
+        """Count a request, returning 0 if it may proceed or the whole seconds to wait before retrying."""
+        retry_after = 0
+        charged = []  # (kind, key, limit) of the buckets to charge once all of them allow the request
+        for kind, identity in self._identities(ip, email).items():
+            limit = self.limits.get(route, {}).get(kind)
+            if limit is None or identity is None:
+                continue
+            key = f'{route}:{kind}:{identity}'
+            wait = self.store.take(key, *limit, cost=0)
+            if wait:
+                self._count_rejected(route, kind)
+                retry_after = max(retry_after, wait)
+            elif (route, kind) not in self.failure_only:
+                charged.append((kind, key, limit))
+        if retry_after:
+            return math.ceil(retry_after)
+        for kind, key, limit in charged:
+            # Can still be refused if concurrent requests emptied the bucket since the check
+            wait = self.store.take(key, *limit)
+            if wait:
+                self._count_rejected(route, kind)
+                retry_after = max(retry_after, wait)
+        return math.ceil(retry_after)
+
+    def _count_rejected(self, route, kind):
+        with self._lock:
+            self.rejected[(route, kind)] = self.rejected.get((route, kind), 0) + 1
+
+    def record_failure(self, route, ip=None, email=None):
+        """Charge the failure-only buckets of a request that failed (e.g. a wrong password)."""
+        for kind, identity in self._identities(ip, email).items():
+            limit = self.limits.get(route, {}).get(kind)
+            if limit is not None and identity is not None and (route, kind) in self.failure_only:
+                self.store.take(f'{route}:{kind}:{identity}', *limit)
+
+    def render_metrics(self):
+        """Prometheus exposition lines for instrumentation.register_collector."""
+        lines = [
+            '# HELP todo_rate_limited_total Requests refused by the rate limiter, by route and key.',
+            '# TYPE todo_rate_limited_total counter',
+        ]
+        with self._lock:
+            for (route, kind), count in sorted(self.rejected.items()):
+                lines.append(f'todo_rate_limited_total{{route="{route}",key="{kind}"}} {count}')
+        return lines
+
+
+def create_rate_limiter(config):
+    """Build the RateLimiter described by the app config, or None if rate limiting is disabled."""
+    backend_name = config.get('RATE_LIMIT_BACKEND', 'memory')
+    if backend_name == 'memory':
+        store = MemoryBucketStore()
+    elif backend_name == 'redis':
+        store = RedisBucketStore.from_url(config['RATE_LIMIT_REDIS_URL'])
+    else:
+        return None
+    limits = {
+        route: {kind: parse_limit(config.get(f'RATE_LIMIT_{route.upper()}_{kind.upper()}')) for kind in ('ip', 'email')}
+        for route in ('login', 'register')
+    }
+    return RateLimiter(store, limits)
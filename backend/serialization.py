@@ -0,0 +1,239 @@
+"""
+Task serialization and JSON encoding for API responses.
+
+Tasks are serialized straight from row tuples (as returned by
+`query.with_entities(...)`) or from Task objects, using a per-field plan built
+once per request instead of a hand-written dict per row. JSON is encoded with
+orjson when it is installed, falling back to the standard library. Exports
+are streamed as NDJSON or CSV, optionally gzip-compressed chunk by chunk, and
+imports in the same formats are parsed row by row.
+"""
+import csv
+import io
+import json
+import zlib
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+TASK_FIELDS = ('id', 'title', 'description', 'due_date', 'priority', 'status',
+               'category', 'tags', 'created_at', 'updated_at')
+DATETIME_FIELDS = frozenset(('due_date', 'created_at', 'updated_at'))
+
+# Number of rows serialized per chunk when streaming a task list
+STREAM_CHUNK_SIZE = 1000
+
+# Bytes read from an upload at a time when importing
+IMPORT_READ_SIZE = 64 * 1024
+
+# Export formats: name -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+
+def dumps(obj):
+    """Encode obj as compact JSON bytes using the fastest available backend."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads(data):
+    """Decode JSON text or bytes using the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_backend():
+    return 'orjson' if orjson is not None else 'json'
+
+
+def json_response(obj, status=200):
+    """Build a JSON response like jsonify, but with the fast encoder."""
+    return Response(dumps(obj), status=status, mimetype='application/json')
+
+
+def format_task_field(name, value):
+    """Convert a raw column value into its JSON representation."""
+    if name in DATETIME_FIELDS:
+        return value.isoformat() if value else None
+    return value
+
+
+def task_columns(fields, sort_field='created_at'):
+    """Return the Task column names to load for the given output fields.
+
+    The keyset columns (the sort field and id) are always included; tags are
+    loaded separately and so are never a column.
+    """
+    return list(dict.fromkeys([f for f in fields if f != 'tags'] + [sort_field, 'id']))
+
+
+def task_row_serializer(fields, columns):
+    """Build a function serializing a row tuple (ordered as `columns`) to a dict of `fields`.
+
+    The returned function takes (row, tags_by_task) where tags_by_task maps task
+    ids to lists of tag names.
+    """
+    position = {name: i for i, name in enumerate(columns)}
+    id_index = position['id']
+    plan = []
+    for name in fields:
+        if name == 'tags':
+            plan.append((name, id_index, 'tags'))
+        elif name in DATETIME_FIELDS:
+            plan.append((name, position[name], 'datetime'))
+        else:
+            plan.append((name, position[name], None))
+
+    def serialize(row, tags_by_task):
+        data = {}
+        for name, index, kind in plan:
+            value = row[index]
+            if kind == 'tags':
+                value = tags_by_task.get(value, [])
+            elif kind == 'datetime' and value is not None:
+                value = value.isoformat()
+            data[name] = value
+        return data
+
+    return serialize
+
+
+def serialize_task(task, tags):
+    """Serialize a single Task object with its list of tag names."""
+    # In TASK_FIELDS order, like the rows of task_row_serializer
+    return {name: tags if name == 'tags' else format_task_field(name, getattr(task, name)) for name in TASK_FIELDS}
+
+
+def stream_task_list(chunks, serialize, load_tags):
+    """Yield a {"tasks": [...]} JSON document chunk by chunk.
+
+    `chunks` is an iterable of row lists, `serialize` a task_row_serializer
+    function and `load_tags` maps a list of rows to {task_id: [tag names]} (or
+    None when tags are not requested). Only one chunk is held in memory.
+    """
+    yield b'{"tasks":['
+    first = True
+    for rows in chunks:
+        if not rows:
+            continue
+        tags_by_task = load_tags(rows) if load_tags else {}
+        body = b','.join(dumps(serialize(row, tags_by_task)) for row in rows)
+        if not first:
+            body = b',' + body
+        first = False
+        yield body
+    yield b']}'
+
+
+def stream_task_ndjson(chunks, serialize, load_tags):
+    """Yield one JSON object per line for each task; arguments as for stream_task_list."""
+    for rows in chunks:
+        if not rows:
+            continue
+        tags_by_task = load_tags(rows) if load_tags else {}
+        yield b''.join(dumps(serialize(row, tags_by_task)) + b'\n' for row in rows)
+
+
+def stream_task_csv(chunks, fields, serialize, load_tags):
+    """Yield a CSV document with a header row; tags are joined into one comma-separated cell."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for rows in chunks:
+        if not rows:
+            continue
+        tags_by_task = load_tags(rows) if load_tags else {}
+        for row in rows:
+            data = serialize(row, tags_by_task)
+            if 'tags' in data:
+                data['tags'] = ','.join(data['tags'])
+            writer.writerow([data[name] for name in fields])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a stream of byte chunks into a gzip stream as it goes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_lines(stream, chunk_size=IMPORT_READ_SIZE):
+    """Yield the lines of a binary stream, newlines included, reading it in large chunks.
+
+    Request bodies are unbuffered, so iterating over them directly would read
+    one byte at a time.
+    """
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+    if pending:
+        yield pending
+
+
+def read_ndjson_rows(stream):
+    """Yield (line number, object, None) per non-blank line of a binary stream, or (line, None, error)."""
+    for line_number, line in enumerate(iter_lines(stream), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, 'Row must be a JSON object'
+            continue
+        yield line_number, data, None
+
+
+def read_csv_rows(stream):
+    """Yield (line number, task data, None) per CSV record of a binary stream with a header row.
+
+    Empty cells are treated as missing and the tags cell is split on commas,
+    so a CSV export can be imported as is.
+    """
+    # UTF-8 multi-byte sequences never contain b'\n', so lines decode on their own; the first may start with a BOM
+    lines = (line.decode('utf-8-sig' if number == 0 else 'utf-8') for number, line in enumerate(iter_lines(stream)))
+    reader = csv.DictReader(lines)
+    for record in reader:
+        data = {key: value for key, value in record.items() if key and value not in (None, '')}
+        if 'tags' in data:
+            data['tags'] = data['tags'].split(',')
+        yield reader.line_num, data, None
+
+
+def read_task_rows(stream, import_format):
+    """Parse an uploaded 'csv' or 'ndjson' stream incrementally, yielding (line, data, error) per row.
+
+    Per-row problems are reported in `error`; a stream that cannot be read
+    any further (malformed CSV, bad encoding, corrupt gzip) raises ValueError.
+    """
+    rows = read_csv_rows(stream) if import_format == 'csv' else read_ndjson_rows(stream)
+    try:
+        yield from rows
+    except (csv.Error, UnicodeDecodeError, OSError, EOFError) as e:
+        raise ValueError(f'Could not read the upload: {e}')
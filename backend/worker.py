@@ -0,0 +1,34 @@
+"""
+Background job worker, run as a separate process next to the web server:
+
+    python worker.py
+    python worker.py --threads 4
+
+Uses the same configuration (.env / environment) and database as the API,
+migrated beforehand with `python migrations.py`. Stops after the running jobs
+finish on SIGINT or SIGTERM; a worker that is killed outright has its jobs
+retried by another worker once their lease expires.
+"""
+import argparse
+import signal
+
+from app import create_app, job_queue
+from jobs import Worker
+
+
+def main():
+    app = create_app()
+    parser = argparse.ArgumentParser(description='Run queued background jobs.')
+    parser.add_argument('--threads', type=int, default=app.config['JOB_WORKER_THREADS'],
+                        help='jobs run at once (default: JOB_WORKER_THREADS)')
+    args = parser.parse_args()
+
+    worker = Worker(app, job_queue, threads=args.threads, poll_interval=app.config['JOB_POLL_INTERVAL'],
+                    retention_hours=app.config['JOB_RETENTION_HOURS'])
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    worker.run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -124,7 +124,7 @@ echo "   - Go to https://render.com"
 echo "   - Create new Web Service"
 echo "   - Connect your GitHub repository"
 echo "   - Set build command: pip install -r requirements.txt"
-echo "   - Set start command: gunicorn app:app --bind 0.0.0.0:\$PORT"
+echo "   - Set start command: python migrations.py && gunicorn -c gunicorn.conf.py"
 echo ""
 echo "2. 🎨 Deploy Frontend to Vercel:"
 echo "   - Go to https://vercel.com"
@@ -1,7 +1,7 @@
 import axios from 'axios';
 
 // Get the API URL from environment variable or use localhost for development
-const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:5001';
+export const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:5001';
 
 // Create axios instance with base URL
 const api = axios.create({
@@ -25,13 +25,48 @@ api.interceptors.request.use(
   }
 );
 
+// Access tokens are short-lived; concurrent 401s share one refresh request
+let refreshRequest = null;
+
+export const refreshAccessToken = () => {
+  if (!refreshRequest) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    refreshRequest = axios
+      .post(`${API_URL}/api/auth/refresh`, null, {
+        headers: { Authorization: `Bearer ${refreshToken}` },
+      })
+      .then((response) => {
+        localStorage.setItem('token', response.data.access_token);
+        localStorage.setItem('refreshToken', response.data.refresh_token);
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshRequest = null;
+      });
+  }
+  return refreshRequest;
+};
+
 // Response interceptor to handle errors
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const request = error.config;
+    if (error.response?.status === 401 && request && !request._retry && localStorage.getItem('refreshToken')) {
+      // Access token expired: renew it once and replay the request
+      request._retry = true;
+      try {
+        const token = await refreshAccessToken();
+        request.headers.Authorization = `Bearer ${token}`;
+        return api(request);
+      } catch (refreshError) {
+        // Refresh token expired or revoked, fall through to logging out
+      }
+    }
     if (error.response?.status === 401) {
       // Token expired or invalid
       localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
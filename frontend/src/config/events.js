@@ -0,0 +1,108 @@
+import { API_URL, refreshAccessToken } from './axios';
+
+// Task events are Server-Sent Events from /api/events. EventSource cannot send the
+// Authorization header, so the stream is read with fetch and parsed here.
+const DEFAULT_RETRY_DELAY = 3000;
+
+const parseEvent = (block) => {
+  const event = { type: 'message', data: '', id: null, retry: null };
+  block.split('\n').forEach((line) => {
+    if (!line || line.startsWith(':')) {
+      return; // keep-alive comment
+    }
+    const index = line.indexOf(':');
+    const field = index === -1 ? line : line.slice(0, index);
+    const value = index === -1 ? '' : line.slice(index + 1).replace(/^ /, '');
+    if (field === 'event') {
+      event.type = value;
+    } else if (field === 'data') {
+      event.data = event.data ? `${event.data}\n${value}` : value;
+    } else if (field === 'id') {
+      event.id = value;
+    } else if (field === 'retry') {
+      event.retry = parseInt(value, 10);
+    }
+  });
+  return event;
+};
+
+// Calls onEvent(type, data) for every task event, reconnecting (with Last-Event-ID, so
+// missed changes arrive as a `resync` event) until the returned function is called.
+export const subscribeToTaskEvents = (onEvent) => {
+  const controller = new AbortController();
+  let lastEventId = null;
+  let retryDelay = DEFAULT_RETRY_DELAY;
+  let stopped = false;
+
+  const readStream = async () => {
+    const headers = { Authorization: `Bearer ${localStorage.getItem('token')}` };
+    if (lastEventId !== null) {
+      headers['Last-Event-ID'] = lastEventId;
+    }
+    const response = await fetch(`${API_URL}/api/events`, { headers, signal: controller.signal });
+    if (response.status === 401) {
+      // Streams end when the access token expires; renew it and reconnect straight away
+      try {
+        await refreshAccessToken();
+      } catch (error) {
+        stopped = true; // refresh token expired or revoked; the next API call logs the user out
+        return false;
+      }
+      return true;
+    }
+    if (!response.ok) {
+      // Events disabled on the server (404) or too many open streams (429)
+      stopped = response.status === 404;
+      return false;
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) {
+        return false;
+      }
+      buffer += decoder.decode(value, { stream: true });
+      let end = buffer.indexOf('\n\n');
+      while (end !== -1) {
+        const event = parseEvent(buffer.slice(0, end));
+        buffer = buffer.slice(end + 2);
+        end = buffer.indexOf('\n\n');
+        if (event.retry) {
+          retryDelay = event.retry;
+        }
+        if (event.id !== null) {
+          lastEventId = event.id;
+        }
+        if (event.data) {
+          onEvent(event.type, JSON.parse(event.data));
+        }
+      }
+    }
+  };
+
+  const run = async () => {
+    while (!stopped) {
+      let reconnectNow = false;
+      try {
+        reconnectNow = await readStream();
+      } catch (error) {
+        // Network error or aborted; retry after the delay unless stopped
+        if (stopped) {
+          return;
+        }
+      }
+      if (!reconnectNow && !stopped) {
+        await new Promise((resolve) => setTimeout(resolve, retryDelay));
+      }
+    }
+  };
+
+  run();
+  return () => {
+    stopped = true;
+    controller.abort();
+  };
+};
@@ -31,6 +31,7 @@ export const AuthProvider = ({ children }) => {
         .catch(() => {
           // Token is invalid, clear it
           localStorage.removeItem('token');
+          localStorage.removeItem('refreshToken');
           localStorage.removeItem('user');
         })
         .finally(() => {
@@ -44,9 +45,10 @@ export const AuthProvider = ({ children }) => {
   const login = async (email, password) => {
     try {
       const response = await api.post('/api/auth/login', { email, password });
-      const { access_token, user: userData } = response.data;
+      const { access_token, refresh_token, user: userData } = response.data;
       
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refreshToken', refresh_token);
       localStorage.setItem('user', JSON.stringify(userData));
       
       setUser(userData);
@@ -62,9 +64,10 @@ export const AuthProvider = ({ children }) => {
   const register = async (name, email, password) => {
     try {
       const response = await api.post('/api/auth/register', { name, email, password });
-      const { access_token, user: userData } = response.data;
+      const { access_token, refresh_token, user: userData } = response.data;
       
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refreshToken', refresh_token);
       localStorage.setItem('user', JSON.stringify(userData));
       
       setUser(userData);
@@ -78,7 +81,15 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    // Revoke both tokens server-side; logging out locally does not wait for it
+    const token = localStorage.getItem('token');
+    if (token) {
+      api.post('/api/auth/logout', { refresh_token: localStorage.getItem('refreshToken') }, {
+        headers: { Authorization: `Bearer ${token}` },
+      }).catch(() => {});
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
     setUser(null);
     toast.success('Logged out successfully!');
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import api from '../config/axios';
+import { subscribeToTaskEvents } from '../config/events';
 import toast from 'react-hot-toast';
 import { format } from 'date-fns';
 import { 
@@ -45,6 +46,33 @@ const Dashboard = () => {
     fetchStats();
   }, []);
 
+  useEffect(() => {
+    // Apply changes pushed by the server, including those made in other tabs and devices
+    return subscribeToTaskEvents((type, data) => {
+      switch (type) {
+        case 'task.created':
+        case 'task.updated':
+          setTasks(current => upsertTask(current, data.task));
+          fetchStats();
+          break;
+        case 'task.deleted':
+          setTasks(current => current.filter(task => task.id !== data.id));
+          fetchStats();
+          break;
+        case 'tasks.changed':
+        case 'resync':
+          fetchChanges(data.since);
+          fetchStats();
+          break;
+        case 'stats.changed':
+          fetchStats();
+          break;
+        default:
+          break;
+      }
+    });
+  }, []);
+
   useEffect(() => {
     applyFilters();
   }, [tasks, searchTerm, filters]);
@@ -60,6 +88,29 @@ const Dashboard = () => {
     }
   };
 
+  // Insert or replace a task; an event may arrive before or after the response to the same change
+  const upsertTask = (list, task) => (
+    list.some(item => item.id === task.id)
+      ? list.map(item => (item.id === task.id ? task : item))
+      : [task, ...list]
+  );
+
+  const fetchChanges = async (since) => {
+    try {
+      const response = await api.get('/api/tasks/changes', { params: { since } });
+      if (response.data.full_sync_required) {
+        await fetchTasks();
+        return;
+      }
+      const deleted = new Set(response.data.deleted);
+      setTasks(current => response.data.changed.reduce(
+        upsertTask, current.filter(task => !deleted.has(task.id))
+      ));
+    } catch (error) {
+      console.error('Failed to fetch task changes:', error);
+    }
+  };
+
   const fetchStats = async () => {
     try {
       const response = await api.get('/api/stats');
@@ -101,7 +152,8 @@ const Dashboard = () => {
   const handleCreateTask = async (taskData) => {
     try {
       const response = await api.post('/api/tasks', taskData);
-      setTasks([response.data.task, ...tasks]);
+      setTasks(current => upsertTask(current, response.data.task));
+      // Not left to the event stream, which may be off or served by another worker
       await fetchStats();
       toast.success('Task created successfully!');
     } catch (error) {
@@ -112,9 +164,7 @@ const Dashboard = () => {
   const handleUpdateTask = async (taskId, taskData) => {
     try {
       const response = await api.put(`/api/tasks/${taskId}`, taskData);
-      setTasks(tasks.map(task => 
-        task.id === taskId ? response.data.task : task
-      ));
+      setTasks(current => upsertTask(current, response.data.task));
       await fetchStats();
       toast.success('Task updated successfully!');
     } catch (error) {
@@ -125,7 +175,7 @@ const Dashboard = () => {
   const handleDeleteTask = async (taskId) => {
     try {
       await api.delete(`/api/tasks/${taskId}`);
-      setTasks(tasks.filter(task => task.id !== taskId));
+      setTasks(current => current.filter(task => task.id !== taskId));
       await fetchStats();
       toast.success('Task deleted successfully!');
     } catch (error) {
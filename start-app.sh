@@ -84,13 +84,18 @@ fi
 
 # Initialize database
 print_status "Initializing database..."
-python -c "from app import app, db; app.app_context().push(); db.create_all(); print('Database initialized successfully!')"
+python migrations.py
 
 # Start backend in background
 print_status "Starting Flask backend on port $BACKEND_PORT..."
 python app.py &
 BACKEND_PID=$!
 
+# Start the background job worker
+print_status "Starting background job worker..."
+python worker.py &
+WORKER_PID=$!
+
 # Wait for backend to start
 print_status "Waiting for backend to start..."
 sleep 5
@@ -156,6 +161,7 @@ cleanup() {
     echo ""
     print_status "Stopping servers..."
     kill $BACKEND_PID 2>/dev/null
+    kill $WORKER_PID 2>/dev/null
     kill $FRONTEND_PID 2>/dev/null
     print_success "Servers stopped successfully!"
     exit 0
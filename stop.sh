@@ -22,6 +22,9 @@ print_success() {
 print_status "Stopping Flask backend..."
 pkill -f "python app.py" 2>/dev/null || true
 
+print_status "Stopping background job worker..."
+pkill -f "python worker.py" 2>/dev/null || true
+
 print_status "Stopping React frontend..."
 pkill -f "npm start" 2>/dev/null || true
 pkill -f "react-scripts start" 2>/dev/null || true
@@ -0,0 +1,75 @@
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+TIMEOUT = 30
+
+def test_get_tasks_with_cursor_pagination_and_fields():
+    # Login to get access token
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    access_token = login_resp.json().get("access_token")
+    assert access_token, "No access token returned on login"
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    # Create a handful of tasks so there is more than one page
+    created_ids = []
+    try:
+        for i in range(5):
+            create_resp = requests.post(
+                TASKS_URL,
+                json={"title": f"Pagination task {i}", "tags": ["paging"]},
+                headers=headers,
+                timeout=TIMEOUT
+            )
+            assert create_resp.status_code == 201, f"Create task failed: {create_resp.text}"
+            created_ids.append(create_resp.json()["task"]["id"])
+
+        # Walk all pages with a small limit and a field projection
+        seen_ids = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 2, "fields": "id,title"}
+            if cursor:
+                params["cursor"] = cursor
+            resp = requests.get(TASKS_URL, headers=headers, params=params, timeout=TIMEOUT)
+            assert resp.status_code == 200, f"Paginated request failed: {resp.status_code} - {resp.text}"
+            data = resp.json()
+            assert "next_cursor" in data, "next_cursor missing in paginated response"
+            assert len(data["tasks"]) <= 2, "Page size exceeds requested limit"
+            for task in data["tasks"]:
+                assert set(task.keys()) == {"id", "title"}, f"Unexpected fields in projected task: {task.keys()}"
+                seen_ids.append(task["id"])
+            pages += 1
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+            assert pages < 100, "Pagination did not terminate"
+
+        assert len(seen_ids) == len(set(seen_ids)), "Pagination returned duplicate tasks"
+        for task_id in created_ids:
+            assert task_id in seen_ids, f"Task {task_id} missing from paginated results"
+
+        # Pages must match the unpaginated ordering
+        full_resp = requests.get(TASKS_URL, headers=headers, timeout=TIMEOUT)
+        assert full_resp.status_code == 200
+        full_data = full_resp.json()
+        assert "next_cursor" not in full_data, "Unpaginated response should not include next_cursor"
+        assert [t["id"] for t in full_data["tasks"]] == seen_ids, "Paginated order differs from full listing"
+
+        # Invalid parameters are rejected
+        for params in ({"fields": "id,password_hash"}, {"limit": 0}, {"limit": "abc"}, {"cursor": "not-a-cursor"}):
+            bad_resp = requests.get(TASKS_URL, headers=headers, params=params, timeout=TIMEOUT)
+            assert bad_resp.status_code == 400, f"Expected 400 for {params} but got {bad_resp.status_code}"
+    finally:
+        for task_id in created_ids:
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_get_tasks_with_cursor_pagination_and_fields()
@@ -0,0 +1,66 @@
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+STATS_URL = f"{BASE_URL}/api/stats"
+TIMEOUT = 30
+
+def test_stats_counters_match_live_aggregation():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    def get_stats(mode):
+        resp = requests.get(STATS_URL, headers=headers, params={"mode": mode}, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Stats ({mode}) failed: {resp.status_code} - {resp.text}"
+        return resp.json()
+
+    def assert_modes_agree(step):
+        aggregate = get_stats("aggregate")
+        counters = get_stats("counters")
+        assert aggregate == counters, f"Stats modes disagree after {step}: {aggregate} != {counters}"
+        return aggregate
+
+    baseline = assert_modes_agree("baseline")
+
+    created_ids = []
+    try:
+        for status in ("Pending", "In Progress", "Completed"):
+            resp = requests.post(
+                TASKS_URL,
+                json={"title": f"Stats task {status}", "status": status, "due_date": "2000-01-01T00:00:00Z"},
+                headers=headers,
+                timeout=TIMEOUT
+            )
+            assert resp.status_code == 201, f"Create task failed: {resp.text}"
+            created_ids.append(resp.json()["task"]["id"])
+
+        stats = assert_modes_agree("create")
+        assert stats["total_tasks"] == baseline["total_tasks"] + 3
+        assert stats["completed_tasks"] == baseline["completed_tasks"] + 1
+        assert stats["overdue_tasks"] == baseline["overdue_tasks"] + 2
+
+        resp = requests.put(f"{TASKS_URL}/{created_ids[0]}", json={"status": "Completed"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Update task failed: {resp.text}"
+        stats = assert_modes_agree("update")
+        assert stats["completed_tasks"] == baseline["completed_tasks"] + 2
+        assert stats["pending_tasks"] == baseline["pending_tasks"]
+
+        resp = requests.delete(f"{TASKS_URL}/{created_ids.pop()}", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Delete task failed: {resp.text}"
+        stats = assert_modes_agree("delete")
+        assert stats["total_tasks"] == baseline["total_tasks"] + 2
+
+        bad_resp = requests.get(STATS_URL, headers=headers, params={"mode": "bogus"}, timeout=TIMEOUT)
+        assert bad_resp.status_code == 400, f"Expected 400 for unknown mode but got {bad_resp.status_code}"
+    finally:
+        for task_id in created_ids:
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_stats_counters_match_live_aggregation()
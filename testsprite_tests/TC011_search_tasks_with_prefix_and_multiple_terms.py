@@ -0,0 +1,55 @@
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+TIMEOUT = 30
+
+def test_search_tasks_with_prefix_and_multiple_terms():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    tasks_to_create = [
+        {"title": "Quarterly budget review", "description": "Prepare the finance spreadsheet"},
+        {"title": "Budget meeting", "description": "Discuss quarterly numbers with finance"},
+        {"title": "Buy groceries", "description": "Milk and bread"},
+    ]
+    created = {}
+    try:
+        for payload in tasks_to_create:
+            resp = requests.post(TASKS_URL, json=payload, headers=headers, timeout=TIMEOUT)
+            assert resp.status_code == 201, f"Create task failed: {resp.text}"
+            created[payload["title"]] = resp.json()["task"]["id"]
+
+        def search_ids(term):
+            resp = requests.get(TASKS_URL, headers=headers, params={"search": term}, timeout=TIMEOUT)
+            assert resp.status_code == 200, f"Search '{term}' failed: {resp.status_code} - {resp.text}"
+            return [task["id"] for task in resp.json()["tasks"]]
+
+        # Prefix matching on title and description
+        ids = search_ids("budg")
+        assert created["Quarterly budget review"] in ids and created["Budget meeting"] in ids
+        assert created["Buy groceries"] not in ids
+
+        # Multiple terms must all match
+        ids = search_ids("quarter spreadsheet")
+        assert created["Quarterly budget review"] in ids
+        assert created["Budget meeting"] not in ids
+
+        # Updated text is searchable and old text is not
+        task_id = created["Buy groceries"]
+        resp = requests.put(f"{TASKS_URL}/{task_id}", json={"title": "Pick up dry cleaning"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Update task failed: {resp.text}"
+        assert task_id in search_ids("cleaning")
+        assert task_id not in search_ids("groceries")
+    finally:
+        for task_id in created.values():
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_search_tasks_with_prefix_and_multiple_terms()
@@ -0,0 +1,56 @@
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+TAGS_URL = f"{BASE_URL}/api/tags"
+TIMEOUT = 30
+
+def test_filter_tasks_by_tags_and_list_tags():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    tagged_tasks = {
+        "Tagged task A": ["tc012-alpha", "tc012-beta"],
+        "Tagged task B": ["tc012-alpha"],
+        "Tagged task C": ["tc012-gamma"],
+    }
+    created = {}
+    try:
+        for title, tags in tagged_tasks.items():
+            resp = requests.post(TASKS_URL, json={"title": title, "tags": tags}, headers=headers, timeout=TIMEOUT)
+            assert resp.status_code == 201, f"Create task failed: {resp.text}"
+            assert resp.json()["task"]["tags"] == tags, "Tags not returned in the order given"
+            created[title] = resp.json()["task"]["id"]
+
+        def tagged_ids(params):
+            resp = requests.get(TASKS_URL, headers=headers, params=params, timeout=TIMEOUT)
+            assert resp.status_code == 200, f"Tag filter {params} failed: {resp.status_code} - {resp.text}"
+            return {task["id"] for task in resp.json()["tasks"]}
+
+        assert tagged_ids({"tag": "tc012-alpha"}) == {created["Tagged task A"], created["Tagged task B"]}
+        assert tagged_ids({"tag": "tc012-beta,tc012-gamma"}) == {created["Tagged task A"], created["Tagged task C"]}
+        assert tagged_ids({"tag": "tc012-alpha,tc012-beta", "tag_match": "all"}) == {created["Tagged task A"]}
+        assert tagged_ids({"tag": "tc012-missing"}) == set()
+
+        bad_resp = requests.get(TASKS_URL, headers=headers, params={"tag": "x", "tag_match": "some"}, timeout=TIMEOUT)
+        assert bad_resp.status_code == 400, f"Expected 400 for invalid tag_match but got {bad_resp.status_code}"
+
+        # Tag listing reports per-tag task counts
+        resp = requests.get(TAGS_URL, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Tag listing failed: {resp.status_code} - {resp.text}"
+        counts = {tag["name"]: tag["count"] for tag in resp.json()["tags"]}
+        assert counts.get("tc012-alpha") == 2
+        assert counts.get("tc012-beta") == 1
+        assert counts.get("tc012-gamma") == 1
+    finally:
+        for task_id in created.values():
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_filter_tasks_by_tags_and_list_tags()
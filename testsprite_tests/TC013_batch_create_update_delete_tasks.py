@@ -0,0 +1,86 @@
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+BATCH_URL = f"{BASE_URL}/api/tasks/batch"
+TIMEOUT = 30
+
+def test_batch_create_update_delete_tasks():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    created_ids = []
+    try:
+        # Create many tasks in one request
+        operations = [
+            {"op": "create", "data": {"title": f"Batch task {i}", "priority": "Low", "tags": ["batch"]}}
+            for i in range(200)
+        ]
+        resp = requests.post(BATCH_URL, json={"operations": operations}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Batch create failed: {resp.status_code} - {resp.text}"
+        data = resp.json()
+        assert data["succeeded"] == 200 and data["failed"] == 0
+        created_ids = [result["id"] for result in data["results"]]
+        assert all(isinstance(task_id, int) for task_id in created_ids)
+
+        # Mixed batch with per-item errors
+        operations = [
+            {"op": "update", "id": created_ids[0], "data": {"status": "Completed", "title": "Batch updated"}},
+            {"op": "delete", "id": created_ids[1]},
+            {"op": "create", "data": {"description": "missing title"}},
+            {"op": "update", "id": 999999999, "data": {"title": "nope"}},
+        ]
+        resp = requests.post(BATCH_URL, json={"operations": operations}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Mixed batch failed: {resp.status_code} - {resp.text}"
+        statuses = [result["status"] for result in resp.json()["results"]]
+        assert statuses == [200, 200, 400, 404], f"Unexpected per-item statuses: {statuses}"
+        deleted_id = created_ids.pop(1)
+
+        tasks = requests.get(TASKS_URL, headers=headers, params={"tag": "batch"}, timeout=TIMEOUT).json()["tasks"]
+        by_id = {task["id"]: task for task in tasks}
+        assert deleted_id not in by_id, "Deleted task still listed"
+        assert by_id[created_ids[0]]["title"] == "Batch updated"
+        assert by_id[created_ids[0]]["status"] == "Completed"
+
+        # A task retagged and then deleted in the same batch is just deleted (new and existing tag names)
+        retagged_id = created_ids.pop(3)
+        operations = [
+            {"op": "update", "id": retagged_id, "data": {"tags": ["batch", "batch-retagged"]}},
+            {"op": "delete", "id": retagged_id},
+        ]
+        resp = requests.post(BATCH_URL, json={"operations": operations}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Update then delete failed: {resp.status_code} - {resp.text}"
+        statuses = [result["status"] for result in resp.json()["results"]]
+        assert statuses == [200, 200], f"Unexpected per-item statuses: {statuses}"
+        tasks = requests.get(TASKS_URL, headers=headers, params={"tag": "batch"}, timeout=TIMEOUT).json()["tasks"]
+        assert retagged_id not in {task["id"] for task in tasks}, "Retagged task not deleted"
+
+        # Atomic batches apply nothing when any operation is invalid
+        operations = [
+            {"op": "delete", "id": created_ids[2]},
+            {"op": "create", "data": {"title": "bad date", "due_date": "not-a-date"}},
+        ]
+        resp = requests.post(BATCH_URL, json={"operations": operations, "atomic": True}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Expected 400 for rejected atomic batch but got {resp.status_code}"
+        tasks = requests.get(TASKS_URL, headers=headers, params={"tag": "batch"}, timeout=TIMEOUT).json()["tasks"]
+        assert created_ids[2] in {task["id"] for task in tasks}, "Atomic batch partially applied"
+
+        resp = requests.post(BATCH_URL, json={"operations": []}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Expected 400 for empty batch but got {resp.status_code}"
+    finally:
+        if created_ids:
+            try:
+                requests.post(
+                    BATCH_URL,
+                    json={"operations": [{"op": "delete", "id": task_id} for task_id in created_ids]},
+                    headers=headers,
+                    timeout=TIMEOUT
+                )
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_batch_create_update_delete_tasks()
@@ -0,0 +1,51 @@
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+STATS_URL = f"{BASE_URL}/api/stats"
+TIMEOUT = 30
+
+def test_conditional_get_tasks_and_stats_with_etag():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    task_id = None
+    try:
+        for url in (TASKS_URL, STATS_URL):
+            resp = requests.get(url, headers=headers, timeout=TIMEOUT)
+            assert resp.status_code == 200, f"GET {url} failed: {resp.status_code} - {resp.text}"
+            etag = resp.headers.get("ETag")
+            assert etag, f"No ETag returned by {url}"
+
+            # Unchanged data revalidates with an empty 304
+            resp = requests.get(url, headers={**headers, "If-None-Match": etag}, timeout=TIMEOUT)
+            assert resp.status_code == 304, f"Expected 304 from {url} but got {resp.status_code}"
+            assert not resp.content, "304 response should not have a body"
+            assert resp.headers.get("ETag") == etag
+
+        # Different filters produce a different representation
+        tasks_etag = requests.get(TASKS_URL, headers=headers, timeout=TIMEOUT).headers["ETag"]
+        stats_etag = requests.get(STATS_URL, headers=headers, timeout=TIMEOUT).headers["ETag"]
+        resp = requests.get(TASKS_URL, headers={**headers, "If-None-Match": tasks_etag}, params={"status": "Completed"}, timeout=TIMEOUT)
+        assert resp.status_code == 200, "Filtered list must not match the unfiltered ETag"
+
+        # Any write invalidates both ETags
+        resp = requests.post(TASKS_URL, json={"title": "ETag task"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 201, f"Create task failed: {resp.text}"
+        task_id = resp.json()["task"]["id"]
+        for url, etag in ((TASKS_URL, tasks_etag), (STATS_URL, stats_etag)):
+            resp = requests.get(url, headers={**headers, "If-None-Match": etag}, timeout=TIMEOUT)
+            assert resp.status_code == 200, f"Expected fresh 200 from {url} after a write but got {resp.status_code}"
+            assert resp.headers.get("ETag") != etag
+    finally:
+        if task_id:
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_conditional_get_tasks_and_stats_with_etag()
@@ -0,0 +1,71 @@
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+CHANGES_URL = f"{BASE_URL}/api/tasks/changes"
+TIMEOUT = 30
+
+def test_incremental_sync_of_task_changes():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    def sync(since=None):
+        params = {"since": since} if since else {}
+        resp = requests.get(CHANGES_URL, headers=headers, params=params, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Sync failed: {resp.status_code} - {resp.text}"
+        data = resp.json()
+        assert data.get("next_since"), "next_since missing in sync response"
+        return data
+
+    created_ids = []
+    try:
+        # Initial sync asks for a full reload and hands out a token
+        data = sync()
+        assert data["full_sync_required"] is True
+        token = data["next_since"]
+
+        # Nothing changed yet
+        data = sync(token)
+        assert data["full_sync_required"] is False
+        assert data["changed"] == [] and data["deleted"] == []
+
+        for title in ("Sync task A", "Sync task B"):
+            resp = requests.post(TASKS_URL, json={"title": title, "tags": ["sync"]}, headers=headers, timeout=TIMEOUT)
+            assert resp.status_code == 201, f"Create task failed: {resp.text}"
+            created_ids.append(resp.json()["task"]["id"])
+
+        data = sync(token)
+        assert [task["id"] for task in data["changed"]] == created_ids
+        assert data["changed"][0]["tags"] == ["sync"]
+        token = data["next_since"]
+
+        # Update one task and delete the other
+        resp = requests.put(f"{TASKS_URL}/{created_ids[0]}", json={"status": "Completed"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Update task failed: {resp.text}"
+        resp = requests.delete(f"{TASKS_URL}/{created_ids[1]}", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Delete task failed: {resp.text}"
+        deleted_id = created_ids.pop()
+
+        data = sync(token)
+        assert [task["id"] for task in data["changed"]] == [created_ids[0]]
+        assert data["changed"][0]["status"] == "Completed"
+        assert data["deleted"] == [deleted_id]
+
+        # The next token has nothing pending
+        data = sync(data["next_since"])
+        assert data["changed"] == [] and data["deleted"] == []
+
+        resp = requests.get(CHANGES_URL, headers=headers, params={"since": "garbage"}, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Expected 400 for an invalid token but got {resp.status_code}"
+    finally:
+        for task_id in created_ids:
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_incremental_sync_of_task_changes()
@@ -0,0 +1,72 @@
+import os
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+STATS_URL = f"{BASE_URL}/api/stats"
+CACHE_STATS_URL = f"{BASE_URL}/api/cache/stats"
+TIMEOUT = 30
+# The server's METRICS_TOKEN; cache stats are not served without one
+METRICS_HEADERS = {"Authorization": f"Bearer {os.environ.get('METRICS_TOKEN', '')}"}
+
+def test_cached_task_list_reflects_writes():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    cache_resp = requests.get(CACHE_STATS_URL, headers=METRICS_HEADERS, timeout=TIMEOUT)
+    if cache_resp.status_code == 403:
+        # No METRICS_TOKEN on the server: the lists are still checked, just not the counters
+        cache_enabled = False
+    else:
+        assert cache_resp.status_code == 200, f"Cache stats failed: {cache_resp.status_code}"
+        cache_enabled = cache_resp.json()["enabled"]
+        resp = requests.get(CACHE_STATS_URL, timeout=TIMEOUT)
+        assert resp.status_code == 401, f"Cache stats served without the metrics token: {resp.status_code}"
+
+    def list_ids():
+        resp = requests.get(TASKS_URL, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"List tasks failed: {resp.status_code} - {resp.text}"
+        return [task["id"] for task in resp.json()["tasks"]]
+
+    task_id = None
+    try:
+        before = list_ids()
+        again = list_ids()
+        assert before == again, "Repeated list returned different results"
+        if cache_enabled:
+            stats = requests.get(CACHE_STATS_URL, headers=METRICS_HEADERS, timeout=TIMEOUT).json()
+            for counter in ("hits", "misses", "invalidations"):
+                assert isinstance(stats[counter], int), f"Cache counter '{counter}' missing"
+            assert stats["hits"] >= 1, "Repeated list should have been served from the cache"
+
+        total_before = requests.get(STATS_URL, headers=headers, timeout=TIMEOUT).json()["total_tasks"]
+
+        # A write must be visible immediately on the next read
+        resp = requests.post(TASKS_URL, json={"title": "Cache invalidation task"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 201, f"Create task failed: {resp.text}"
+        task_id = resp.json()["task"]["id"]
+        assert task_id in list_ids(), "Created task missing from cached list"
+        assert requests.get(STATS_URL, headers=headers, timeout=TIMEOUT).json()["total_tasks"] == total_before + 1
+
+        resp = requests.put(f"{TASKS_URL}/{task_id}", json={"title": "Cache invalidation task (edited)"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Update task failed: {resp.text}"
+        titles = {task["id"]: task["title"] for task in requests.get(TASKS_URL, headers=headers, timeout=TIMEOUT).json()["tasks"]}
+        assert titles[task_id] == "Cache invalidation task (edited)", "Cached list shows a stale title"
+
+        resp = requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Delete task failed: {resp.text}"
+        assert task_id not in list_ids(), "Deleted task still in cached list"
+        task_id = None
+    finally:
+        if task_id:
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_cached_task_list_reflects_writes()
@@ -0,0 +1,58 @@
+import os
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+METRICS_URL = f"{BASE_URL}/metrics"
+TIMEOUT = 30
+# The server's METRICS_TOKEN
+METRICS_HEADERS = {"Authorization": f"Bearer {os.environ.get('METRICS_TOKEN', '')}"}
+
+def test_request_metrics_and_server_timing():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    metrics_resp = requests.get(METRICS_URL, headers=METRICS_HEADERS, timeout=TIMEOUT)
+    if metrics_resp.status_code == 403:
+        # Metrics are on but not served without a METRICS_TOKEN
+        assert "METRICS_TOKEN" in metrics_resp.json()["error"], metrics_resp.text
+        return
+    if metrics_resp.status_code == 404:
+        # Instrumentation is opt-in (REQUEST_METRICS=true); nothing to check when it is off
+        resp = requests.get(TASKS_URL, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"List tasks failed: {resp.status_code}"
+        assert "Server-Timing" not in resp.headers, "Server-Timing should only be sent when metrics are enabled"
+        return
+    assert metrics_resp.status_code == 200, f"Metrics failed: {metrics_resp.status_code}"
+    resp = requests.get(METRICS_URL, timeout=TIMEOUT)
+    assert resp.status_code == 401, f"Metrics served without the metrics token: {resp.status_code}"
+
+    task_id = None
+    try:
+        resp = requests.post(TASKS_URL, json={"title": "Metrics task"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 201, f"Create task failed: {resp.status_code} - {resp.text}"
+        task_id = resp.json()["task"]["id"]
+
+        resp = requests.get(TASKS_URL, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"List tasks failed: {resp.status_code}"
+        timing = resp.headers.get("Server-Timing", "")
+        assert "total;dur=" in timing, f"Missing total in Server-Timing: {timing!r}"
+        assert "db;" in timing, f"Missing db in Server-Timing: {timing!r}"
+
+        body = requests.get(METRICS_URL, headers=METRICS_HEADERS, timeout=TIMEOUT).text
+        assert "# TYPE todo_http_request_duration_seconds histogram" in body, "Duration histogram missing"
+        assert 'todo_http_requests_total{route="/api/tasks",method="GET",status="200"}' in body, \
+            "Task list requests missing from metrics"
+        assert 'todo_http_request_duration_seconds_bucket{route="/api/tasks",method="POST",le="+Inf"}' in body, \
+            "Task create histogram missing from metrics"
+        assert 'todo_db_queries_total{route="/api/tasks"}' in body, "SQL query counter missing from metrics"
+    finally:
+        if task_id is not None:
+            requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+
+test_request_metrics_and_server_timing()
@@ -0,0 +1,47 @@
+import uuid
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TIMEOUT = 30
+# Default RATE_LIMIT_LOGIN_EMAIL is 10/minute
+MAX_ATTEMPTS = 30
+# Default RATE_LIMIT_LOGIN_IP is 60/minute
+IP_LIMIT = 60
+
+def test_login_rate_limit_returns_429_with_retry_after():
+    # A fresh unknown email, so the attempts only count against this test's bucket
+    email = f"ratelimit-{uuid.uuid4().hex}@example.com"
+    payload = {"email": email, "password": "WrongPassword@1"}
+
+    statuses = []
+    limited = None
+    for _ in range(MAX_ATTEMPTS):
+        resp = requests.post(LOGIN_URL, json=payload, timeout=TIMEOUT)
+        statuses.append(resp.status_code)
+        if resp.status_code == 429:
+            limited = resp
+            break
+        assert resp.status_code == 401, f"Unexpected status {resp.status_code}: {resp.text}"
+
+    if limited is None:
+        # Rate limiting is disabled on this server (RATE_LIMIT_BACKEND=none or an empty limit)
+        return
+    assert len(statuses) > 1, "The first login attempt should not be rate limited"
+    retry_after = limited.headers.get("Retry-After")
+    assert retry_after is not None and int(retry_after) >= 1, f"Invalid Retry-After header: {retry_after!r}"
+    assert "error" in limited.json(), "429 response should carry an error message"
+
+    # Refused attempts do not use up the client's IP bucket (a 401 comes from another worker with
+    # in-memory buckets that has not limited this email yet)
+    for _ in range(IP_LIMIT):
+        resp = requests.post(LOGIN_URL, json=payload, timeout=TIMEOUT)
+        assert resp.status_code in (401, 429), f"Unexpected status {resp.status_code}: {resp.text}"
+
+    # Other accounts are unaffected by this email's bucket
+    other = requests.post(LOGIN_URL, json={"email": f"other-{uuid.uuid4().hex}@example.com",
+                                           "password": "WrongPassword@1"}, timeout=TIMEOUT)
+    assert other.status_code == 401, f"Other email should not be limited: {other.status_code}"
+
+test_login_rate_limit_returns_429_with_retry_after()
@@ -0,0 +1,77 @@
+import time
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+REFRESH_URL = f"{BASE_URL}/api/auth/refresh"
+LOGOUT_URL = f"{BASE_URL}/api/auth/logout"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+TIMEOUT = 30
+# Other workers may trust a token they already checked for TOKEN_REVOCATION_CACHE_TTL (default 5s) more
+REVOCATION_DELAY = 6
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def until_refused(send):
+    """Repeat a request until it is refused with 401 or REVOCATION_DELAY has passed, returning the last response."""
+    deadline = time.monotonic() + REVOCATION_DELAY
+    while True:
+        resp = send()
+        if resp.status_code == 401 or time.monotonic() > deadline:
+            return resp
+        time.sleep(0.5)
+
+def test_refresh_token_rotation_and_logout_revocation():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    tokens = login_resp.json()
+    assert "refresh_token" in tokens, "Login should return a refresh token"
+
+    # A refresh token is not accepted in place of an access token
+    resp = requests.get(TASKS_URL, headers=bearer(tokens["refresh_token"]), timeout=TIMEOUT)
+    assert resp.status_code == 422, f"Refresh token used as access token: {resp.status_code}"
+
+    resp = requests.post(REFRESH_URL, headers=bearer(tokens["refresh_token"]), timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Refresh failed: {resp.status_code} - {resp.text}"
+    refreshed = resp.json()
+    assert refreshed.get("access_token") and refreshed.get("refresh_token"), "Refresh should return both tokens"
+
+    resp = requests.get(TASKS_URL, headers=bearer(refreshed["access_token"]), timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Refreshed access token rejected: {resp.status_code}"
+
+    # Refresh tokens rotate: the one already used cannot be replayed
+    resp = until_refused(lambda: requests.post(REFRESH_URL, headers=bearer(tokens["refresh_token"]), timeout=TIMEOUT))
+    assert resp.status_code == 401, f"Used refresh token accepted again: {resp.status_code}"
+
+    # Logging out revokes the access token and the refresh token sent with it
+    resp = requests.post(LOGOUT_URL, json={"refresh_token": refreshed["refresh_token"]},
+                         headers=bearer(refreshed["access_token"]), timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Logout failed: {resp.status_code} - {resp.text}"
+
+    resp = until_refused(lambda: requests.get(TASKS_URL, headers=bearer(refreshed["access_token"]), timeout=TIMEOUT))
+    assert resp.status_code == 401, f"Revoked access token accepted: {resp.status_code}"
+    resp = until_refused(lambda: requests.post(REFRESH_URL, headers=bearer(refreshed["refresh_token"]), timeout=TIMEOUT))
+    assert resp.status_code == 401, f"Revoked refresh token accepted: {resp.status_code}"
+
+    # Tokens from other logins stay valid
+    resp = requests.get(TASKS_URL, headers=bearer(tokens["access_token"]), timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Unrelated access token rejected: {resp.status_code}"
+
+    # Logging out everywhere revokes every earlier token, but not a login made right after it (same second)
+    resp = requests.post(LOGOUT_URL, json={"all": True}, headers=bearer(tokens["access_token"]), timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Logout everywhere failed: {resp.status_code} - {resp.text}"
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login after logout everywhere failed: {login_resp.text}"
+
+    resp = until_refused(lambda: requests.get(TASKS_URL, headers=bearer(tokens["access_token"]), timeout=TIMEOUT))
+    assert resp.status_code == 401, f"Token from before logout everywhere accepted: {resp.status_code}"
+    resp = requests.get(TASKS_URL, headers=bearer(login_resp.json()["access_token"]), timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Token from the new login rejected: {resp.status_code}"
+    resp = requests.post(REFRESH_URL, headers=bearer(login_resp.json()["refresh_token"]), timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Refresh token from the new login rejected: {resp.status_code}"
+
+test_refresh_token_rotation_and_logout_revocation()
@@ -0,0 +1,56 @@
+import csv
+import gzip
+import io
+import json
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+EXPORT_URL = f"{BASE_URL}/api/tasks/export"
+TIMEOUT = 30
+
+def test_export_tasks_as_ndjson_and_csv():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    task_ids = []
+    try:
+        for i in range(3):
+            resp = requests.post(TASKS_URL, json={"title": f"Export task {i}", "category": "ExportTest",
+                                                  "tags": ["export", f"n{i}"]}, headers=headers, timeout=TIMEOUT)
+            assert resp.status_code == 201, f"Create task failed: {resp.status_code} - {resp.text}"
+            task_ids.append(resp.json()["task"]["id"])
+
+        # NDJSON: one task object per line, filters as for the task list
+        resp = requests.get(EXPORT_URL, params={"format": "ndjson", "category": "ExportTest"},
+                            headers={**headers, "Accept-Encoding": "identity"}, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"NDJSON export failed: {resp.status_code} - {resp.text}"
+        assert resp.headers["Content-Type"].startswith("application/x-ndjson")
+        assert "attachment" in resp.headers.get("Content-Disposition", "")
+        rows = [json.loads(line) for line in resp.text.splitlines() if line]
+        assert sorted(row["id"] for row in rows) == sorted(task_ids), f"Unexpected NDJSON rows: {rows}"
+        assert all("export" in row["tags"] for row in rows), "Tags missing from NDJSON export"
+
+        # CSV with a projection, gzip-compressed on request
+        resp = requests.get(EXPORT_URL, params={"format": "csv", "category": "ExportTest", "fields": "id,title,tags"},
+                            headers={**headers, "Accept-Encoding": "gzip"}, timeout=TIMEOUT, stream=True)
+        assert resp.status_code == 200, f"CSV export failed: {resp.status_code}"
+        assert resp.headers.get("Content-Encoding") == "gzip", "Export should be gzip-compressed"
+        body = gzip.decompress(resp.raw.read()).decode("utf-8")
+        reader = list(csv.DictReader(io.StringIO(body)))
+        assert list(reader[0].keys()) == ["id", "title", "tags"], f"Unexpected CSV header: {list(reader[0].keys())}"
+        assert sorted(int(row["id"]) for row in reader) == sorted(task_ids), "Unexpected CSV rows"
+        assert all(row["tags"].startswith("export,") for row in reader), "Tags should be one comma-separated cell"
+
+        resp = requests.get(EXPORT_URL, params={"format": "xml"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Unknown format should be rejected: {resp.status_code}"
+    finally:
+        for task_id in task_ids:
+            requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+
+test_export_tasks_as_ndjson_and_csv()
@@ -0,0 +1,62 @@
+import json
+import uuid
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+IMPORT_URL = f"{BASE_URL}/api/tasks/import"
+TIMEOUT = 30
+
+def test_import_tasks_from_ndjson_and_csv():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    category = f"Import-{uuid.uuid4().hex[:8]}"
+
+    try:
+        lines = [
+            json.dumps({"title": "Imported 1", "category": category, "tags": ["imported"]}),
+            json.dumps({"title": "", "category": category}),
+            "not json",
+            json.dumps({"title": "Imported 2", "category": category, "due_date": "2030-01-01T09:00:00"}),
+            json.dumps({"title": "Bad date", "category": category, "due_date": "tomorrow"}),
+            json.dumps({"title": "Imported 3", "category": category, "status": "Completed"}),
+            # Wrong types are per-row errors; the rest of the batch is still imported
+            json.dumps({"title": "Object description", "category": category, "description": {"a": 1}}),
+            json.dumps({"title": "Imported 4", "category": category}),
+        ]
+        resp = requests.post(IMPORT_URL, params={"format": "ndjson", "batch_size": 2},
+                             data="\n".join(lines).encode(), headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"NDJSON import failed: {resp.status_code} - {resp.text}"
+        result = resp.json()
+        assert result["imported"] == 4 and result["failed"] == 4, f"Unexpected totals: {result}"
+        assert result["batches"] == 4, f"Expected 4 batches of 2 rows: {result}"
+        assert [error["line"] for error in result["errors"]] == [2, 3, 5, 7], f"Unexpected errors: {result['errors']}"
+        assert "description must be a string" in result["errors"][-1]["error"], result["errors"]
+
+        csv_body = f"title,category,tags,priority\nCSV task,{category},\"imported,csv\",High\n,{category},,\n"
+        resp = requests.post(IMPORT_URL, data=csv_body.encode(), timeout=TIMEOUT,
+                             headers={**headers, "Content-Type": "text/csv"})
+        assert resp.status_code == 200, f"CSV import failed: {resp.status_code} - {resp.text}"
+        result = resp.json()
+        assert result["imported"] == 1 and result["failed"] == 1, f"Unexpected CSV totals: {result}"
+        assert result["errors"][0]["line"] == 3, f"CSV errors should point at the file line: {result['errors']}"
+
+        resp = requests.get(TASKS_URL, params={"category": category}, headers=headers, timeout=TIMEOUT)
+        tasks = {task["title"]: task for task in resp.json()["tasks"]}
+        assert set(tasks) == {"Imported 1", "Imported 2", "Imported 3", "Imported 4", "CSV task"}, f"Unexpected tasks: {set(tasks)}"
+        assert tasks["CSV task"]["tags"] == ["imported", "csv"] and tasks["CSV task"]["priority"] == "High"
+        assert tasks["Imported 3"]["status"] == "Completed"
+
+        resp = requests.post(IMPORT_URL, data=b"{}", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Missing format should be rejected: {resp.status_code}"
+    finally:
+        resp = requests.get(TASKS_URL, params={"category": category}, headers=headers, timeout=TIMEOUT)
+        for task in resp.json().get("tasks", []):
+            requests.delete(f"{TASKS_URL}/{task['id']}", headers=headers, timeout=TIMEOUT)
+
+test_import_tasks_from_ndjson_and_csv()
@@ -0,0 +1,82 @@
+import time
+import uuid
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+REGISTER_URL = f"{BASE_URL}/api/auth/register"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+JOBS_URL = f"{BASE_URL}/api/jobs"
+TIMEOUT = 30
+
+def wait_for_job(job_id, headers):
+    for _ in range(60):
+        resp = requests.get(f"{JOBS_URL}/{job_id}", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Job lookup failed: {resp.status_code} - {resp.text}"
+        job = resp.json()["job"]
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.5)
+    raise AssertionError(f"Job {job_id} did not finish: {job}")
+
+def test_background_jobs_export_stats_and_account_deletion():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    category = f"Jobs-{uuid.uuid4().hex[:8]}"
+    created_ids = []
+
+    try:
+        for i in range(3):
+            resp = requests.post(TASKS_URL, json={"title": f"Job task {i}", "category": category},
+                                 headers=headers, timeout=TIMEOUT)
+            assert resp.status_code == 201, f"Task creation failed: {resp.text}"
+            created_ids.append(resp.json()["task"]["id"])
+
+        resp = requests.post(f"{TASKS_URL}/export", params={"format": "csv", "category": category},
+                             headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 202, f"Export job not accepted: {resp.status_code} - {resp.text}"
+        assert resp.headers.get("Location", "").endswith(f"/api/jobs/{resp.json()['job']['id']}")
+        job = wait_for_job(resp.json()["job"]["id"], headers)
+        assert job["status"] == "succeeded", f"Export job failed: {job}"
+
+        resp = requests.get(f"{BASE_URL}{job['result']['download_url']}", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Download failed: {resp.status_code} - {resp.text}"
+        lines = resp.text.strip().splitlines()
+        assert len(lines) == 4 and lines[0].startswith("id,"), f"Unexpected export: {lines}"
+
+        resp = requests.post(f"{BASE_URL}/api/stats/recompute", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 202, f"Recompute not accepted: {resp.status_code} - {resp.text}"
+        job = wait_for_job(resp.json()["job"]["id"], headers)
+        stats = requests.get(f"{BASE_URL}/api/stats", headers=headers, timeout=TIMEOUT).json()
+        assert job["status"] == "succeeded" and job["result"]["total_tasks"] == stats["total_tasks"], \
+            f"Recomputed stats differ: {job} vs {stats}"
+
+        resp = requests.get(f"{JOBS_URL}/999999999", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 404, f"Unknown job should be 404: {resp.status_code}"
+
+        # A throwaway account is deleted in the background and its tokens stop working at once
+        email = f"delete-{uuid.uuid4().hex[:8]}@example.com"
+        resp = requests.post(REGISTER_URL, json={"name": "Delete Me", "email": email, "password": PASSWORD},
+                             timeout=TIMEOUT)
+        assert resp.status_code == 201, f"Registration failed: {resp.text}"
+        other = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+        requests.post(TASKS_URL, json={"title": "Doomed task"}, headers=other, timeout=TIMEOUT)
+
+        resp = requests.delete(f"{BASE_URL}/api/auth/account", json={"password": "wrong"}, headers=other,
+                               timeout=TIMEOUT)
+        assert resp.status_code == 401, f"Wrong password should be refused: {resp.status_code}"
+        resp = requests.delete(f"{BASE_URL}/api/auth/account", json={"password": PASSWORD}, headers=other,
+                               timeout=TIMEOUT)
+        assert resp.status_code == 202, f"Account deletion not accepted: {resp.status_code} - {resp.text}"
+        assert requests.get(TASKS_URL, headers=other, timeout=TIMEOUT).status_code == 401
+        resp = requests.post(LOGIN_URL, json={"email": email, "password": PASSWORD}, timeout=TIMEOUT)
+        assert resp.status_code == 401, f"Deleted account can still log in: {resp.status_code}"
+    finally:
+        for task_id in created_ids:
+            requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+
+test_background_jobs_export_stats_and_account_deletion()
@@ -0,0 +1,85 @@
+import json
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+EVENTS_URL = f"{BASE_URL}/api/events"
+TIMEOUT = 30
+
+def read_events(resp):
+    """Yield (event, id, data) for each Server-Sent Event on a streamed response."""
+    buffer = b""
+    for chunk in resp.iter_content(chunk_size=None):
+        buffer += chunk
+        while b"\n\n" in buffer:
+            block, buffer = buffer.split(b"\n\n", 1)
+            fields = dict(line.split(": ", 1) for line in block.decode().split("\n") if not line.startswith(":"))
+            if "event" in fields:
+                yield fields["event"], fields.get("id"), json.loads(fields["data"])
+
+def next_event(events, wanted):
+    for event, event_id, data in events:
+        if event == wanted:
+            return event_id, data
+    raise AssertionError(f"Stream ended before a {wanted} event")
+
+def test_task_events_stream():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    task_id = None
+
+    stream = requests.get(EVENTS_URL, headers=headers, stream=True, timeout=TIMEOUT)
+    if stream.status_code == 404:
+        # Events are off (EVENTS_BACKEND=none, the default with several gunicorn workers and the in-memory broker)
+        assert stream.json() == {"error": "Task events are disabled"}, stream.text
+        return
+    try:
+        assert stream.status_code == 200, f"Event stream failed: {stream.status_code} - {stream.text}"
+        assert stream.headers["Content-Type"].startswith("text/event-stream")
+        events = read_events(stream)
+        ready_id, ready = next_event(events, "ready")
+        assert int(ready_id) == ready["version"], f"ready should carry the current version: {ready_id} {ready}"
+
+        resp = requests.post(TASKS_URL, json={"title": "Pushed task"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 201, f"Task creation failed: {resp.text}"
+        task_id = resp.json()["task"]["id"]
+        created_id, created = next_event(events, "task.created")
+        assert created["task"]["id"] == task_id and created["task"]["title"] == "Pushed task", f"Bad event: {created}"
+        assert int(created_id) == created["version"] > ready["version"]
+
+        requests.put(f"{TASKS_URL}/{task_id}", json={"status": "Completed"}, headers=headers, timeout=TIMEOUT)
+        _, updated = next_event(events, "task.updated")
+        assert updated["task"]["status"] == "Completed" and updated["version"] > created["version"]
+
+        requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+        _, deleted = next_event(events, "task.deleted")
+        assert deleted["id"] == task_id, f"Bad delete event: {deleted}"
+        task_id = None
+    finally:
+        stream.close()
+        if task_id is not None:
+            requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+
+    # Reconnecting from the first event's version reports the missed changes as a resync
+    stream = requests.get(EVENTS_URL, headers={**headers, "Last-Event-ID": created_id}, stream=True, timeout=TIMEOUT)
+    try:
+        events = read_events(stream)
+        _, resync = next_event(events, "resync")
+        resp = requests.get(f"{TASKS_URL}/changes", params={"since": resync["since"]}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Changes feed failed: {resp.text}"
+        changes = resp.json()
+        assert deleted["id"] in changes["deleted"], f"Missed deletion not in the changes feed: {changes}"
+    finally:
+        stream.close()
+
+    resp = requests.get(EVENTS_URL, headers={**headers, "Last-Event-ID": "latest"}, timeout=TIMEOUT)
+    assert resp.status_code == 400, f"Invalid Last-Event-ID should be rejected: {resp.status_code}"
+    resp = requests.get(EVENTS_URL, timeout=TIMEOUT)
+    assert resp.status_code == 401, f"Event stream requires a token: {resp.status_code}"
+
+test_task_events_stream()
@@ -0,0 +1,66 @@
+import gzip
+import json
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+BATCH_URL = f"{BASE_URL}/api/tasks/batch"
+TIMEOUT = 30
+
+def test_response_compression_and_cache_headers():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    # Token responses must never be stored
+    assert login_resp.headers.get("Cache-Control") == "no-store", login_resp.headers.get("Cache-Control")
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    task_ids = []
+    try:
+        operations = [{"op": "create", "data": {"title": f"Compression task {i}", "description": f"Description number {i}",
+                                                "tags": ["compression-test"]}} for i in range(30)]
+        resp = requests.post(BATCH_URL, json={"operations": operations}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Batch create failed: {resp.text}"
+        task_ids = [result["id"] for result in resp.json()["results"]]
+        params = {"tag": "compression-test"}
+
+        # Large lists are gzip-compressed for clients that accept it
+        resp = requests.get(TASKS_URL, headers={**headers, "Accept-Encoding": "gzip"}, params=params, timeout=TIMEOUT, stream=True)
+        assert resp.status_code == 200, f"GET tasks failed: {resp.status_code}"
+        assert resp.headers.get("Content-Encoding") == "gzip", resp.headers
+        raw = resp.raw.read(decode_content=False)
+        compressed_tasks = json.loads(gzip.decompress(raw))["tasks"]
+        etag = resp.headers.get("ETag")
+        assert etag and etag.startswith('W/"'), f"Expected a weak ETag but got {etag}"
+        assert resp.headers.get("Cache-Control") == "private, no-cache", resp.headers.get("Cache-Control")
+        vary = [value.strip() for value in resp.headers.get("Vary", "").split(",")]
+        assert "Accept-Encoding" in vary and "Authorization" in vary, f"Unexpected Vary: {vary}"
+
+        # The identity representation has the same content and ETag
+        resp = requests.get(TASKS_URL, headers={**headers, "Accept-Encoding": "identity"}, params=params, timeout=TIMEOUT)
+        assert resp.status_code == 200
+        assert "Content-Encoding" not in resp.headers, "identity must not be compressed"
+        assert len(resp.content) > len(raw), "Compressed body should be smaller"
+        assert resp.json()["tasks"] == compressed_tasks
+        assert resp.headers.get("ETag") == etag
+
+        # Either representation revalidates with the same ETag
+        resp = requests.get(TASKS_URL, headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": etag}, params=params, timeout=TIMEOUT)
+        assert resp.status_code == 304, f"Expected 304 but got {resp.status_code}"
+
+        # Small bodies are not worth compressing
+        resp = requests.get(TASKS_URL, headers={**headers, "Accept-Encoding": "gzip"}, params={**params, "limit": 1}, timeout=TIMEOUT)
+        assert resp.status_code == 200
+        assert "Content-Encoding" not in resp.headers, "Small responses should be sent uncompressed"
+    finally:
+        if task_ids:
+            try:
+                requests.post(BATCH_URL, json={"operations": [{"op": "delete", "id": task_id} for task_id in task_ids]},
+                              headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_response_compression_and_cache_headers()
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+BATCH_URL = f"{BASE_URL}/api/tasks/batch"
+TIMEOUT = 30
+
+def test_task_sorting_and_filtering():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    now = datetime.now(timezone.utc)
+    tasks = [
+        {"title": "Sort overdue", "priority": "Low", "status": "Pending", "due_date": (now - timedelta(days=3)).isoformat()},
+        {"title": "Sort done late", "priority": "High", "status": "Completed", "due_date": (now - timedelta(days=2)).isoformat()},
+        {"title": "Sort soon", "priority": "High", "status": "In Progress", "due_date": (now + timedelta(hours=1)).isoformat()},
+        {"title": "Sort later", "priority": "Medium", "status": "Pending", "due_date": (now + timedelta(days=30)).isoformat()},
+        {"title": "Sort undated", "priority": "Medium", "status": "Pending"},
+    ]
+    task_ids = []
+    try:
+        operations = [{"op": "create", "data": {**task, "tags": ["sort-test"]}} for task in tasks]
+        resp = requests.post(BATCH_URL, json={"operations": operations}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Batch create failed: {resp.text}"
+        task_ids = [result["id"] for result in resp.json()["results"]]
+
+        def titles(**params):
+            resp = requests.get(TASKS_URL, headers=headers, params={"tag": "sort-test", **params}, timeout=TIMEOUT)
+            assert resp.status_code == 200, f"GET tasks failed: {resp.status_code} - {resp.text}"
+            return [task["title"] for task in resp.json()["tasks"]]
+
+        # Priorities sort by rank, not alphabetically
+        priorities = [task["priority"] for task in requests.get(
+            TASKS_URL, headers=headers, params={"tag": "sort-test", "sort": "-priority"}, timeout=TIMEOUT).json()["tasks"]]
+        assert priorities == ["High", "High", "Medium", "Medium", "Low"], f"Unexpected priority order: {priorities}"
+
+        # Tasks without a due date come last ascending and first descending
+        by_due = titles(sort="due_date")
+        assert by_due == ["Sort overdue", "Sort done late", "Sort soon", "Sort later", "Sort undated"], by_due
+        assert titles(sort="-due_date") == list(reversed(by_due))
+        assert titles(sort="title") == sorted(by_due)
+
+        # Cursor pages follow the requested order
+        paged, cursor = [], None
+        while True:
+            params = {"tag": "sort-test", "sort": "due_date", "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            resp = requests.get(TASKS_URL, headers=headers, params=params, timeout=TIMEOUT)
+            assert resp.status_code == 200, f"Page failed: {resp.status_code} - {resp.text}"
+            paged += [task["title"] for task in resp.json()["tasks"]]
+            cursor = resp.json()["next_cursor"]
+            if not cursor:
+                break
+        assert paged == by_due, f"Paged order {paged} differs from {by_due}"
+
+        # A cursor only continues the order it was issued for
+        resp = requests.get(TASKS_URL, headers=headers, params={"tag": "sort-test", "sort": "due_date", "limit": 2}, timeout=TIMEOUT)
+        resp = requests.get(TASKS_URL, headers=headers, params={"sort": "title", "cursor": resp.json()["next_cursor"]}, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Expected 400 for a cursor of another sort but got {resp.status_code}"
+
+        # Multi-value and due date filters
+        assert sorted(titles(status="Pending,In Progress")) == ["Sort later", "Sort overdue", "Sort soon", "Sort undated"]
+        assert titles(priority="High", sort="title") == ["Sort done late", "Sort soon"]
+        assert titles(due="overdue") == ["Sort overdue"], "Completed tasks are never overdue"
+        assert titles(due="none") == ["Sort undated"]
+        assert titles(due_after=now.isoformat(), sort="due_date") == ["Sort soon", "Sort later"]
+
+        for params in ({"sort": "importance"}, {"status": "Pending,Blocked"}, {"priority": "Urgent"}, {"due": "soon"}):
+            resp = requests.get(TASKS_URL, headers=headers, params=params, timeout=TIMEOUT)
+            assert resp.status_code == 400, f"Expected 400 for {params} but got {resp.status_code}"
+
+        # Tasks can only be saved with the priorities and statuses the filters accept
+        resp = requests.post(TASKS_URL, json={"title": "Sort bogus", "priority": "Bogus"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Expected 400 for an unknown priority but got {resp.status_code}"
+        resp = requests.put(f"{TASKS_URL}/{task_ids[0]}", json={"status": "Blocked"}, headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Expected 400 for an unknown status but got {resp.status_code}"
+        assert titles(status="Pending", sort="title") == ["Sort later", "Sort overdue", "Sort undated"]
+
+        # Query plans are opt-in (TASK_QUERY_EXPLAIN=true)
+        resp = requests.get(TASKS_URL, headers=headers, params={"sort": "due_date", "limit": 10, "explain": 1}, timeout=TIMEOUT)
+        if resp.status_code == 403:
+            return
+        assert resp.status_code == 200, f"Explain failed: {resp.status_code} - {resp.text}"
+        body = resp.json()
+        assert "tasks" not in body, "Explain returns the plan instead of the tasks"
+        assert "ORDER BY" in body["sql"] and body["plan"], f"Unexpected explain body: {body}"
+        if body["dialect"] == "sqlite":
+            assert any("ix_task_user_due" in line for line in body["plan"]), f"Sort index not used: {body['plan']}"
+    finally:
+        if task_ids:
+            try:
+                requests.post(BATCH_URL, json={"operations": [{"op": "delete", "id": task_id} for task_id in task_ids]},
+                              headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_task_sorting_and_filtering()
@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+TIMEOUT = 30
+
+def test_due_filter_revalidation():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    task_id = None
+    try:
+        due_date = (datetime.now(timezone.utc) + timedelta(seconds=2)).isoformat()
+        resp = requests.post(TASKS_URL, json={"title": "Due any second", "due_date": due_date, "tags": ["due-revalidation"]},
+                             headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 201, f"Create task failed: {resp.status_code} - {resp.text}"
+        task_id = resp.json()["task"]["id"]
+        params = {"due": "overdue", "tag": "due-revalidation"}
+
+        resp = requests.get(TASKS_URL, headers=headers, params=params, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"GET tasks failed: {resp.status_code}"
+        assert resp.json()["tasks"] == [], "The task is not overdue yet"
+        etag = resp.headers.get("ETag")
+        assert etag, "Missing ETag"
+
+        # Nothing was written, but the task passed its due time: the old ETag must not revalidate
+        time.sleep(3)
+        resp = requests.get(TASKS_URL, headers={**headers, "If-None-Match": etag}, params=params, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Expected a fresh list but got {resp.status_code}"
+        assert [task["id"] for task in resp.json()["tasks"]] == [task_id], f"Overdue task missing: {resp.json()}"
+        assert resp.headers.get("ETag") != etag
+
+        resp = requests.get(TASKS_URL, headers={**headers, "If-None-Match": resp.headers["ETag"]}, params=params, timeout=TIMEOUT)
+        assert resp.status_code == 304, f"Expected 304 once the list is current but got {resp.status_code}"
+    finally:
+        if task_id:
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_due_filter_revalidation()
@@ -0,0 +1,57 @@
+import requests
+
+BASE_URL = "http://localhost:5001"
+EMAIL = "testuser1@example.com"
+PASSWORD = "Testing@123"
+LOGIN_URL = f"{BASE_URL}/api/auth/login"
+TASKS_URL = f"{BASE_URL}/api/tasks"
+CHANGES_URL = f"{BASE_URL}/api/tasks/changes"
+TIMEOUT = 30
+
+def assert_same_task(written, stored, what):
+    # Field by field and in the same order: the async handlers must answer exactly like the Flask routes
+    assert list(written) == list(stored), f"{what}: field order {list(written)} differs from {list(stored)}"
+    for field in stored:
+        assert written[field] == stored[field], f"{what}: {field} is {written[field]!r}, stored {stored[field]!r}"
+
+def test_task_write_response_format():
+    login_resp = requests.post(LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}, timeout=TIMEOUT)
+    assert login_resp.status_code == 200, f"Login failed: {login_resp.text}"
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    task_id = None
+    try:
+        since = requests.get(CHANGES_URL, headers=headers, timeout=TIMEOUT).json()["next_since"]
+
+        # POST/PUT /api/tasks are async handlers under asgi.py; /api/tasks/changes is always served by Flask
+        resp = requests.post(TASKS_URL, json={"title": "Format check", "due_date": "2030-01-02T03:04:05+00:00",
+                                              "priority": "High", "tags": ["format", "check"]},
+                             headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 201, f"Create task failed: {resp.status_code} - {resp.text}"
+        created = resp.json()["task"]
+        task_id = created["id"]
+        changes = requests.get(CHANGES_URL, headers=headers, params={"since": since}, timeout=TIMEOUT).json()
+        stored = {task["id"]: task for task in changes["changed"]}[task_id]
+        assert_same_task(created, stored, "create")
+
+        resp = requests.put(f"{TASKS_URL}/{task_id}", json={"status": "In Progress", "due_date": "2030-02-03T04:05:06Z",
+                                                            "tags": ["check"]},
+                            headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Update task failed: {resp.status_code} - {resp.text}"
+        updated = resp.json()["task"]
+        changes = requests.get(CHANGES_URL, headers=headers, params={"since": changes["next_since"]}, timeout=TIMEOUT).json()
+        stored = {task["id"]: task for task in changes["changed"]}[task_id]
+        assert_same_task(updated, stored, "update")
+
+        # The list returns the same representation
+        listed = {task["id"]: task for task in requests.get(TASKS_URL, headers=headers, params={"tag": "check"},
+                                                            timeout=TIMEOUT).json()["tasks"]}[task_id]
+        assert_same_task(updated, listed, "list")
+    finally:
+        if task_id:
+            try:
+                requests.delete(f"{TASKS_URL}/{task_id}", headers=headers, timeout=TIMEOUT)
+            except Exception:
+                pass  # Ignore cleanup errors
+
+test_task_write_response_format()